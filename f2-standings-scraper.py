@@ -1,4 +1,4 @@
-from pyburnout.scrapers import F2SiteScraper
+from pyburnout.scrapers import F2SiteScraper, StandingsHistory
 import logging
 
 logging.basicConfig(level=logging.INFO)
@@ -9,9 +9,12 @@ console_handler.setLevel(logging.INFO)
 console_handler.setFormatter(logging.Formatter(logging.BASIC_FORMAT))
 logger.addHandler(console_handler)
 
-f2_scrapper = F2SiteScraper(dirpath="./f2-data", logger=logger)
+f2_scrapper = F2SiteScraper(
+    dirpath="./f2-data",
+    logger=logger,
+    history=StandingsHistory("./f2-data/standings.sqlite"),
+)
 
-f2_scrapper.get_driver_standings(2025)
-f2_scrapper.get_team_standings(2025)
-f2_scrapper.get_driver_standings(2024)
-f2_scrapper.get_team_standings(2024)
+standings, failed = f2_scrapper.scrape_standings([2025, 2024])
+for job, error in failed:
+    logger.error(f"Failed {job}: {error}")
@@ -1,66 +1,189 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 import fastf1
-import fastf1.core
-import fastf1.events
 import plotly.express as px
+import plotly.graph_objects as go
+from plotly.subplots import make_subplots
+from cache import TelemetryCache
+from session_store import SessionStore
 from constants import (
     conventional_session_options,
     sprint_session_options,
     year_options,
     telemetry_metrics,
     position_metrics,
+    vector_metrics,
+    lap_columns,
+    plot_max_points,
+    track_map_resolution,
+    webgl_point_threshold,
 )
-from fastf1.plotting import get_compound_color, get_driver_color, list_compounds
 from shiny import App, reactive, render, ui
 from shinyswatch import theme
 from shinywidgets import output_widget, render_widget
+import os
 import numpy as np
+import pandas as pd
+from pyburnout.telemetry import DominanceMap, SessionCache
+from pyburnout.telemetry.view import BaseSessionView
+from pyburnout.utils.decimation import (
+    lttb_indices,
+    lttb_union_indices,
+    spatial_thin_indices,
+)
 
+telemetry_cache = TelemetryCache(max_entries=64)
+session_cache = SessionCache(
+    root=os.environ.get("PIT_WALL_CACHE_DIR", "./session-cache")
+)
+session_store = SessionStore(
+    memory_budget_mb=int(os.environ.get("PIT_WALL_SESSION_BUDGET_MB", 4096)),
+    loader=session_cache.load_or_build,
+    on_evict=lambda key: telemetry_cache.invalidate(lambda k: k[:3] == key),
+)
+telemetry_workers = int(os.environ.get("PIT_WALL_TELEMETRY_WORKERS", 8))
+load_executor = ThreadPoolExecutor(
+    max_workers=int(os.environ.get("PIT_WALL_LOAD_WORKERS", 4)),
+    thread_name_prefix="session-load",
+)
 
-def get_driver_options(session: fastf1.core.Session):
-    driver_numbers = session.results
-    driver_abbreviations = driver_numbers["Abbreviation"].to_list()
-    return driver_abbreviations
 
+def release_when_done(key):
+    def callback(future):
+        if not future.cancelled() and future.exception() is None:
+            session_store.release(key)
 
-def clean_results_data(session: fastf1.core.Session):
-    data = session.results
-    data["Q1"] = data["Q1"].apply(lambda x: x.total_seconds())
-    data["Q2"] = data["Q2"].apply(lambda x: x.total_seconds())
-    data["Q3"] = data["Q3"].apply(lambda x: x.total_seconds())
-    data["Time"] = data["Time"].apply(lambda x: x.total_seconds())
-    return data
+    return callback
 
 
-def create_vector_sets(data: fastf1.core.Telemetry):
-    data["dx"] = data["X"].diff()
-    data["dy"] = data["Y"].diff()
-    data["dirX"] = [None] + [
-        data["X"].iloc[i] - data["X"].iloc[i - 1] for i in range(1, len(data["X"]))
-    ]
-    data["dirY"] = [None] + [
-        data["Y"].iloc[i] - data["Y"].iloc[i - 1] for i in range(1, len(data["Y"]))
-    ]
+async def acquire_session(key):
+    # Loads run on a worker thread so the event loop keeps serving other users
+    future = asyncio.get_running_loop().run_in_executor(
+        load_executor, session_store.acquire, key
+    )
+    try:
+        return key, await asyncio.shield(future)
+    except asyncio.CancelledError:
+        # A newer selection superseded this load; drop our reference once
+        # the shared load finishes so other connections can still use it
+        future.add_done_callback(release_when_done(key))
+        raise
 
-    thetas = []
-    for i in range(2, len(data["dirX"])):
-        assert len(data["dirX"]) == len(data["dirY"])
-        vec1 = np.array([data["dirX"].iloc[i], data["dirY"].iloc[i]])
-        vec2 = np.array([data["dirX"].iloc[i - 1], data["dirY"].iloc[i - 1]])
 
-        dot_product = np.dot(vec1, vec2)
-        mag1 = np.linalg.norm(vec1)
-        mag2 = np.linalg.norm(vec2)
-        cos_theta = dot_product / (mag1 * mag2)
-        angle = np.arccos(cos_theta)
-        angle = np.degrees(angle)
+def get_driver_options(session: BaseSessionView):
+    return session.drivers
 
-        thetas.append(angle)
 
-    data["angles"] = [None, None] + thetas
+def get_lap_telemetry(session: BaseSessionView, session_key, driver, lap_number: int):
+    return telemetry_cache.get(
+        (*session_key, driver, lap_number),
+        lambda: session.lap_telemetry(driver, lap_number, columns=lap_columns),
+    )
 
-    print(data[["Time", "X", "Y", "dirX", "dirY", "angles"]])
 
-    return data
+def create_vector_sets(data: pd.DataFrame):
+    # Direction vectors and turn angles come precomputed for the whole
+    # session by SessionTelemetry, so this only maps them to plot names
+    return data.rename(columns={"DirX": "dirX", "DirY": "dirY", "TurnAngle": "angles"})
+
+
+def render_mode(n_points):
+    return "webgl" if n_points > webgl_point_threshold else "svg"
+
+
+def decimate_line(data: pd.DataFrame, x, y, max_points):
+    return data.iloc[lttb_indices(data[x].to_numpy(), data[y].to_numpy(), max_points)]
+
+
+def thin_track(data: pd.DataFrame, resolution):
+    return data.iloc[
+        spatial_thin_indices(data["X"].to_numpy(), data["Y"].to_numpy(), resolution)
+    ]
+
+
+def line_figure(data: pd.DataFrame, x, y, max_points):
+    data = decimate_line(data[[x, y]], x, y, max_points)
+    figure = px.line(
+        data, x=x, y=y, template="plotly_dark", render_mode=render_mode(len(data))
+    )
+    figure.update_layout(
+        plot_bgcolor="#2D2D2D",
+        paper_bgcolor="#2D2D2D",
+    )
+    return figure
+
+
+def telemetry_figure(data: pd.DataFrame, channels, max_points):
+    # One shared-x figure instead of five; numpy arrays go over the wire as
+    # binary typed arrays rather than JSON number lists
+    time = data["Time"].to_numpy()
+    indices = lttb_union_indices(
+        time,
+        [data[channel].to_numpy() for channel in channels],
+        max(max_points // len(channels), 3),
+    )
+    time = time[indices]
+
+    figure = make_subplots(
+        rows=len(channels), cols=1, shared_xaxes=True, vertical_spacing=0.02
+    )
+    for row, channel in enumerate(channels, start=1):
+        figure.add_trace(
+            go.Scattergl(
+                x=time,
+                y=data[channel].to_numpy()[indices],
+                mode="lines",
+                name=channel,
+            ),
+            row=row,
+            col=1,
+        )
+        figure.update_yaxes(title_text=channel, row=row, col=1)
+
+    figure.update_layout(
+        template="plotly_dark",
+        plot_bgcolor="#2D2D2D",
+        paper_bgcolor="#2D2D2D",
+        height=200 * len(channels),
+        showlegend=False,
+    )
+    return figure
+
+
+def dominance_figure(dominance_map: DominanceMap, n_sectors, colours, max_points):
+    # The reference line drawn once per driver that wins a mini-sector,
+    # blanked out everywhere else; each run keeps the point after it so
+    # neighbouring sectors join up
+    reference = dominance_map.reference
+    winners = dominance_map.dominance(n_sectors)["driver"].to_numpy()
+    step = max(-(-len(reference.x) // max_points), 1)
+    x = reference.x[::step]
+    y = reference.y[::step]
+    winner = winners[reference.mini_sector(reference.distance[::step], n_sectors)]
+
+    figure = go.Figure()
+    for driver in pd.unique(winner):
+        won = winner == driver
+        shown = won | np.roll(won, 1)
+        figure.add_trace(
+            go.Scattergl(
+                x=np.where(shown, x, np.nan),
+                y=np.where(shown, y, np.nan),
+                mode="lines",
+                line=dict(color=colours.get(driver), width=6),
+                name=driver,
+                connectgaps=False,
+            )
+        )
+    figure.update_xaxes(visible=False)
+    figure.update_yaxes(visible=False, scaleanchor="x", scaleratio=1)
+    figure.update_layout(
+        template="plotly_dark",
+        plot_bgcolor="#2D2D2D",
+        paper_bgcolor="#2D2D2D",
+        height=600,
+    )
+    return figure
 
 
 app_ui = ui.page_sidebar(
@@ -68,6 +191,7 @@ app_ui = ui.page_sidebar(
         ui.input_select("year", label="Year", choices=year_options),
         ui.input_select("event", label="Event", choices={-1: ""}),
         ui.input_select("session", label="Session", choices=[]),
+        ui.output_ui("session_load_status"),
         id="sidebar",
     ),
     ui.navset_tab(
@@ -97,13 +221,21 @@ app_ui = ui.page_sidebar(
                 ui.layout_columns(
                     ui.input_select("telemetry_driver", label="Driver", choices=[]),
                     ui.input_select("lap", "Lap", choices=[]),
+                    ui.input_switch("combined_telemetry", "Single figure", value=False),
                 )
             ),
-            ui.card(output_widget("lap_speed_plot")),
-            ui.card(output_widget("lap_gear_plot")),
-            ui.card(output_widget("lap_rpm_plot")),
-            ui.card(output_widget("lap_throttle_plot")),
-            ui.card(output_widget("lap_brake_plot")),
+            ui.panel_conditional(
+                "input.combined_telemetry",
+                ui.card(output_widget("lap_telemetry_plot")),
+            ),
+            ui.panel_conditional(
+                "!input.combined_telemetry",
+                ui.card(output_widget("lap_speed_plot")),
+                ui.card(output_widget("lap_gear_plot")),
+                ui.card(output_widget("lap_rpm_plot")),
+                ui.card(output_widget("lap_throttle_plot")),
+                ui.card(output_widget("lap_brake_plot")),
+            ),
         ),
         ui.nav_panel(
             "Analysis",
@@ -141,6 +273,18 @@ app_ui = ui.page_sidebar(
                 ),
             ),
         ),
+        ui.nav_panel(
+            "Dominance",
+            ui.card(
+                ui.layout_columns(
+                    ui.input_slider(
+                        "dominance_sectors", "Mini-sectors", min=5, max=60, value=25
+                    ),
+                )
+            ),
+            ui.card(output_widget("dominance_map")),
+            ui.card(ui.output_data_frame("dominance_df")),
+        ),
         ui.nav_panel(
             "Quali Comp",
             ui.card(
@@ -154,6 +298,7 @@ app_ui = ui.page_sidebar(
                 )
             ),
         ),
+        id="tabs",
     ),
     title="Pit Wall",
     theme=theme.darkly,
@@ -172,6 +317,10 @@ def server(input, output, session):
     event_schedule_data = reactive.value(None)
     event_data = reactive.value(None)
     event_session_data = reactive.value(None)
+    event_session_key = reactive.value(None)
+    pending_session_key = reactive.value(None)
+    held_session_key = None
+    dominance_key = None
 
     base_depenedencies = [input.year, input.event, input.session]
     laps_dependencies = [input.laps_driver, *base_depenedencies]
@@ -206,50 +355,159 @@ def server(input, output, session):
                 choices=get_session_options(event_data()["EventFormat"]),
             )
 
+    @reactive.extended_task
+    async def load_session_task(key):
+        return await acquire_session(key)
+
     @reactive.effect
     @reactive.event(input.session)
     def get_session():
         if input.session() is not None and input.event() is not None:
-            data = event_data().get_session(input.session())
-            if data is not None:
-                data.load(laps=True)
-            event_session_data.set(data)
+            key = None
+            if event_data() is not None and input.session() != "":
+                key = (int(input.year()), int(input.event()), input.session())
+            load_session_task.cancel()
+            pending_session_key.set(key)
+            if key is None:
+                set_session(None, None)
+            else:
+                load_session_task.invoke(key)
 
-            ui.update_select(
-                "laps_driver",
-                choices=get_driver_options(event_session_data())
-                if event_session_data() is not None
-                else [],
-            )
-            ui.update_select(
-                "telemetry_driver",
-                choices=get_driver_options(event_session_data())
-                if event_session_data() is not None
-                else [],
-            )
-            ui.update_select(
-                "analysis_driver",
-                choices=get_driver_options(event_session_data())
-                if event_session_data() is not None
-                else [],
-            )
-            ui.update_select(
-                "location_driver",
-                choices=get_driver_options(event_session_data())
-                if event_session_data() is not None
-                else [],
-            )
+    @reactive.effect
+    def handle_session_loaded():
+        if load_session_task.status() != "success":
+            return
+        key, data = load_session_task.result()
+        with reactive.isolate():
+            stale = key != pending_session_key()
+        if stale:
+            session_store.release(key)
+            return
+        set_session(key, data)
+
+    def set_session(key, data):
+        release_held_session()
+        hold_session(key)
+        event_session_key.set(key)
+        event_session_data.set(data)
+
+        driver_options = get_driver_options(data) if data is not None else []
+        ui.update_select("laps_driver", choices=driver_options)
+        ui.update_select("telemetry_driver", choices=driver_options)
+        ui.update_select("analysis_driver", choices=driver_options)
+        ui.update_select("location_driver", choices=driver_options)
+
+    def hold_session(key):
+        nonlocal held_session_key
+        held_session_key = key
+
+    def release_held_session():
+        if held_session_key is not None:
+            session_store.release(held_session_key)
+            hold_session(None)
+
+    session.on_ended(release_held_session)
+
+    def session_key():
+        return event_session_key()
+
+    def output_points(output_id, default=plot_max_points):
+        # Roughly two samples per horizontal pixel is all a line chart can show
+        width = session.clientdata.output_width(output_id)
+        return int(width * 2) if width else default
+
+    @reactive.calc
+    def session_view():
+        if event_session_data() is None:
+            return None
+        return event_session_data()
+
+    @reactive.calc
+    def lap_telemetry():
+        input_lap = int(float(input.lap())) if input.lap() is not None else None
+        if input_lap is None or event_session_data() is None:
+            return None
+        return get_lap_telemetry(
+            event_session_data(), session_key(), input.telemetry_driver(), input_lap
+        )
+
+    @reactive.calc
+    def location_lap_telemetry():
+        input_lap = (
+            int(float(input.location_lap()))
+            if input.location_lap() is not None
+            else None
+        )
+        if input_lap is None or event_session_data() is None:
+            return None
+        return get_lap_telemetry(
+            event_session_data(), session_key(), input.location_driver(), input_lap
+        )
+
+    @reactive.extended_task
+    async def dominance_task(key, view):
+        # Every driver's fastest lap, fetched in parallel and snapped onto
+        # the reference line once per session, then kept with the session.
+        # Built on a load worker so the event loop keeps serving other users
+        return key, await asyncio.get_running_loop().run_in_executor(
+            load_executor,
+            session_store.derived,
+            key,
+            "dominance_map",
+            lambda: DominanceMap.from_view(view, workers=telemetry_workers),
+        )
+
+    @reactive.effect
+    def build_session_dominance():
+        # Only built once the Dominance tab is opened
+        nonlocal dominance_key
+        view = session_view()
+        key = session_key()
+        if view is None or key == dominance_key or input.tabs() != "Dominance":
+            return
+        dominance_key = key
+        dominance_task.cancel()
+        dominance_task.invoke(key, view)
+
+    @reactive.calc
+    def session_dominance():
+        if dominance_task.status() != "success":
+            return None
+        key, data = dominance_task.result()
+        return data if key == session_key() else None
+
+    @render.ui
+    def session_load_status():
+        key = pending_session_key()
+        if key is None:
+            return None
+        status = load_session_task.status()
+        if status == "running":
+            reactive.invalidate_later(0.5)
+
+        progress = session_store.progress(key)
+        lines = []
+        if progress is not None:
+            for stage, seconds, done in progress.timings():
+                lines.append(f"- {stage}: {seconds:.1f}s{'' if done else ' ...'}")
+        if status == "running" and not lines:
+            lines.append("- Waiting for a worker ...")
+        if status == "error":
+            lines.append(f"- Failed: {progress.error if progress else 'unknown error'}")
+        return ui.markdown("\n".join(lines))
 
     @render.ui
     def session_info():
         if event_session_data() is not None:
             session_info_data = event_session_data().session_info
+            memory = session_view().memory_report()
             return ui.TagList(
                 ui.markdown(
                     f"""
                 # {session_info_data["Meeting"]["Name"]} 
                 Session Type: {session_info_data["Type"]}\n
-                Start Time: {session_info_data["StartDate"]}
+                Start Time: {session_info_data["StartDate"]}\n
+                Memory: {memory["view_bytes"] / 1e6:.1f} MB view / {memory["raw_bytes"] / 1e6:.1f} MB raw
                 """
                 )
             )
@@ -257,44 +515,45 @@ def server(input, output, session):
 
     @render.data_frame
     def results_df():
-        if event_session_data() is not None:
-            data = clean_results_data(event_session_data())
-            return render.DataTable(data)
+        if session_view() is not None:
+            return render.DataTable(session_view().results)
         return
 
     @reactive.effect
     @reactive.event(*laps_dependencies)
     def get_driver_telemetry():
         if input.laps_driver() is not None:
-            car_data = event_session_data().laps.pick_drivers(input.laps_driver())
+            car_data = session_view().driver_laps(input.laps_driver())
             lap_numbers = car_data["LapNumber"].to_list()
             ui.update_select("lap", choices=lap_numbers)
             ui.update_select("location_lap", choices=lap_numbers)
 
     @render.data_frame
     def laps_df():
-        print("===", event_session_data())
-        if event_session_data() is not None:
-            data = event_session_data().laps.pick_drivers(input.laps_driver())
-            data["Lap"] = data["LapTime"].apply(lambda x: x.total_seconds())
-            data["Lap Number"] = data["LapNumber"]
-            data["Sector 1"] = data["Sector1Time"].apply(lambda x: x.total_seconds())
-            data["Sector 2"] = data["Sector2Time"].apply(lambda x: x.total_seconds())
-            data["Sector 3"] = data["Sector3Time"].apply(lambda x: x.total_seconds())
-            data["Valid"] = data["IsAccurate"].apply(lambda x: True if x else False)
-            data["Compound"] = data["Compound"]
+        if session_view() is not None:
+            data = session_view().driver_laps(input.laps_driver())
             data = data[
                 [
                     "Driver",
-                    "Lap Number",
-                    "Lap",
-                    "Valid",
-                    "Sector 1",
-                    "Sector 2",
-                    "Sector 3",
+                    "LapNumber",
+                    "LapTime",
+                    "IsAccurate",
+                    "Sector1Time",
+                    "Sector2Time",
+                    "Sector3Time",
                     "Compound",
                 ]
-            ]
+            ].rename(
+                columns={
+                    "LapNumber": "Lap Number",
+                    "LapTime": "Lap",
+                    "IsAccurate": "Valid",
+                    "Sector1Time": "Sector 1",
+                    "Sector2Time": "Sector 2",
+                    "Sector3Time": "Sector 3",
+                }
+            )
+            data["Valid"] = data["Valid"].fillna(False).astype(bool)
             return render.DataTable(
                 data,
                 filters=True,
@@ -310,163 +569,69 @@ def server(input, output, session):
         return None
 
     @render_widget
-    def lap_speed_plot():
-        input_lap = int(float(input.lap())) if input.lap() is not None else None
-        if input_lap is not None:
-            car_data = (
-                event_session_data()
-                .laps.pick_drivers(input.telemetry_driver())
-                .pick_lap(input_lap)
-                .get_telemetry()
+    def lap_telemetry_plot():
+        car_data = lap_telemetry()
+        if car_data is not None:
+            return telemetry_figure(
+                car_data, telemetry_metrics, output_points("lap_telemetry_plot")
             )
+        return None
 
-            speed_data = car_data[["Time", "Speed"]]
-            speed_data["Time"] = speed_data["Time"].apply(lambda x: x.total_seconds())
-
-            speed_plot = px.line(
-                speed_data,
-                x="Time",
-                y="Speed",
-                template="plotly_dark",
-            )
-            speed_plot.update_layout(
-                plot_bgcolor="#2D2D2D",
-                paper_bgcolor="#2D2D2D",
+    @render_widget
+    def lap_speed_plot():
+        car_data = lap_telemetry()
+        if car_data is not None:
+            return line_figure(
+                car_data, "Time", "Speed", output_points("lap_speed_plot")
             )
-
-            return speed_plot
         return None
 
     @render_widget
     def lap_gear_plot():
-        input_lap = int(float(input.lap())) if input.lap() is not None else None
-        if input_lap is not None:
-            car_data = (
-                event_session_data()
-                .laps.pick_drivers(input.telemetry_driver())
-                .pick_lap(input_lap)
-                .get_telemetry()
-            )
-
-            speed_data = car_data[["Time", "nGear"]]
-            speed_data["Time"] = speed_data["Time"].apply(lambda x: x.total_seconds())
-
-            speed_plot = px.line(
-                speed_data,
-                x="Time",
-                y="nGear",
-                template="plotly_dark",
+        car_data = lap_telemetry()
+        if car_data is not None:
+            return line_figure(
+                car_data, "Time", "nGear", output_points("lap_gear_plot")
             )
-            speed_plot.update_layout(
-                plot_bgcolor="#2D2D2D",
-                paper_bgcolor="#2D2D2D",
-            )
-
-            return speed_plot
         return None
 
     @render_widget
     def lap_rpm_plot():
-        input_lap = int(float(input.lap())) if input.lap() is not None else None
-        if input_lap is not None:
-            car_data = (
-                event_session_data()
-                .laps.pick_drivers(input.telemetry_driver())
-                .pick_lap(input_lap)
-                .get_telemetry()
-            )
-
-            speed_data = car_data[["Time", "RPM"]]
-            speed_data["Time"] = speed_data["Time"].apply(lambda x: x.total_seconds())
-
-            speed_plot = px.line(
-                speed_data,
-                x="Time",
-                y="RPM",
-                template="plotly_dark",
-            )
-            speed_plot.update_layout(
-                plot_bgcolor="#2D2D2D",
-                paper_bgcolor="#2D2D2D",
-            )
-
-            return speed_plot
+        car_data = lap_telemetry()
+        if car_data is not None:
+            return line_figure(car_data, "Time", "RPM", output_points("lap_rpm_plot"))
         return None
 
     @render_widget
     def lap_throttle_plot():
-        input_lap = int(float(input.lap())) if input.lap() is not None else None
-        if input_lap is not None:
-            car_data = (
-                event_session_data()
-                .laps.pick_drivers(input.telemetry_driver())
-                .pick_lap(input_lap)
-                .get_telemetry()
-            )
-
-            speed_data = car_data[["Time", "Throttle"]]
-            speed_data["Time"] = speed_data["Time"].apply(lambda x: x.total_seconds())
-
-            speed_plot = px.line(
-                speed_data,
-                x="Time",
-                y="Throttle",
-                template="plotly_dark",
-            )
-            speed_plot.update_layout(
-                plot_bgcolor="#2D2D2D",
-                paper_bgcolor="#2D2D2D",
+        car_data = lap_telemetry()
+        if car_data is not None:
+            return line_figure(
+                car_data, "Time", "Throttle", output_points("lap_throttle_plot")
             )
-
-            return speed_plot
         return None
 
     @render_widget
     def lap_brake_plot():
-        input_lap = int(float(input.lap())) if input.lap() is not None else None
-        if input_lap is not None:
-            car_data = (
-                event_session_data()
-                .laps.pick_drivers(input.telemetry_driver())
-                .pick_lap(input_lap)
-                .get_telemetry()
-            )
-
-            speed_data = car_data[["Time", "Brake"]]
-            speed_data["Time"] = speed_data["Time"].apply(lambda x: x.total_seconds())
-
-            speed_plot = px.line(
-                speed_data,
-                x="Time",
-                y="Brake",
-                template="plotly_dark",
+        car_data = lap_telemetry()
+        if car_data is not None:
+            return line_figure(
+                car_data, "Time", "Brake", output_points("lap_brake_plot")
             )
-            speed_plot.update_layout(
-                plot_bgcolor="#2D2D2D",
-                paper_bgcolor="#2D2D2D",
-            )
-
-            return speed_plot
         return None
 
     @render_widget
     def tyre_deg_plot():
-        if event_session_data() is not None:
-            event_data = event_session_data().laps.pick_drivers(input.analysis_driver())
-            event_data = event_data[event_data["IsAccurate"]]
-            tyre_deg_data = event_data[
-                ["LapTime", "TyreLife", "Compound", "Stint"]
-            ].sort_values("Stint")
-            tyre_deg_data["Stint"] = tyre_deg_data["Stint"].apply(lambda x: int(x))
-            tyre_deg_data["LapTime"] = tyre_deg_data["LapTime"].apply(
-                lambda x: x.total_seconds()
+        if session_view() is not None:
+            event_data = session_view().driver_laps(input.analysis_driver())
+            event_data = event_data[event_data["IsAccurate"].fillna(False).astype(bool)]
+            tyre_deg_data = (
+                event_data[["LapTime", "TyreLife", "Compound", "Stint"]]
+                .sort_values("Stint")
+                .assign(Stint=lambda laps: laps["Stint"].astype(int))
             )
 
-            compound_colours = list_compounds(event_session_data())
-            colour_compound_map = {
-                compound: get_compound_color(compound, event_session_data())
-                for compound in compound_colours
-            }
+            colour_compound_map = session_view().compound_colours
 
             tyre_deg_plot = px.scatter(
                 tyre_deg_data,
@@ -494,20 +659,14 @@ def server(input, output, session):
 
     @render_widget()
     def tyre_stint_boxplot():
-        if event_session_data() is not None:
-            event_data = event_session_data().laps.pick_drivers(input.analysis_driver())
-            event_data = event_data[event_data["IsAccurate"]]
-            tyre_deg_data = event_data[["LapTime", "TyreLife", "Compound", "Stint"]]
-            tyre_deg_data["Stint"] = tyre_deg_data["Stint"].apply(lambda x: int(x))
-            tyre_deg_data["LapTime"] = tyre_deg_data["LapTime"].apply(
-                lambda x: x.total_seconds()
-            )
+        if session_view() is not None:
+            event_data = session_view().driver_laps(input.analysis_driver())
+            event_data = event_data[event_data["IsAccurate"].fillna(False).astype(bool)]
+            tyre_deg_data = event_data[
+                ["LapTime", "TyreLife", "Compound", "Stint"]
+            ].assign(Stint=lambda laps: laps["Stint"].astype(int))
 
-            compound_colours = list_compounds(event_session_data())
-            colour_compound_map = {
-                compound: get_compound_color(compound, event_session_data())
-                for compound in compound_colours
-            }
+            colour_compound_map = session_view().compound_colours
 
             tyre_deg_plot = px.box(
                 tyre_deg_data,
@@ -533,25 +692,44 @@ def server(input, output, session):
         return None
 
     @render_widget
-    def location_telemetry():
-        input_lap = (
-            int(float(input.location_lap())) if input.lap() is not None else None
-        )
-        if input_lap is not None:
-            car_data = (
-                event_session_data()
-                .laps.pick_drivers(input.location_driver())
-                .pick_lap(input_lap)
-                .get_telemetry()
+    def dominance_map():
+        data = session_dominance()
+        if data is not None:
+            return dominance_figure(
+                data,
+                input.dominance_sectors(),
+                session_view().driver_colours,
+                output_points("dominance_map"),
             )
+        return None
 
-            speed_data = car_data[["Time", "X", "Y", "Z"]]
-            speed_data["Time"] = speed_data["Time"].apply(lambda x: x.total_seconds())
+    @render.data_frame
+    def dominance_df():
+        data = session_dominance()
+        if data is not None:
+            table = data.dominance(input.dominance_sectors()).rename(
+                columns={
+                    "sector": "Sector",
+                    "start": "From (m)",
+                    "end": "To (m)",
+                    "driver": "Fastest",
+                    "time": "Time",
+                    "margin": "Margin",
+                }
+            )
+            return render.DataTable(table.round(3))
+        return None
 
-            driver_colour = get_driver_color(
-                input.location_driver(), event_session_data()
+    @render_widget
+    def location_telemetry():
+        car_data = location_lap_telemetry()
+        if car_data is not None:
+            speed_data = thin_track(
+                car_data[["Time", "X", "Y", "Z"]], track_map_resolution
             )
 
+            driver_colour = session_view().driver_colours.get(input.location_driver())
+
             speed_plot = px.scatter_3d(
                 speed_data,
                 x="X",
@@ -569,28 +747,21 @@ def server(input, output, session):
 
     @render_widget
     def location_xy_2d():
-        input_lap = (
-            int(float(input.location_lap())) if input.lap() is not None else None
-        )
-        if input_lap is not None:
-            car_data = (
-                event_session_data()
-                .laps.pick_drivers(input.location_driver())
-                .pick_lap(input_lap)
-                .get_telemetry()
-            )
-
+        car_data = location_lap_telemetry()
+        if car_data is not None:
             speed_data = car_data[
                 ["Time", "X", "Y", "Z", "Speed", "RPM", "Throttle", "Brake", "nGear"]
             ]
-            speed_data["Time"] = speed_data["Time"].apply(lambda x: x.total_seconds())
-            speed_data["nGear"] = speed_data["nGear"].apply(lambda x: str(x))
+            speed_data = thin_track(speed_data, track_map_resolution).assign(
+                nGear=lambda samples: samples["nGear"].astype(str)
+            )
 
             speed_plot = px.scatter(
                 speed_data,
                 x="X",
                 y="Y",
                 color=input.metric_select(),
+                render_mode=render_mode(len(speed_data)),
             )
             speed_plot.update_layout(
                 plot_bgcolor="#2D2D2D",
@@ -602,27 +773,22 @@ def server(input, output, session):
 
     @render_widget
     def location_z_2d():
-        input_lap = (
-            int(float(input.location_lap())) if input.lap() is not None else None
-        )
-        if input_lap is not None:
-            car_data = (
-                event_session_data()
-                .laps.pick_drivers(input.location_driver())
-                .pick_lap(input_lap)
-                .get_telemetry()
-            )
-
+        car_data = location_lap_telemetry()
+        if car_data is not None:
             speed_data = car_data[
                 ["Time", "X", "Y", "Z", "Speed", "RPM", "Throttle", "Brake", "nGear"]
             ]
-            speed_data["Time"] = speed_data["Time"].apply(lambda x: x.total_seconds())
+
+            speed_data = decimate_line(
+                speed_data, "Time", "Z", output_points("location_z_2d")
+            )
 
             speed_plot = px.scatter(
                 speed_data,
                 x="Time",
                 y="Z",
                 color=input.metric_select(),
+                render_mode=render_mode(len(speed_data)),
             )
             speed_plot.update_layout(
                 plot_bgcolor="#2D2D2D",
@@ -634,23 +800,22 @@ def server(input, output, session):
 
     @render_widget
     def delta_xy_2d():
-        input_lap = (
-            int(float(input.location_lap())) if input.lap() is not None else None
-        )
-        if input_lap is not None:
-            car_data = (
-                event_session_data()
-                .laps.pick_drivers(input.location_driver())
-                .pick_lap(input_lap)
-                .get_telemetry()
-            )
-
-            speed_data = car_data[[*position_metrics, *telemetry_metrics]]
-            speed_data["Time"] = speed_data["Time"].apply(lambda x: x.total_seconds())
+        car_data = location_lap_telemetry()
+        if car_data is not None:
+            speed_data = car_data[
+                [*position_metrics, *telemetry_metrics, *vector_metrics]
+            ]
             speed_data = create_vector_sets(speed_data)
-            print(speed_data)
+            speed_data = decimate_line(
+                speed_data, "Time", "angles", output_points("delta_xy_2d")
+            )
 
-            speed_plot = px.scatter(speed_data, x="Time", y="angles")
+            speed_plot = px.scatter(
+                speed_data,
+                x="Time",
+                y="angles",
+                render_mode=render_mode(len(speed_data)),
+            )
 
             speed_plot.update_layout(
                 plot_bgcolor="#2D2D2D",
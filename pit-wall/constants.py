@@ -15,4 +15,11 @@ conventional_session_options = [
 ]
 
 telemetry_metrics = ["Speed", "RPM", "Throttle", "Brake", "nGear"]
-position_metrics = ["X", "Y", "Z", "Time"]
\ No newline at end of file
+position_metrics = ["X", "Y", "Z", "Time"]
+vector_metrics = ["DirX", "DirY", "TurnAngle"]
+# Every telemetry channel a pit-wall renderer reads
+lap_columns = [*position_metrics, *telemetry_metrics, *vector_metrics]
+# Plot payload limits, per chart
+plot_max_points = 2000
+track_map_resolution = 600
+webgl_point_threshold = 1000
@@ -0,0 +1,251 @@
+from collections import OrderedDict
+from concurrent.futures import Future
+import logging
+import threading
+import time
+
+import fastf1
+import numpy as np
+import pandas as pd
+from pyburnout.telemetry import SessionView
+
+
+class LoadProgress:
+    """Stage timings for one session load, readable from any thread."""
+
+    def __init__(self):
+        self.stages = []
+        self.error = None
+        self._lock = threading.Lock()
+
+    def start(self, stage):
+        now = time.perf_counter()
+        with self._lock:
+            if self.stages and self.stages[-1][2] is None:
+                self.stages[-1][2] = now
+            self.stages.append([stage, now, None])
+
+    def finish(self, error=None):
+        now = time.perf_counter()
+        with self._lock:
+            if self.stages and self.stages[-1][2] is None:
+                self.stages[-1][2] = now
+            self.error = error
+
+    @property
+    def done(self):
+        with self._lock:
+            return bool(self.stages) and self.stages[-1][2] is not None
+
+    def timings(self):
+        now = time.perf_counter()
+        with self._lock:
+            return [
+                (stage, (end if end is not None else now) - start, end is not None)
+                for stage, start, end in self.stages
+            ]
+
+
+def load_session(year, round_number, session_name, progress: LoadProgress = None):
+    progress = progress if progress else LoadProgress()
+    progress.start("Fetching schedule")
+    session = fastf1.get_session(year, round_number, session_name)
+    progress.start("Loading laps and telemetry")
+    session.load(laps=True)
+    progress.start("Building session view")
+    return SessionView(session)
+
+
+def estimate_session_bytes(session):
+    if hasattr(session, "memory_usage"):
+        return session.memory_usage()
+    total = 0
+    for name in ("laps", "results"):
+        try:
+            total += int(getattr(session, name).memory_usage(deep=True).sum())
+        except Exception:
+            continue
+    for name in ("car_data", "pos_data"):
+        try:
+            channels = getattr(session, name)
+        except Exception:
+            continue
+        for telemetry in channels.values():
+            total += int(telemetry.memory_usage(deep=True).sum())
+    return total
+
+
+def estimate_bytes(value, seen=None):
+    # Rough deep size of an object built from a session: frames, arrays and
+    # the containers and attributes holding them. Shared objects count once.
+    seen = seen if seen is not None else set()
+    if id(value) in seen:
+        return 0
+    seen.add(id(value))
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        usage = value.memory_usage(deep=True)
+        return int(usage.sum()) if isinstance(value, pd.DataFrame) else int(usage)
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, dict):
+        return sum(estimate_bytes(item, seen) for item in value.values())
+    if isinstance(value, (list, tuple, set)):
+        return sum(estimate_bytes(item, seen) for item in value)
+    if hasattr(value, "__dict__"):
+        return estimate_bytes(vars(value), seen)
+    return 0
+
+
+class _Entry:
+    def __init__(self, session, size):
+        self.session = session
+        self.size = size
+        self.refs = 0
+        self.derived = {}
+        self.derived_sizes = {}
+
+
+class SessionStore:
+    """Process-wide store of loaded session views.
+
+    Sessions are keyed by (year, round, session name) and shared by every
+    connection. Concurrent acquires of a key that is still loading wait on
+    the one in-flight load instead of starting their own. Sessions nobody
+    holds a reference to are evicted least recently used first once the
+    store goes over its memory budget.
+    """
+
+    def __init__(
+        self,
+        memory_budget_mb=4096,
+        loader=load_session,
+        on_evict=None,
+        logger: logging.Logger = None,
+    ):
+        self.memory_budget = memory_budget_mb * 1024 * 1024
+        self.loader = loader
+        self.on_evict = on_evict
+        self.logger = logger if logger else logging.Logger(__name__)
+
+        self._entries = OrderedDict()
+        self._in_flight = {}
+        self._progress = {}
+        self._lock = threading.Lock()
+
+    def acquire(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry.refs += 1
+                self._entries.move_to_end(key)
+                return entry.session
+
+            future = self._in_flight.get(key)
+            owner = future is None
+            if owner:
+                future = Future()
+                self._in_flight[key] = future
+                progress = LoadProgress()
+                self._progress[key] = progress
+
+        if not owner:
+            self.logger.info(f"Waiting on in-flight load: {key}")
+            future.result()
+            return self.acquire(key)
+
+        self.logger.info(f"Loading session: {key}")
+        try:
+            session = self.loader(*key, progress=progress)
+            progress.start("Measuring memory")
+            size = estimate_session_bytes(session)
+        except BaseException as e:
+            progress.finish(error=e)
+            with self._lock:
+                del self._in_flight[key]
+            future.set_exception(e)
+            raise
+        progress.finish()
+
+        entry = _Entry(session, size)
+        entry.refs = 1
+        with self._lock:
+            self._entries[key] = entry
+            del self._in_flight[key]
+            evicted = self._evict()
+        future.set_result(session)
+        self._notify_evicted(evicted)
+        return session
+
+    def release(self, key):
+        # Telemetry is loaded into a session long after it was first sized,
+        # so it is measured again whenever a connection lets go of it
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is None:
+            return
+        size = estimate_session_bytes(entry.session)
+        with self._lock:
+            entry.size = size + sum(entry.derived_sizes.values())
+            entry.refs = max(entry.refs - 1, 0)
+            evicted = self._evict()
+        self._notify_evicted(evicted)
+
+    def _evict(self):
+        # Caller holds the lock
+        evicted = []
+        total = sum(entry.size for entry in self._entries.values())
+        for key in list(self._entries):
+            if total <= self.memory_budget:
+                break
+            entry = self._entries[key]
+            if entry.refs > 0:
+                continue
+            total -= entry.size
+            del self._entries[key]
+            self._progress.pop(key, None)
+            evicted.append(key)
+        if total > self.memory_budget:
+            self.logger.info(
+                f"Session store over budget with pinned sessions: {total} bytes"
+            )
+        return evicted
+
+    def _notify_evicted(self, keys):
+        for key in keys:
+            self.logger.info(f"Evicted session: {key}")
+            if self.on_evict is not None:
+                self.on_evict(key)
+
+    def derived(self, key, name, factory):
+        # Objects built from a session (telemetry indexes, views) live and
+        # die with the session's entry, and count towards its size
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and name in entry.derived:
+                return entry.derived[name]
+        value = factory()
+        size = estimate_bytes(value)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or name in entry.derived:
+                return entry.derived[name] if entry is not None else value
+            entry.derived[name] = value
+            entry.derived_sizes[name] = size
+            entry.size += size
+            evicted = self._evict()
+        self._notify_evicted(evicted)
+        return value
+
+    def progress(self, key):
+        with self._lock:
+            return self._progress.get(key)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "sessions": len(self._entries),
+                "loading": len(self._in_flight),
+                "bytes": sum(entry.size for entry in self._entries.values()),
+                "budget": self.memory_budget,
+                "refs": {key: entry.refs for key, entry in self._entries.items()},
+            }
@@ -0,0 +1,63 @@
+"""Times the F2 standings HTTP path over the standings fixtures.
+
+    pip install -e pyburnout  # or run with PYTHONPATH=pyburnout/src
+    python pyburnout/benchmarks/f2_standings.py
+
+The fixtures are served from a local HTTP server and every season in
+F2SiteScraper.SEASON_IDS is scraped for both tables, so the timings cover
+the request, parsing and CSV writing but not the real site's latency. The
+fixtures reproduce the site's table markup at full-season size; parse
+correctness is covered by tests/test_f2.py.
+"""
+
+import http.server
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from pyburnout.scrapers.f2 import F2SiteScraper, parse_standings_html
+
+FIXTURES = Path(__file__).parent / "fixtures" / "f2"
+
+
+class FixtureHandler(http.server.BaseHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        name = "driver" if "/Driver" in self.path else "team"
+        body = (FIXTURES / f"{name}_standings.html").read_bytes()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def main():
+    client_rendered = (FIXTURES / "client_rendered.html").read_bytes()
+    assert parse_standings_html(client_rendered) is None
+
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), FixtureHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    with tempfile.TemporaryDirectory() as dirpath:
+        scraper = F2SiteScraper(dirpath=dirpath)
+        scraper.BASE_URL = f"http://127.0.0.1:{server.server_port}"
+        for table in ("driver_standings", "team_standings"):
+            timings = []
+            for season in scraper.SEASON_IDS:
+                start = time.perf_counter()
+                headings, content = scraper.get_standings(table, season)
+                timings.append(time.perf_counter() - start)
+            print(
+                f"{table:<18}{len(timings)} seasons, {len(headings)} columns, "
+                f"{len(content)} rows: {sum(timings) / len(timings) * 1e3:.1f} ms "
+                f"per table, {max(timings) * 1e3:.1f} ms max"
+            )
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
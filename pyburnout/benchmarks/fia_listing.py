@@ -0,0 +1,61 @@
+"""Times the FIA listing parsers over the saved listing pages.
+
+    pip install -e pyburnout  # or run with PYTHONPATH=pyburnout/src
+    python pyburnout/benchmarks/fia_listing.py [--pages 500]
+
+Each fixture is parsed with parse_listing and with the BeautifulSoup
+reference parser. Both must return the same documents, and the timings are
+scaled up to a bulk sync of --pages listing pages. The fixtures reproduce
+the listing markup of both layouts without the site's scripts, menus and
+footer, so the timings are mostly the document rows themselves.
+"""
+
+import argparse
+import time
+from pathlib import Path
+
+from pyburnout.scrapers.fia_listing import parse_listing, parse_listing_soup
+
+FIXTURES = Path(__file__).parent / "fixtures" / "fia"
+
+
+def time_parser(parser, html, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        parser(html)
+    return (time.perf_counter() - start) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pages", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    fixtures = sorted(FIXTURES.glob("*.html"))
+    fast_total = 0.0
+    soup_total = 0.0
+    print(f"{'fixture':<30}{'docs':>6}{'lxml ms':>10}{'soup ms':>10}{'speedup':>9}")
+    for fixture in fixtures:
+        html = fixture.read_bytes()
+        documents = parse_listing(html)
+        assert documents == parse_listing_soup(html), fixture.name
+
+        fast = time_parser(parse_listing, html, args.repeat)
+        soup = time_parser(parse_listing_soup, html, args.repeat)
+        fast_total += fast
+        soup_total += soup
+        print(
+            f"{fixture.name:<30}{len(documents):>6}{fast * 1e3:>10.2f}"
+            f"{soup * 1e3:>10.2f}{soup / fast:>8.1f}x"
+        )
+
+    scale = args.pages / len(fixtures)
+    print(
+        f"\n{args.pages} listing pages: lxml {fast_total * scale:.2f}s, "
+        f"soup {soup_total * scale:.2f}s"
+    )
+
+
+if __name__ == "__main__":
+    main()
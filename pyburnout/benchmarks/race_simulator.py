@@ -0,0 +1,48 @@
+"""Times the Monte Carlo race simulator on the win-probability lap data.
+
+    pip install -e pyburnout  # or run with PYTHONPATH=pyburnout/src
+    python pyburnout/benchmarks/race_simulator.py
+
+The state is the running order and gaps of the 2021 Italian Grand Prix at
+half distance. A seeded run must give the same answer on one worker and on
+every core, and live queries must come back within their budgets.
+"""
+
+import os
+import time
+from pathlib import Path
+
+import pandas as pd
+
+from pyburnout.winprob import RaceSimulator
+
+DATA = Path(__file__).parents[2] / "research-projects" / "win-probability" / "data"
+PATHS = [DATA / "driver-lap-data-bahrain.csv", DATA / "driver-lap-data-monza.csv"]
+
+
+def main():
+    lap_data = pd.read_csv(DATA / "driver-lap-data-monza.csv")
+    state = lap_data[(lap_data["year"] == 2021) & (lap_data["lap"] == 26)]
+    state = state.sort_values("position")
+    args = ("monza", 26, state["driver_id"], state["gap_ahead"])
+
+    answers = []
+    for workers in sorted({1, os.cpu_count()}):
+        simulator = RaceSimulator.read_csv(PATHS, workers=workers)
+        start = time.perf_counter()
+        answers.append(simulator.simulate(*args, n_races=200_000, seed=2021))
+        print(f"200000 races on {workers} workers: {time.perf_counter() - start:.2f}s")
+    pd.testing.assert_series_equal(answers[0], answers[-1])
+    print(answers[0].head(5).round(3).to_string())
+
+    for budget in (0.01, 0.05, 0.25):
+        start = time.perf_counter()
+        live = simulator.win_probability(*args, budget=budget)
+        print(
+            f"budget {budget * 1e3:5.0f} ms: {(time.perf_counter() - start) * 1e3:6.1f} ms, "
+            f"{live.attrs['races']} races"
+        )
+
+
+if __name__ == "__main__":
+    main()
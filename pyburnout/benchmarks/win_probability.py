@@ -0,0 +1,99 @@
+"""Times the win probability curves against the notebook's lap loop.
+
+    pip install -e pyburnout  # or run with PYTHONPATH=pyburnout/src
+    python pyburnout/benchmarks/win_probability.py
+
+Curves are fitted from the driver-results CSVs of the win-probability
+research, then regenerated for those circuits and for a calendar's worth of
+copies of them. The loop is `probability_change` from the exploration
+notebook and must give the same states.
+"""
+
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from pyburnout.winprob import fit_starting_probability, win_probability_curves
+
+DATA = Path(__file__).parents[2] / "research-projects" / "win-probability" / "data"
+CIRCUITS = ["bahrain", "monza"]
+
+
+def probability_change(prob, lap, total_laps, target=0, scale=1.5):
+    distance = target - prob if target > prob else prob - target
+    decline_rate = scale ** (total_laps - lap)
+    decline_rate = 1 / decline_rate
+    prob_change = distance * decline_rate
+    return prob - prob_change if target == 0 else prob + prob_change
+
+
+def loop_curves(params, total_laps, grid_positions=20):
+    data = []
+    for circuit, (a, b) in params[["a", "b"]].iterrows():
+        laps = total_laps[circuit]
+        for position in range(1, grid_positions + 1):
+            state = round(a * np.exp(-b * position), 4)
+            data.append(
+                {
+                    "circuit": circuit,
+                    "position": position,
+                    "lap_number": 0,
+                    "state": state,
+                }
+            )
+            for lap in range(1, laps + 1):
+                state = probability_change(state, lap, laps, 1 if position == 1 else 0)
+                data.append(
+                    {
+                        "circuit": circuit,
+                        "position": position,
+                        "lap_number": lap,
+                        "state": state,
+                    }
+                )
+    return pd.DataFrame(data)
+
+
+def timed(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    results = pd.concat(
+        pd.read_csv(DATA / f"driver-results-{circuit}.csv").assign(circuit=circuit)
+        for circuit in CIRCUITS
+    )
+    total_laps = {
+        circuit: int(pd.read_csv(DATA / f"driver-lap-data-{circuit}.csv")["lap"].max())
+        for circuit in CIRCUITS
+    }
+    params = fit_starting_probability(results)
+    print(params)
+
+    for copies in (1, 12):
+        calendar = pd.concat(
+            params.rename(index=lambda circuit: f"{circuit}-{i}") for i in range(copies)
+        )
+        laps = {
+            f"{circuit}-{i}": total_laps[circuit]
+            for circuit in CIRCUITS
+            for i in range(copies)
+        }
+        loop, loop_seconds = timed(loop_curves, calendar, laps)
+        curves, seconds = timed(win_probability_curves, calendar, laps)
+        pd.testing.assert_frame_equal(
+            curves, loop, check_dtype=False, check_exact=False, rtol=1e-12
+        )
+        print(
+            f"{len(calendar):>3} circuits, {len(curves):>6} states: "
+            f"loop {loop_seconds * 1e3:8.1f} ms, "
+            f"vectorized {seconds * 1e3:6.1f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,215 @@
+import argparse
+import logging
+import sys
+
+
+def add_ingest_parser(subparsers):
+    parser = subparsers.add_parser(
+        "ingest", help="Pre-warm the session cache for one or more seasons"
+    )
+    parser.add_argument("year", type=int, help="First season to ingest")
+    parser.add_argument(
+        "--to", type=int, default=None, help="Last season to ingest (inclusive)"
+    )
+    parser.add_argument(
+        "--sessions",
+        nargs="+",
+        default=None,
+        help="Only ingest these session names, e.g. Qualifying Race",
+    )
+    parser.add_argument("--cache-dir", default="./session-cache")
+    parser.add_argument(
+        "--fastf1-cache", default=None, help="Directory for FastF1's HTTP cache"
+    )
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument(
+        "--skip-failed",
+        action="store_true",
+        help="Don't retry sessions that failed in a previous run",
+    )
+    parser.set_defaults(func=run_ingest)
+
+
+def run_ingest(args, logger):
+    from .ingest import SeasonIngester
+
+    last = args.to if args.to is not None else args.year
+    ingester = SeasonIngester(
+        cache_root=args.cache_dir,
+        workers=args.workers,
+        fastf1_cache=args.fastf1_cache,
+        logger=logger,
+    )
+    summary = ingester.run(
+        range(args.year, last + 1),
+        session_names=args.sessions,
+        retry_failed=not args.skip_failed,
+    )
+
+    print(f"Planned:   {summary['planned']}")
+    print(f"Cached:    {summary['cached']}")
+    print(f"Skipped:   {len(summary['not_retried'])} (failed before, not retried)")
+    print(f"Completed: {summary['completed']}")
+    print(f"Failed:    {len(summary['failed'])}")
+    print(
+        f"Elapsed:   {summary['elapsed']:.1f}s "
+        f"({summary['sessions_per_minute']:.1f} sessions/min, "
+        f"{summary['megabytes_written']:.1f} MB written)"
+    )
+    for unit, error in summary["failed"]:
+        print(f"  {unit}: {error}")
+    return 1 if summary["failed"] else 0
+
+
+def add_metrics_parser(subparsers):
+    parser = subparsers.add_parser(
+        "metrics", help="Build a per-lap track characteristics table for seasons"
+    )
+    parser.add_argument("year", type=int, help="First season to measure")
+    parser.add_argument(
+        "--to", type=int, default=None, help="Last season to measure (inclusive)"
+    )
+    parser.add_argument(
+        "--rounds", type=int, nargs="+", default=None, help="Only these rounds"
+    )
+    parser.add_argument("--session", default="Qualifying")
+    parser.add_argument(
+        "--metrics",
+        nargs="+",
+        default=None,
+        help="Metric names, defaults to every registered metric",
+    )
+    parser.add_argument(
+        "--laps",
+        choices=["fastest", "all"],
+        default="fastest",
+        help="Each driver's fastest lap or every timed lap",
+    )
+    parser.add_argument("--output-dir", default="./track-metrics")
+    parser.add_argument("--cache-dir", default="./session-cache")
+    parser.add_argument(
+        "--fastf1-cache", default=None, help="Directory for FastF1's HTTP cache"
+    )
+    parser.add_argument("--workers", type=int, default=None)
+    parser.set_defaults(func=run_metrics)
+
+
+def run_metrics(args, logger):
+    from .telemetry.metrics import METRICS, track_metrics
+
+    unknown = [name for name in args.metrics or [] if name not in METRICS]
+    if unknown:
+        print(f"Unknown metrics: {', '.join(unknown)}", file=sys.stderr)
+        print(f"Available: {', '.join(METRICS)}", file=sys.stderr)
+        return 2
+
+    last = args.to if args.to is not None else args.year
+    table = track_metrics(
+        range(args.year, last + 1),
+        rounds=args.rounds,
+        session_name=args.session,
+        output_dir=args.output_dir,
+        cache_root=args.cache_dir,
+        metrics=args.metrics,
+        laps=args.laps,
+        workers=args.workers,
+        fastf1_cache=args.fastf1_cache,
+        logger=logger,
+    )
+    sessions = table[["year", "round"]].drop_duplicates() if len(table) else table
+    print(f"Sessions:  {len(sessions)}")
+    print(f"Laps:      {len(table)}")
+    return 0 if len(table) else 1
+
+
+def add_docs_parser(subparsers):
+    parser = subparsers.add_parser(
+        "docs", help="Index and search downloaded FIA decision documents"
+    )
+    parser.add_argument("--docs-dir", default="./fia-docs")
+    parser.add_argument(
+        "--index", default=None, help="Index file, defaults to <docs-dir>/index.sqlite"
+    )
+    commands = parser.add_subparsers(dest="docs_command", required=True)
+
+    index = commands.add_parser("index", help="Add new or changed PDFs to the index")
+    index.add_argument("--workers", type=int, default=None)
+    index.set_defaults(func=run_docs_index)
+
+    search = commands.add_parser("search", help="Full-text search the index")
+    search.add_argument("query")
+    search.add_argument("--season", default=None)
+    search.add_argument("--championship", default=None, help="f1, f2 or f3")
+    search.add_argument("--event", default=None, help="Event key, e.g. bahrain")
+    search.add_argument("--limit", type=int, default=20)
+    search.add_argument(
+        "--raw",
+        action="store_true",
+        help="Pass the query through as an FTS5 expression instead of a phrase",
+    )
+    search.set_defaults(func=run_docs_search)
+
+
+def run_docs_index(args, logger):
+    from .search import DocumentIndex
+
+    index = DocumentIndex(args.docs_dir, args.index, args.workers, logger=logger)
+    summary = index.update()
+
+    print(f"Documents: {summary['documents']}")
+    print(f"Indexed:   {summary['indexed']}")
+    print(f"Removed:   {summary['removed']}")
+    print(f"Failed:    {len(summary['failed'])}")
+    print(f"Elapsed:   {summary['elapsed']:.1f}s")
+    for path, error in summary["failed"]:
+        print(f"  {path}: {error}")
+    return 0
+
+
+def run_docs_search(args, logger):
+    import sqlite3
+
+    from .search import DocumentIndex
+
+    index = DocumentIndex(args.docs_dir, args.index, logger=logger)
+    try:
+        hits = index.search(
+            args.query,
+            limit=args.limit,
+            season=args.season,
+            championship=args.championship,
+            event=args.event,
+            raw=args.raw,
+        )
+    except sqlite3.OperationalError as e:
+        print(f"Invalid query: {e}", file=sys.stderr)
+        return 2
+
+    for hit in hits:
+        print(f"{hit.date}  {hit.season} {hit.championship} {hit.event}  {hit.name}")
+        print(f"    {' '.join(hit.snippet.split())}")
+        print(f"    {hit.path}")
+    return 0 if hits else 1
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="pyburnout")
+    parser.add_argument("-v", "--verbose", action="store_true")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    add_ingest_parser(subparsers)
+    add_metrics_parser(subparsers)
+    add_docs_parser(subparsers)
+
+    args = parser.parse_args(argv)
+
+    logger = logging.Logger("pyburnout")
+    logger.setLevel(logging.INFO if args.verbose else logging.WARNING)
+    console_handler = logging.StreamHandler()
+    console_handler.setFormatter(logging.Formatter(logging.BASIC_FORMAT))
+    logger.addHandler(console_handler)
+
+    return args.func(args, logger)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,20 @@
+from .checkpoint import Checkpoint
+from .research import (
+    PartitionedFetch,
+    driver_gaps,
+    ergast_results,
+    race_results,
+    results_history,
+)
+from .season import SeasonIngester, season_sessions
+
+__all__ = [
+    "Checkpoint",
+    "PartitionedFetch",
+    "driver_gaps",
+    "ergast_results",
+    "race_results",
+    "results_history",
+    "SeasonIngester",
+    "season_sessions",
+]
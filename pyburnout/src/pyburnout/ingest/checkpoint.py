@@ -0,0 +1,61 @@
+import json
+import os
+import threading
+import time
+
+
+class Checkpoint:
+    """Append-only JSON lines record of finished work units.
+
+    Every completed or failed unit is appended and flushed as soon as it
+    finishes, so an interrupted run loses nothing that already completed.
+    The last record for a key wins when the file is read back.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self.records = {}
+
+        if os.path.exists(path):
+            with open(path) as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        # A run killed mid-write can leave a torn last line
+                        continue
+                    self.records[self.key(record["key"])] = record
+
+    @staticmethod
+    def key(unit):
+        return tuple(unit) if isinstance(unit, (list, tuple)) else unit
+
+    def status(self, unit):
+        record = self.records.get(self.key(unit))
+        return record["status"] if record else None
+
+    def is_done(self, unit):
+        return self.status(unit) == "done"
+
+    def record(self, unit, status, **details):
+        key = self.key(unit)
+        record = {
+            "key": list(key) if isinstance(key, tuple) else key,
+            "status": status,
+            "at": time.time(),
+        }
+        record.update(details)
+        with self._lock:
+            self.records[key] = record
+            parent = os.path.dirname(self.path)
+            if parent:
+                os.makedirs(parent, exist_ok=True)
+            with open(self.path, "a") as f:
+                f.write(json.dumps(record, default=str) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+        return record
@@ -0,0 +1,291 @@
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import logging
+import os
+import time
+from pathlib import Path
+
+import fastf1
+import pandas as pd
+import requests
+
+from .checkpoint import Checkpoint
+
+ERGAST_URL = "http://api.jolpi.ca/ergast/f1"
+# Seconds between Ergast requests from one worker process
+ERGAST_INTERVAL = 1.0
+_last_ergast_request = 0.0
+
+
+RESULT_DTYPES = {
+    "year": "int16",
+    "round": "int8",
+    "event": "category",
+    "number": "category",
+    "driver": "category",
+    "constructor": "category",
+    "position": "Int16",
+    "grid": "Int16",
+    "status": "category",
+    "points": "float32",
+}
+
+
+def typed_results(frame: pd.DataFrame):
+    frame = frame.reindex(columns=list(RESULT_DTYPES))
+    for column, dtype in RESULT_DTYPES.items():
+        if dtype.startswith("Int"):
+            frame[column] = pd.to_numeric(frame[column], errors="coerce")
+        frame[column] = frame[column].astype(dtype)
+    return frame
+
+
+def race_results(year, circuit):
+    """Race classification for one event, without laps or telemetry.
+
+    `circuit` is an exact event name, e.g. "Bahrain Grand Prix". Only the
+    results are loaded, which skips the lap, car, position, weather and
+    race control downloads a full `session.load()` makes. Seasons in which
+    the event didn't run give an empty frame.
+    """
+    try:
+        event = fastf1.get_event(year, circuit, exact_match=True)
+    except ValueError:
+        event = None
+    if event is None:
+        return pd.DataFrame()
+
+    session = event.get_race()
+    session.load(laps=False, telemetry=False, weather=False, messages=False)
+    results = session.results
+    return typed_results(
+        pd.DataFrame(
+            {
+                "year": year,
+                "round": int(event["RoundNumber"]),
+                "event": circuit,
+                "number": results["DriverNumber"],
+                "driver": results["DriverId"],
+                "constructor": results["TeamId"],
+                "position": results["Position"],
+                "grid": results["GridPosition"],
+                "status": results["Status"],
+                "points": results["Points"],
+            }
+        ).reset_index(drop=True)
+    )
+
+
+def results_history(
+    events,
+    years,
+    cache_dir="./results-cache",
+    workers=None,
+    fastf1_cache=None,
+    logger: logging.Logger = None,
+):
+    """Race results for every (year, event) pair as one typed frame.
+
+    Each pair is fetched once with `race_results` and cached as its own
+    partition under `cache_dir`, so later calls only fetch what is
+    missing, e.g. the newest season.
+    """
+    fetcher = PartitionedFetch(
+        cache_dir,
+        race_results,
+        workers=workers,
+        fastf1_cache=fastf1_cache,
+        logger=logger,
+    )
+    summary = fetcher.run(years, events)
+    for unit, error in summary["failed"]:
+        fetcher.logger.info(f"No results for {unit}: {error}")
+
+    results = typed_results(fetcher.merge(events))
+    years = [int(year) for year in years]
+    return results[results["year"].isin(years)].reset_index(drop=True)
+
+
+def ergast_results(year, circuit):
+    # `circuit` is an Ergast circuit id, e.g. "bahrain". The mirror is rate
+    # limited, so each worker waits ERGAST_INTERVAL between requests, and an
+    # error response fails the unit rather than being saved as no results.
+    global _last_ergast_request
+    wait = _last_ergast_request + ERGAST_INTERVAL - time.monotonic()
+    if wait > 0:
+        time.sleep(wait)
+    try:
+        response = requests.get(
+            f"{ERGAST_URL}/{year}/circuits/{circuit}/results", timeout=30
+        )
+    finally:
+        _last_ergast_request = time.monotonic()
+    response.raise_for_status()
+    data = response.json()
+    rows = [
+        {
+            "number": result["number"],
+            "driver": result["Driver"]["driverId"],
+            "constructor": result["Constructor"]["constructorId"],
+            "position": result["position"],
+            "grid": result["grid"],
+            "year": year,
+        }
+        for race in data["MRData"]["RaceTable"]["Races"]
+        for result in race["Results"]
+    ]
+    return pd.DataFrame(rows)
+
+
+def driver_gaps(year, circuit):
+    # Gap to the car ahead for every lap of the race, see driver_ahead_laps
+    from ..telemetry.gaps import driver_ahead_laps
+
+    session = fastf1.get_session(year, circuit, "R")
+    session.load()
+    return driver_ahead_laps(session, circuit=circuit)
+
+
+def fetch_partition(fetch, year, circuit, path, fastf1_cache=None):
+    # Runs in a worker process and writes its own partition, so the data
+    # never has to be sent back to the parent
+    if fastf1_cache:
+        os.makedirs(fastf1_cache, exist_ok=True)
+        fastf1.Cache.enable_cache(fastf1_cache)
+    start = time.perf_counter()
+    frame = fetch(year, circuit)
+    if frame is None or frame.empty:
+        return {"seconds": time.perf_counter() - start, "rows": 0}
+
+    path = Path(path)
+    os.makedirs(path.parent, exist_ok=True)
+    tmp_path = path.with_name(f"{path.name}.tmp-{os.getpid()}")
+    frame.to_parquet(tmp_path, index=False)
+    os.replace(tmp_path, path)
+    return {"seconds": time.perf_counter() - start, "rows": len(frame)}
+
+
+class PartitionedFetch:
+    """Fans a research data fetch out over (year, circuit) units.
+
+    `fetch(year, circuit)` must be a module level function returning a
+    DataFrame, so it can run in a process pool. Each unit is written to its
+    own Parquet partition as soon as it finishes and checkpointed, so a
+    failed or interrupted run resumes with only the missing units, and
+    `merge` puts the partitions back together. Fetchers that hit a rate
+    limited API should be run with few workers.
+
+    Units that came back empty (no race that year) are only skipped while
+    that answer can be trusted: never for the last `recent_seasons`
+    seasons, where a race may not have been held yet, and for older ones
+    until the empty result is `empty_max_age` seconds old.
+    """
+
+    def __init__(
+        self,
+        output_dir,
+        fetch,
+        workers=None,
+        fastf1_cache=None,
+        recent_seasons=2,
+        empty_max_age=30 * 24 * 60 * 60,
+        logger: logging.Logger = None,
+    ):
+        self.output_dir = Path(output_dir)
+        self.fetch = fetch
+        self.workers = workers if workers else os.cpu_count()
+        self.fastf1_cache = fastf1_cache
+        self.recent_seasons = recent_seasons
+        self.empty_max_age = empty_max_age
+        self.logger = logger if logger else logging.Logger(__name__)
+        self.checkpoint = Checkpoint(str(self.output_dir / "checkpoint.jsonl"))
+
+    def partition_path(self, year, circuit):
+        slug = str(circuit).lower().replace(" ", "-")
+        return self.output_dir / "parts" / slug / f"{int(year)}.parquet"
+
+    def empty_is_final(self, unit):
+        if int(unit[0]) > time.gmtime().tm_year - self.recent_seasons:
+            return False
+        record = self.checkpoint.records[self.checkpoint.key(unit)]
+        return time.time() - record["at"] < self.empty_max_age
+
+    def pending(self, units, retry_failed=True):
+        pending = []
+        for unit in units:
+            status = self.checkpoint.status(unit)
+            if status == "empty" and self.empty_is_final(unit):
+                continue
+            if status == "done" and self.partition_path(*unit).exists():
+                continue
+            if status == "failed" and not retry_failed:
+                continue
+            pending.append(unit)
+        return pending
+
+    def run(self, years, circuits, retry_failed=True):
+        start = time.perf_counter()
+        units = [(int(year), circuit) for circuit in circuits for year in years]
+        pending = self.pending(units, retry_failed)
+        self.logger.info(
+            f"{len(units)} units planned, {len(units) - len(pending)} already fetched"
+        )
+
+        completed = []
+        failed = []
+        with ProcessPoolExecutor(max_workers=self.workers) as executor:
+            futures = {
+                executor.submit(
+                    fetch_partition,
+                    self.fetch,
+                    *unit,
+                    str(self.partition_path(*unit)),
+                    self.fastf1_cache,
+                ): unit
+                for unit in pending
+            }
+            try:
+                for future in as_completed(futures):
+                    unit = futures[future]
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        self.logger.info(f"Failed {unit}: {e}")
+                        self.checkpoint.record(unit, "failed", error=repr(e))
+                        failed.append((unit, repr(e)))
+                        continue
+                    status = "done" if result["rows"] else "empty"
+                    self.logger.info(
+                        f"Fetched {unit}: {result['rows']} rows in {result['seconds']:.1f}s"
+                    )
+                    self.checkpoint.record(unit, status, **result)
+                    completed.append((unit, result))
+            except KeyboardInterrupt:
+                self.logger.info("Interrupted - finished units are checkpointed")
+                executor.shutdown(wait=False, cancel_futures=True)
+                raise
+
+        elapsed = time.perf_counter() - start
+        return {
+            "planned": len(units),
+            "skipped": len(units) - len(pending),
+            "completed": len(completed),
+            "rows": sum(result["rows"] for _, result in completed),
+            "failed": failed,
+            "elapsed": elapsed,
+            "units_per_minute": len(completed) / elapsed * 60 if elapsed else 0.0,
+        }
+
+    def merge(self, circuits=None):
+        """Every finished partition as one frame, ordered by circuit and year."""
+        if circuits is None:
+            paths = (self.output_dir / "parts").glob("*/*.parquet")
+        else:
+            paths = (
+                path
+                for circuit in circuits
+                for path in self.partition_path(0, circuit).parent.glob("*.parquet")
+            )
+        paths = sorted(paths, key=lambda path: (path.parent.name, int(path.stem)))
+        if not paths:
+            return pd.DataFrame()
+        return pd.concat((pd.read_parquet(path) for path in paths), ignore_index=True)
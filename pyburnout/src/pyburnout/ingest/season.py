@@ -0,0 +1,157 @@
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import logging
+import os
+import time
+
+import fastf1
+import pandas as pd
+
+from ..telemetry.cache import SessionCache
+from .checkpoint import Checkpoint
+
+
+def directory_bytes(path):
+    total = 0
+    for root, _, files in os.walk(path):
+        total += sum(os.path.getsize(os.path.join(root, name)) for name in files)
+    return total
+
+
+def season_sessions(year, session_names=None, include_future=False):
+    """Every (year, round, session name) in a season's schedule.
+
+    Session names come from the schedule itself, so conventional and sprint
+    weekends each get their own list. Sessions that have not started yet
+    are skipped unless `include_future` is set.
+    """
+    schedule = fastf1.get_event_schedule(year, include_testing=False)
+    now = pd.Timestamp.now(tz="UTC")
+    units = []
+    for _, event in schedule.iterrows():
+        for i in range(1, 6):
+            name = event.get(f"Session{i}")
+            if not isinstance(name, str) or not name:
+                continue
+            if session_names and name not in session_names:
+                continue
+            start = pd.Timestamp(event.get(f"Session{i}DateUtc"))
+            if not include_future and not pd.isna(start):
+                if start.tzinfo is None:
+                    start = start.tz_localize("UTC")
+                if start > now:
+                    continue
+            units.append((int(year), int(event["RoundNumber"]), name))
+    return units
+
+
+def ingest_session(cache_root, year, round_number, session_name, fastf1_cache=None):
+    # Runs in a worker process, so everything it needs comes in as arguments
+    if fastf1_cache:
+        os.makedirs(fastf1_cache, exist_ok=True)
+        fastf1.Cache.enable_cache(fastf1_cache)
+    start = time.perf_counter()
+    path = SessionCache(cache_root).build(year, round_number, session_name)
+    return {
+        "seconds": time.perf_counter() - start,
+        "bytes": directory_bytes(path),
+    }
+
+
+class SeasonIngester:
+    """Pre-warms a SessionCache for whole seasons with a process pool.
+
+    Progress is checkpointed per session next to the cache, so a run that
+    is interrupted picks up where it stopped. Sessions already fresh in the
+    cache are skipped as well.
+    """
+
+    def __init__(
+        self,
+        cache_root="./session-cache",
+        workers=None,
+        fastf1_cache=None,
+        logger: logging.Logger = None,
+    ):
+        self.cache = SessionCache(cache_root)
+        self.workers = workers if workers else os.cpu_count()
+        self.fastf1_cache = fastf1_cache
+        self.logger = logger if logger else logging.Logger(__name__)
+        self.checkpoint = Checkpoint(
+            os.path.join(cache_root, "ingest-checkpoint.jsonl")
+        )
+
+    def plan(self, years, session_names=None, include_future=False):
+        units = []
+        for year in years:
+            self.logger.info(f"Reading schedule for {year}")
+            units.extend(season_sessions(year, session_names, include_future))
+        return units
+
+    def classify(self, units, retry_failed=True):
+        """Splits units into pending, cached and failed-but-not-retried."""
+        groups = {"pending": [], "cached": [], "not_retried": []}
+        for unit in units:
+            status = self.checkpoint.status(unit)
+            if status == "done" and self.cache.contains(*unit):
+                groups["cached"].append(unit)
+            elif status == "failed" and not retry_failed:
+                groups["not_retried"].append(unit)
+            elif status is None and self.cache.contains(*unit):
+                self.checkpoint.record(unit, "done", seconds=0, bytes=0)
+                groups["cached"].append(unit)
+            else:
+                groups["pending"].append(unit)
+        return groups
+
+    def pending(self, units, retry_failed=True):
+        return self.classify(units, retry_failed)["pending"]
+
+    def run(self, years, session_names=None, include_future=False, retry_failed=True):
+        start = time.perf_counter()
+        units = self.plan(years, session_names, include_future)
+        groups = self.classify(units, retry_failed)
+        pending = groups["pending"]
+        self.logger.info(
+            f"{len(units)} sessions planned, {len(groups['cached'])} already cached, "
+            f"{len(groups['not_retried'])} failed before and not retried"
+        )
+
+        completed = []
+        failed = []
+        with ProcessPoolExecutor(max_workers=self.workers) as executor:
+            futures = {
+                executor.submit(
+                    ingest_session, str(self.cache.root), *unit, self.fastf1_cache
+                ): unit
+                for unit in pending
+            }
+            try:
+                for future in as_completed(futures):
+                    unit = futures[future]
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        self.logger.info(f"Failed {unit}: {e}")
+                        self.checkpoint.record(unit, "failed", error=repr(e))
+                        failed.append((unit, repr(e)))
+                        continue
+                    self.logger.info(f"Ingested {unit} in {result['seconds']:.1f}s")
+                    self.checkpoint.record(unit, "done", **result)
+                    completed.append((unit, result))
+            except KeyboardInterrupt:
+                self.logger.info("Interrupted - finished sessions are checkpointed")
+                executor.shutdown(wait=False, cancel_futures=True)
+                raise
+
+        elapsed = time.perf_counter() - start
+        written = sum(result["bytes"] for _, result in completed)
+        return {
+            "planned": len(units),
+            "cached": len(groups["cached"]),
+            "not_retried": groups["not_retried"],
+            "completed": len(completed),
+            "failed": failed,
+            "elapsed": elapsed,
+            "sessions_per_minute": len(completed) / elapsed * 60 if elapsed else 0.0,
+            "megabytes_written": written / 1e6,
+        }
@@ -1,4 +1,16 @@
 from .fia import FIASiteScraper
+from .fia_listing import FIADocument, parse_listing
+from .fia_manifest import DownloadManifest
 from .f2 import F2SiteScraper
+from .f2_history import StandingsHistory
+from .browser import BrowserPool
 
-__all__ = ["FIASiteScraper", "F2SiteScraper"]
+__all__ = [
+    "FIASiteScraper",
+    "FIADocument",
+    "parse_listing",
+    "DownloadManifest",
+    "F2SiteScraper",
+    "StandingsHistory",
+    "BrowserPool",
+]
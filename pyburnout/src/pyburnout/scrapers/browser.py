@@ -0,0 +1,98 @@
+from contextlib import contextmanager
+import logging
+import queue
+import threading
+
+
+def headless_chrome():
+    from selenium import webdriver
+
+    options = webdriver.ChromeOptions()
+    options.add_argument("--headless=new")
+    options.add_argument("--disable-gpu")
+    options.add_argument("--blink-settings=imagesEnabled=false")
+    return webdriver.Chrome(options=options)
+
+
+class BrowserPool:
+    """A few WebDriver instances shared between threads.
+
+    Browsers are started on first use, up to `size`, and handed back to the
+    pool after each page instead of being quit. A browser that raised is
+    quit and replaced, since it may be stuck on a broken page.
+    """
+
+    def __init__(self, size=2, factory=headless_chrome, logger: logging.Logger = None):
+        self.size = size
+        self.factory = factory
+        self.logger = logger if logger else logging.Logger(__name__)
+        self._idle = queue.LifoQueue()
+        self._started = 0
+        self._all = []
+        self._lock = threading.Lock()
+
+    def _checkout(self):
+        while True:
+            try:
+                return self._idle.get_nowait()
+            except queue.Empty:
+                pass
+            with self._lock:
+                start = self._started < self.size
+                if start:
+                    self._started += 1
+            if start:
+                break
+            # Wake up now and then, a discarded browser frees a slot
+            # without anything being put back on the queue
+            try:
+                return self._idle.get(timeout=0.5)
+            except queue.Empty:
+                continue
+
+        try:
+            driver = self.factory()
+        except BaseException:
+            with self._lock:
+                self._started -= 1
+            raise
+        with self._lock:
+            self._all.append(driver)
+        self.logger.info(f"Started browser {len(self._all)} of {self.size}")
+        return driver
+
+    def _discard(self, driver):
+        with self._lock:
+            self._started -= 1
+            if driver in self._all:
+                self._all.remove(driver)
+        try:
+            driver.quit()
+        except Exception:
+            pass
+
+    @contextmanager
+    def browser(self):
+        driver = self._checkout()
+        try:
+            yield driver
+        except BaseException:
+            self._discard(driver)
+            raise
+        self._idle.put(driver)
+
+    def close(self):
+        with self._lock:
+            drivers, self._all = self._all, []
+            self._started = 0
+        for driver in drivers:
+            try:
+                driver.quit()
+            except Exception:
+                pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -1,9 +1,137 @@
-from selenium import webdriver
-from selenium.webdriver.common.by import By
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import lxml.html
+import requests
 import logging
 import csv
 import os
 
+from .browser import BrowserPool
+from .f2_history import StandingsHistory
+
+# Elements that start a new line in rendered text, the same breaks
+# WebElement.text puts between them
+BLOCK_TAGS = set("""
+    address article aside blockquote dd div dl dt figcaption figure footer
+    h1 h2 h3 h4 h5 h6 header hr li main nav ol p pre section table tbody td
+    tfoot th thead tr ul
+    """.split())
+SKIPPED_TAGS = {"script", "style", "template", "noscript"}
+
+# Reads the first table's headings and cells in one round trip. Returns
+# null until the table has rows, so it doubles as the wait condition.
+TABLE_SCRIPT = """
+const table = document.querySelector("table");
+if (!table || !table.querySelector("td")) {
+    return null;
+}
+return {
+    headings: Array.from(table.querySelectorAll("th"), th => th.innerText),
+    rows: Array.from(
+        table.querySelectorAll("tr"),
+        tr => Array.from(tr.querySelectorAll("td"), td => td.innerText)
+    ),
+};
+"""
+
+
+def _hidden(element):
+    style = element.get("style", "").replace(" ", "").lower()
+    return element.get("hidden") is not None or "display:none" in style
+
+
+def _source_text(text):
+    # Line breaks in the page source are only whitespace once rendered
+    return text.replace("\r", " ").replace("\n", " ") if text else ""
+
+
+def _collect_text(element, parts):
+    if not isinstance(element.tag, str):
+        # Comments and processing instructions only contribute their tail
+        parts.append(_source_text(element.tail))
+        return
+    if element.tag in SKIPPED_TAGS or _hidden(element):
+        parts.append(_source_text(element.tail))
+        return
+
+    block = element.tag in BLOCK_TAGS
+    if element.tag == "br" or block:
+        parts.append("\n")
+    parts.append(_source_text(element.text))
+    for child in element:
+        _collect_text(child, parts)
+    if block:
+        parts.append("\n")
+    parts.append(_source_text(element.tail))
+
+
+def normalise_text(text):
+    lines = (" ".join(line.split()) for line in text.split("\n"))
+    return "\n".join(line for line in lines if line)
+
+
+def rendered_text(element):
+    """Visible text of an lxml element, laid out like WebElement.text.
+
+    Block elements and <br> break lines, whitespace inside a line collapses
+    and empty lines are dropped.
+    """
+    parts = []
+    _collect_text(element, parts)
+    return normalise_text("".join(parts))
+
+
+def standings_headings(heading_texts):
+    # Round headings read "<round>\n<...>\nSR\nFR" and become one column
+    # per race, every other heading is split on its lines
+    headings = []
+    for text in heading_texts:
+        heading_text = text.split("\n")
+        if "SR" in heading_text:
+            sr_label = f"{heading_text[0]}-{heading_text[2]}"
+            fr_label = f"{heading_text[0]}-{heading_text[3]}"
+            headings.append(sr_label)
+            headings.append(fr_label)
+        else:
+            headings.extend(heading_text)
+    return headings
+
+
+def standings_rows(row_cell_texts):
+    content = []
+    for cell_texts in row_cell_texts:
+        row_data_text = []
+        for text in cell_texts:
+            row_data_text.extend(text.split("\n"))
+        row_data_text = row_data_text[1:]
+        if len(row_data_text) > 0:
+            content.append(row_data_text)
+    return content
+
+
+def parse_standings_html(html):
+    """(headings, rows) of the first table in a standings page.
+
+    Returns None when the page has no populated table, which is what a page
+    that renders its standings with JavaScript looks like.
+    """
+    if not html or not html.strip():
+        return None
+    tree = lxml.html.fromstring(html)
+    tables = tree.xpath("//table")
+    if not tables:
+        return None
+    table = tables[0]
+
+    headings = standings_headings(rendered_text(th) for th in table.iter("th"))
+    content = standings_rows(
+        [rendered_text(td) for td in row.iter("td")] for row in table.iter("tr")
+    )
+    if not content:
+        return None
+    return headings, content
+
 
 class F2SiteScraper:
     SEASON_IDS = {
@@ -18,9 +146,21 @@ class F2SiteScraper:
         2017: 174,
     }
 
-    def __init__(self, dirpath="", logger: logging.Logger = None):
+    def __init__(
+        self,
+        dirpath="",
+        logger: logging.Logger = None,
+        retries=3,
+        backoff_factor=0.5,
+        timeout=30,
+        browsers=2,
+        history: StandingsHistory = None,
+    ):
         self.dirpath = dirpath
         self.logger = logger if logger else logging.Logger(__name__)
+        self.timeout = timeout
+        self.browsers = browsers
+        self.history = history
 
         self.BASE_URL = "https://www.fiaformula2.com"
         self.PATHS = {
@@ -32,6 +172,16 @@ class F2SiteScraper:
             self.logger.info(f"Creating directory: {self.dirpath}")
             os.makedirs(self.dirpath)
 
+        retry = Retry(
+            total=retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=[429, 500, 502, 503, 504],
+            allowed_methods=["GET", "HEAD"],
+        )
+        self.session = requests.Session()
+        self.session.mount("http://", HTTPAdapter(max_retries=retry))
+        self.session.mount("https://", HTTPAdapter(max_retries=retry))
+
     def write_data_to_csv(self, headings, content, filename):
         filepath = f"{self.dirpath}/{filename}"
         with open(filepath, mode="w+", newline="") as file:
@@ -41,90 +191,97 @@ class F2SiteScraper:
             writer.writerow(headings)
             writer.writerows(content)
 
-    def get_driver_standings(self, season=2025):
-        url = f"{self.BASE_URL}/{self.PATHS['driver_standings']}?seasonId={self.SEASON_IDS[season]}"
+    def standings_url(self, table, season):
+        return f"{self.BASE_URL}/{self.PATHS[table]}?seasonId={self.SEASON_IDS[season]}"
 
-        driver = webdriver.Chrome()
-        driver.get(url)
-        driver.implicitly_wait(1)
+    def _standings_http(self, url):
+        try:
+            res = self.session.get(url, timeout=self.timeout)
+            res.raise_for_status()
+        except requests.RequestException as e:
+            self.logger.info(f"Request failed for {url}: {e}")
+            return None
+        return parse_standings_html(res.content)
 
-        standings_table = driver.find_element(by=By.TAG_NAME, value="table")
+    def _standings_selenium(self, url, pool=None):
+        # Only needed when the table is rendered client side
+        from selenium.webdriver.support.ui import WebDriverWait
 
-        headings_elements = standings_table.find_elements(by=By.TAG_NAME, value="th")
+        if pool is None:
+            with BrowserPool(1, logger=self.logger) as pool:
+                return self._standings_selenium(url, pool)
 
-        headings = []
+        with pool.browser() as driver:
+            driver.get(url)
+            table = WebDriverWait(driver, self.timeout, poll_frequency=0.1).until(
+                lambda d: d.execute_script(TABLE_SCRIPT)
+            )
+        headings = standings_headings(normalise_text(th) for th in table["headings"])
+        content = standings_rows(
+            [normalise_text(td) for td in row] for row in table["rows"]
+        )
+        return headings, content
 
-        for heading in headings_elements:
-            heading_text = heading.text.split("\n")
-            if "SR" in heading_text:
-                sr_label = f"{heading_text[0]}-{heading_text[2]}"
-                fr_label = f"{heading_text[0]}-{heading_text[3]}"
-                headings.append(sr_label)
-                headings.append(fr_label)
-            else:
-                headings.extend(heading_text)
+    def get_standings(self, table, season=2025, pool=None):
+        url = self.standings_url(table, season)
+
+        standings = self._standings_http(url)
+        if standings is None:
+            self.logger.info("No standings table in the page HTML - using Selenium")
+            standings = self._standings_selenium(url, pool)
+        headings, content = standings
 
         self.logger.info(headings)
         self.logger.info(len(headings))
+        for row in content:
+            self.logger.info(row)
 
-        rows_elements = standings_table.find_elements(by=By.TAG_NAME, value="tr")
-
-        content = []
-
-        for row in rows_elements:
-            row_data = row.find_elements(by=By.TAG_NAME, value="td")
-            row_data_text = []
-            for data in row_data:
-                row_data_text.extend(data.text.split("\n"))
-            row_data_text = row_data_text[1:]
-            if len(row_data_text) > 0:
-                self.logger.info(row_data_text)
-                content.append(row_data_text)
+        filename = f"f2_{season}_{table}.csv"
+        if self.history is not None:
+            changed = self.history.record(season, table, headings, content)
+            if changed is None and os.path.exists(f"{self.dirpath}/{filename}"):
+                self.logger.info(f"Standings unchanged - {filename}")
+                return headings, content
+        self.write_data_to_csv(headings, content, filename)
+        return headings, content
 
-        driver.quit()
-
-        self.write_data_to_csv(headings, content, f"f2_{season}_driver_standings.csv")
+    def get_driver_standings(self, season=2025):
+        return self.get_standings("driver_standings", season)
 
     def get_team_standings(self, season=2025):
-        url = f"{self.BASE_URL}/{self.PATHS['team_standings']}?seasonId={self.SEASON_IDS[season]}"
-
-        driver = webdriver.Chrome()
-        driver.get(url)
-        driver.implicitly_wait(1)
-
-        standings_table = driver.find_element(by=By.TAG_NAME, value="table")
-
-        headings_elements = standings_table.find_elements(by=By.TAG_NAME, value="th")
-
-        headings = []
-
-        for heading in headings_elements:
-            heading_text = heading.text.split("\n")
-            if "SR" in heading_text:
-                sr_label = f"{heading_text[0]}-{heading_text[2]}"
-                fr_label = f"{heading_text[0]}-{heading_text[3]}"
-                headings.append(sr_label)
-                headings.append(fr_label)
-            else:
-                headings.extend(heading_text)
-
-        self.logger.info(headings)
-        self.logger.info(len(headings))
-
-        rows_elements = standings_table.find_elements(by=By.TAG_NAME, value="tr")
-
-        content = []
+        return self.get_standings("team_standings", season)
 
-        for row in rows_elements:
-            row_data = row.find_elements(by=By.TAG_NAME, value="td")
-            row_data_text = []
-            for data in row_data:
-                row_data_text.extend(data.text.split("\n"))
-            row_data_text = row_data_text[1:]
-            if len(row_data_text) > 0:
-                self.logger.info(row_data_text)
-                content.append(row_data_text)
+    def scrape_standings(
+        self,
+        seasons=None,
+        tables=("driver_standings", "team_standings"),
+        workers=4,
+    ):
+        """Scrapes every season x table pair concurrently.
 
-        driver.quit()
+        Pages that need JavaScript share a pool of at most `browsers`
+        headless browsers, which is only started if one is needed. Returns
+        {(season, table): (headings, rows)} and the pairs that failed.
+        """
+        seasons = seasons if seasons else list(self.SEASON_IDS)
+        jobs = [(season, table) for season in seasons for table in tables]
 
-        self.write_data_to_csv(headings, content, f"f2_{season}_team_standings.csv")
+        standings = {}
+        failed = []
+        with BrowserPool(self.browsers, logger=self.logger) as pool:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                futures = {
+                    executor.submit(self.get_standings, table, season, pool): (
+                        season,
+                        table,
+                    )
+                    for season, table in jobs
+                }
+                for future in as_completed(futures):
+                    job = futures[future]
+                    try:
+                        standings[job] = future.result()
+                    except Exception as e:
+                        self.logger.info(f"Failed {job}: {e}")
+                        failed.append((job, repr(e)))
+        return standings, failed
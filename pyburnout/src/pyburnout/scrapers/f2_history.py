@@ -0,0 +1,217 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+import pandas as pd
+
+
+def _int(text):
+    try:
+        return int(text)
+    except (TypeError, ValueError):
+        return None
+
+
+def _number(text):
+    try:
+        return float(text)
+    except (TypeError, ValueError):
+        return None
+
+
+def standings_digest(headings, rows):
+    return hashlib.sha256(json.dumps([headings, rows]).encode()).hexdigest()
+
+
+def typed_rows(table, headings, rows):
+    # Position, name and total points are the stable columns of both tables.
+    # The per-round cells in between drop blanks when read, so they are kept
+    # as they came.
+    team_column = (
+        headings.index("Team")
+        if table == "driver_standings" and "Team" in headings[:3]
+        else None
+    )
+    first_result = 2 if team_column is None else 3
+    typed = []
+    for row in rows:
+        if len(row) < 2:
+            continue
+        typed.append(
+            {
+                "position": _int(row[0]),
+                "name": row[1],
+                "team": (
+                    row[team_column]
+                    if team_column is not None and team_column < len(row)
+                    else None
+                ),
+                "points": _number(row[-1]),
+                "results": json.dumps(row[first_result:-1]),
+            }
+        )
+    return typed
+
+
+class StandingsHistory:
+    """Append-only SQLite history of F2 standings snapshots.
+
+    A snapshot is only written when a table differs from the last one
+    recorded for that season, so polling an unchanged table is one indexed
+    read. Rows are stored typed (position, points) alongside the names, so
+    points-over-time queries don't need to read any CSV.
+    """
+
+    def __init__(self, path="./f2-data/standings.sqlite"):
+        self.path = path
+        parent = os.path.dirname(path)
+        if parent:
+            os.makedirs(parent, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.row_factory = sqlite3.Row
+        with self._connection:
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute(
+                """
+                CREATE TABLE IF NOT EXISTS snapshots (
+                    id INTEGER PRIMARY KEY,
+                    season INTEGER NOT NULL,
+                    standings TEXT NOT NULL,
+                    scraped_at REAL NOT NULL,
+                    digest TEXT NOT NULL,
+                    headings TEXT NOT NULL
+                )
+                """
+            )
+            self._connection.execute(
+                """
+                CREATE TABLE IF NOT EXISTS standings (
+                    snapshot_id INTEGER NOT NULL REFERENCES snapshots (id),
+                    position INTEGER,
+                    name TEXT NOT NULL,
+                    team TEXT,
+                    points REAL,
+                    results TEXT
+                )
+                """
+            )
+            self._connection.execute(
+                """
+                CREATE INDEX IF NOT EXISTS snapshots_by_table
+                ON snapshots (standings, season, id)
+                """
+            )
+            self._connection.execute(
+                """
+                CREATE INDEX IF NOT EXISTS standings_by_name
+                ON standings (name, snapshot_id)
+                """
+            )
+
+    def record(self, season, table, headings, rows, scraped_at=None):
+        """Appends a snapshot, returning its id, or None if nothing changed."""
+        digest = standings_digest(headings, rows)
+        with self._lock, self._connection:
+            row = self._connection.execute(
+                """
+                SELECT digest FROM snapshots
+                WHERE standings = ? AND season = ?
+                ORDER BY id DESC LIMIT 1
+                """,
+                (table, int(season)),
+            ).fetchone()
+            if row is not None and row["digest"] == digest:
+                return None
+
+            cursor = self._connection.execute(
+                """
+                INSERT INTO snapshots (season, standings, scraped_at, digest, headings)
+                VALUES (?, ?, ?, ?, ?)
+                """,
+                (
+                    int(season),
+                    table,
+                    scraped_at if scraped_at is not None else time.time(),
+                    digest,
+                    json.dumps(headings),
+                ),
+            )
+            snapshot_id = cursor.lastrowid
+            self._connection.executemany(
+                """
+                INSERT INTO standings
+                    (snapshot_id, position, name, team, points, results)
+                VALUES (:snapshot_id, :position, :name, :team, :points, :results)
+                """,
+                [
+                    {"snapshot_id": snapshot_id, **row}
+                    for row in typed_rows(table, headings, rows)
+                ],
+            )
+        return snapshot_id
+
+    def _query(self, sql, params):
+        with self._lock:
+            frame = pd.read_sql_query(sql, self._connection, params=params)
+        frame["scraped_at"] = pd.to_datetime(frame["scraped_at"], unit="s", utc=True)
+        return frame
+
+    def points_over_time(self, name, table="driver_standings", seasons=None):
+        """Every recorded position and points total for one driver or team."""
+        params = [name, table]
+        season_filter = ""
+        if seasons is not None:
+            seasons = [int(season) for season in seasons]
+            season_filter = f"AND s.season IN ({', '.join('?' * len(seasons))})"
+            params.extend(seasons)
+        return self._query(
+            f"""
+            SELECT s.season, s.scraped_at, r.position, r.points, r.team
+            FROM standings r
+            JOIN snapshots s ON s.id = r.snapshot_id
+            WHERE r.name = ? AND s.standings = ? {season_filter}
+            ORDER BY s.season, s.scraped_at
+            """,
+            params,
+        )
+
+    def latest(self, season, table="driver_standings"):
+        return self._query(
+            """
+            SELECT s.season, s.scraped_at, r.position, r.name, r.team, r.points
+            FROM standings r
+            JOIN snapshots s ON s.id = r.snapshot_id
+            WHERE s.id = (
+                SELECT id FROM snapshots
+                WHERE standings = ? AND season = ?
+                ORDER BY id DESC LIMIT 1
+            )
+            ORDER BY r.position
+            """,
+            [table, int(season)],
+        )
+
+    def snapshots(self, season=None, table=None):
+        filters = []
+        params = []
+        if season is not None:
+            filters.append("season = ?")
+            params.append(int(season))
+        if table is not None:
+            filters.append("standings = ?")
+            params.append(table)
+        where = f"WHERE {' AND '.join(filters)}" if filters else ""
+        return self._query(
+            f"SELECT id, season, standings, scraped_at, digest FROM snapshots {where} "
+            "ORDER BY id",
+            params,
+        )
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
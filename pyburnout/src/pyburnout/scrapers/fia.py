@@ -1,16 +1,66 @@
-from bs4 import BeautifulSoup
-from urllib.parse import quote
-from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from urllib.parse import quote, urlparse
+from urllib3.util.retry import Retry
+from requests.adapters import HTTPAdapter
 import requests
+import hashlib
 import os
 import logging
+import shutil
+import threading
+import time
+
+from .fia_listing import declared_charset, parse_listing
+from .fia_manifest import DownloadManifest
+
+
+class TransferStats:
+    """Bytes and documents transferred during one scraper run."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.bytes = 0
+        self.documents = 0
+        self.resumed = 0
+        self._lock = threading.Lock()
+
+    def add_bytes(self, count):
+        with self._lock:
+            self.bytes += count
+
+    def add_document(self, resumed=False):
+        with self._lock:
+            self.documents += 1
+            self.resumed += 1 if resumed else 0
+
+    def report(self):
+        elapsed = time.perf_counter() - self.started
+        return {
+            "documents": self.documents,
+            "resumed": self.resumed,
+            "megabytes": self.bytes / 1e6,
+            "seconds": elapsed,
+            "megabytes_per_second": self.bytes / 1e6 / elapsed if elapsed else 0.0,
+        }
 
 
 class FIASiteScraper:
-    def __init__(self, logger: logging.Logger = None):
-        self.BASE_URL = "https://www.fia.com"
+    def __init__(
+        self,
+        logger: logging.Logger = None,
+        base_url="https://www.fia.com",
+        docs_path="./fia-docs",
+        workers=8,
+        max_per_host=4,
+        retries=3,
+        backoff_factor=0.5,
+        timeout=30,
+        manifest_path=None,
+        chunk_size=1 << 16,
+    ):
+        self.BASE_URL = base_url
         self.DOCUMENT_PATH = "documents/list"
-        self.BASE_DOCS_PATH = "./fia-docs"
+        self.BASE_DOCS_PATH = docs_path
 
         self.SEASON_PATHS = {
             "2024": "season-2024-2043",
@@ -65,80 +115,290 @@ class FIASiteScraper:
 
         self.logger = logger if logger else logging.Logger(__name__)
 
+        self.workers = workers
+        self.max_per_host = max_per_host
+        self.timeout = timeout
+        self.chunk_size = chunk_size
+        self.stats = TransferStats()
+        self.session = self._create_session(retries, backoff_factor)
+        self._host_limits = {}
+        self._host_limits_lock = threading.Lock()
+        self.manifest = DownloadManifest(
+            manifest_path if manifest_path else f"{self.BASE_DOCS_PATH}/manifest.sqlite"
+        )
+
+    def _create_session(self, retries, backoff_factor):
+        # One pooled session for every listing page and PDF, retrying
+        # throttling and server errors with exponential backoff
+        retry = Retry(
+            total=retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=[429, 500, 502, 503, 504],
+            allowed_methods=["GET", "HEAD"],
+        )
+        adapter = HTTPAdapter(
+            pool_connections=self.max_per_host,
+            pool_maxsize=max(self.workers, self.max_per_host),
+            max_retries=retry,
+        )
+        session = requests.Session()
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        return session
+
+    def _host_limit(self, url):
+        host = urlparse(url).netloc
+        with self._host_limits_lock:
+            if host not in self._host_limits:
+                self._host_limits[host] = threading.BoundedSemaphore(
+                    self.max_per_host
+                )
+            return self._host_limits[host]
+
+    def _get(self, url, **kwargs):
+        with self._host_limit(url):
+            response = self.session.get(url, timeout=self.timeout, **kwargs)
+        response.raise_for_status()
+        return response
+
+    def _file_digest(self, path):
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(self.chunk_size), b""):
+                digest.update(chunk)
+        return digest
+
+    def _stream_document(self, url, file_path, headers):
+        # Streams into <file>.part and renames it into place once complete,
+        # so an interrupted download is never mistaken for a finished one.
+        # A part file left behind is resumed with a Range request, guarded
+        # by If-Range so a document that changed meanwhile starts over.
+        part_path = f"{file_path}.part"
+        headers = dict(headers)
+        partial = self.manifest.partial(url)
+        offset = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+        validator = partial and (partial["etag"] or partial["last_modified"])
+        if offset and validator:
+            headers["Range"] = f"bytes={offset}-"
+            headers["If-Range"] = validator
+
+        with self._host_limit(url):
+            with self.session.get(
+                url, headers=headers, stream=True, timeout=self.timeout
+            ) as response:
+                if response.status_code == 416:
+                    # The part file does not fit the document, start over
+                    os.remove(part_path)
+                    self.manifest.clear_partial(url)
+                    return None
+                response.raise_for_status()
+                if response.status_code == 304:
+                    return response
+
+                resumed = response.status_code == 206
+                if resumed:
+                    self.logger.info(f"Resuming at {offset} bytes")
+                    digest = self._file_digest(part_path)
+                else:
+                    offset = 0
+                    digest = hashlib.sha256()
+                    self.manifest.record_partial(
+                        url,
+                        response.headers.get("ETag"),
+                        response.headers.get("Last-Modified"),
+                    )
+
+                size = offset
+                with open(part_path, "ab" if resumed else "wb") as f:
+                    for chunk in response.iter_content(self.chunk_size):
+                        f.write(chunk)
+                        digest.update(chunk)
+                        size += len(chunk)
+                        self.stats.add_bytes(len(chunk))
+                    f.flush()
+                    os.fsync(f.fileno())
+
+        os.replace(part_path, file_path)
+        self.manifest.clear_partial(url)
+        self.manifest.record_document(
+            url,
+            file_path,
+            response.headers.get("ETag"),
+            response.headers.get("Last-Modified"),
+            size,
+            digest.hexdigest(),
+        )
+        self.stats.add_document(resumed)
+        return response
+
+    def _adopt_existing(self, url, file_path):
+        # A file from before the manifest is only recorded if it is a whole
+        # PDF: not empty, starting with the PDF header and as long as the
+        # server says the document is. The old scraper wrote straight to
+        # the final path, so truncated files are common.
+        size = os.path.getsize(file_path)
+        if size == 0:
+            return False
+        with open(file_path, "rb") as f:
+            if f.read(4) != b"%PDF":
+                return False
+
+        with self._host_limit(url):
+            response = self.session.head(
+                url, allow_redirects=True, timeout=self.timeout
+            )
+        response.raise_for_status()
+        length = response.headers.get("Content-Length")
+        if length is None or int(length) != size:
+            return False
+
+        self.manifest.record_document(
+            url,
+            file_path,
+            response.headers.get("ETag"),
+            response.headers.get("Last-Modified"),
+            size,
+            self._file_digest(file_path).hexdigest(),
+        )
+        return True
+
+    def listing_url(
+        self, current_season: str, current_championship: str, current_event: str
+    ):
+        return f"{self.BASE_URL}/{self.DOCUMENT_PATH}/season/{self.SEASON_PATHS.get(current_season)}/championships/{self.CHAMPIONSHIP_PATHS.get(current_championship)}/event/{quote(self.EVENT_PATHS.get(current_event))}"
+
     def download_documents(
         self, current_season: str, current_championship: str, current_event: str
+    ):
+        for document in self.list_documents(
+            current_season, current_championship, current_event
+        ):
+            self.download_document(*document)
+
+    def list_documents(
+        self, current_season: str, current_championship: str, current_event: str
     ):
         self.logger.info("Beginning Scraping of Documents")
         self.logger.info(f"Season: {current_season}")
         self.logger.info(f"Championship: {current_championship}")
         self.logger.info(f"Event: {current_event}")
-        url = f"{self.BASE_URL}/{self.DOCUMENT_PATH}/season/{self.SEASON_PATHS.get(current_season)}/championships/{self.CHAMPIONSHIP_PATHS.get(current_championship)}/event/{quote(self.EVENT_PATHS.get(current_event))}"
+        url = self.listing_url(current_season, current_championship, current_event)
         self.logger.info(f"URL: {url}")
 
-        html_content = requests.get(url).content
-
-        soup = BeautifulSoup(html_content, "html.parser")
-
-        documents = soup.find_all("div", class_="node-decision-document")
-        li_flag = False
+        record = self.manifest.listing(url)
+        response = self._get(url, headers=DownloadManifest.conditional_headers(record))
+        if response.status_code == 304 and record is not None:
+            self.logger.info("Listing Unchanged")
+            return record["documents"]
 
+        docs_folder = f"{self.BASE_DOCS_PATH}/{current_season}/{current_championship}/{current_event}"
+        documents = parse_listing(
+            response.content,
+            self.BASE_URL,
+            encoding=declared_charset(response.headers.get("Content-Type")),
+        )
         if len(documents) == 0:
-            documents = soup.find_all("li", class_="document-row")
-            if len(documents) == 0:
-                self.logger.info("No Documents Found")
-            else:
-                li_flag = True
+            self.logger.info("No Documents Found")
 
+        listed = []
         for document in documents:
-            inner_element = document.find("a")
-            if not inner_element:
-                continue
-            site_link = inner_element.get("href")
-
-            name_element = (
-                inner_element.find("div", class_="title")
-                if li_flag
-                else inner_element.find("div", class_="field-name-title-field").find(
-                    "div", class_="field-item"
-                )
-            )
+            doc_date = document.date.strftime("%Y-%m-%d")
+            self.logger.info(f"Document Name: {document.name}")
+            self.logger.info(f"Published Date: {doc_date}")
 
-            published_element = (
-                inner_element.find("div", class_="published")
-                if li_flag
-                else inner_element.find("div", class_="field-name-field-published-date").find(
-                    "div", class_="field-item"
-                )
-            ).find("span", class_="date-display-single")
+            file_path = f"{docs_folder}/{doc_date}-{document.name}.pdf"
+            listed.append((document.url, file_path))
 
-            doc_name = name_element.get_text().strip()
+        self.manifest.record_listing(
+            url,
+            response.headers.get("ETag"),
+            response.headers.get("Last-Modified"),
+            listed,
+        )
+        return listed
 
-            published_date_text = published_element.get_text().split(" ")[0].strip()
-            self.logger.info(f"Published Date: {published_date_text}")
-            doc_date = datetime.strptime(published_date_text, "%d.%m.%y").strftime(
-                "%Y-%m-%d"
-            )
+    def download_document(self, url, file_path):
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
 
-            self.logger.info(f"Document Name: {doc_name}")
-            self.logger.info(f"Published Date: {doc_date}")
+        self.logger.info(f"Writing File - {os.path.basename(file_path)}")
 
-            docs_folder = f"{self.BASE_DOCS_PATH}/{current_season}/{current_championship}/{current_event}"
+        record = self.manifest.document(url)
+        headers = {}
+        if record is not None and os.path.exists(record["path"]):
+            if os.path.exists(file_path):
+                self.logger.info("File Exists - Skipping")
+                return False
+            if os.path.dirname(record["path"]) != os.path.dirname(file_path):
+                # Listed under another event as well, nothing new to fetch
+                shutil.copyfile(record["path"], file_path)
+                return False
+            # Same URL listed under a new title or date: move the file and
+            # only fetch it again if the server says the content changed
+            self.logger.info(f"Document Renamed - {record['path']}")
+            os.replace(record["path"], file_path)
+            self.manifest.move_document(url, file_path)
+            headers = DownloadManifest.conditional_headers(record)
+        elif record is None and os.path.exists(file_path):
+            # Downloaded before the manifest existed, possibly cut short
+            if self._adopt_existing(url, file_path):
+                self.logger.info("File Exists - Skipping")
+                return False
+            self.logger.info("Existing File Incomplete - Downloading Again")
+            os.remove(file_path)
 
-            os.makedirs(docs_folder, exist_ok=True)
+        doc_res = self._stream_document(url, file_path, headers)
+        if doc_res is None:
+            doc_res = self._stream_document(url, file_path, headers)
+        if doc_res.status_code == 304:
+            self.logger.info("Document Unchanged")
+            return False
+        return True
 
-            self.logger.info(f"Writing File - {doc_date}-{doc_name}.pdf")
+    def bulk_download_all_documents(self, year="2024", workers=None):
+        workers = workers if workers else self.workers
+        events = [
+            (year, championship_key, event_key)
+            for championship_key in dict.keys(self.CHAMPIONSHIP_PATHS)
+            for event_key in dict.keys(self.EVENT_PATHS)
+        ]
 
-            file_path = f"{docs_folder}/{doc_date}-{doc_name}.pdf"
+        self.stats = TransferStats()
 
-            if os.path.exists(file_path):
-                self.logger.info("File Exists - Skipping")
-                continue
+        # Listing pages feed the download pool as each one is parsed, so
+        # PDFs start downloading while other listings are still in flight
+        downloaded = 0
+        failed = []
+        listing_pool = ThreadPoolExecutor(max_workers=workers)
+        download_pool = ThreadPoolExecutor(max_workers=workers)
+        with listing_pool, download_pool:
+            listings = {
+                listing_pool.submit(self.list_documents, *event): event
+                for event in events
+            }
+            downloads = {}
+            for listing in as_completed(listings):
+                try:
+                    documents = listing.result()
+                except Exception as e:
+                    self.logger.info(f"Listing failed for {listings[listing]}: {e}")
+                    failed.append(listings[listing])
+                    continue
+                for document in documents:
+                    downloads[
+                        download_pool.submit(self.download_document, *document)
+                    ] = document
 
-            with open(file_path, "wb") as f:
-                doc_res = requests.get(f"{self.BASE_URL}{site_link}")
-                f.write(doc_res.content)
+            for download in as_completed(downloads):
+                try:
+                    downloaded += 1 if download.result() else 0
+                except Exception as e:
+                    self.logger.info(f"Download failed for {downloads[download]}: {e}")
+                    failed.append(downloads[download])
 
-    def bulk_download_all_documents(self, year="2024"):
-        for championship_key in dict.keys(self.CHAMPIONSHIP_PATHS):
-            for event_key in dict.keys(self.EVENT_PATHS):
-                self.download_documents(year, championship_key, event_key)
+        report = self.stats.report()
+        self.logger.info(f"Downloaded {downloaded} documents, {len(failed)} failures")
+        self.logger.info(
+            f"Transferred {report['megabytes']:.1f} MB in {report['seconds']:.1f}s "
+            f"({report['megabytes_per_second']:.2f} MB/s, {report['resumed']} resumed)"
+        )
+        return downloaded, failed
@@ -0,0 +1,196 @@
+from datetime import datetime
+from email.message import Message
+from typing import NamedTuple
+from urllib.parse import urljoin
+import codecs
+import logging
+import re
+
+from bs4 import BeautifulSoup
+
+try:
+    import lxml.html
+    from lxml import etree
+except ImportError:  # pragma: no cover - lxml is a declared dependency
+    lxml = None
+
+logger = logging.getLogger(__name__)
+
+
+class FIADocument(NamedTuple):
+    name: str
+    published: datetime
+    url: str
+
+    @property
+    def date(self):
+        return self.published.date()
+
+
+def _has_class(name):
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+
+# The two layouts the FIA listing pages have used. Rows are matched
+# directly and the expressions are compiled once, so nothing outside the
+# document list is walked in Python.
+def _xpath(expression):
+    return etree.XPath(expression) if lxml is not None else None
+
+
+DIV_ROWS = _xpath(f"//div[{_has_class('node-decision-document')}]")
+LI_ROWS = _xpath(f"//li[{_has_class('document-row')}]")
+ROW_LINK = _xpath("(.//a[@href])[1]")
+DIV_NAME = _xpath(
+    f".//div[{_has_class('field-name-title-field')}]"
+    f"//div[{_has_class('field-item')}][1]"
+)
+DIV_PUBLISHED = _xpath(
+    f".//div[{_has_class('field-name-field-published-date')}]"
+    f"//span[{_has_class('date-display-single')}][1]"
+)
+LI_NAME = _xpath(f".//div[{_has_class('title')}][1]")
+LI_PUBLISHED = _xpath(
+    f".//div[{_has_class('published')}]"
+    f"//span[{_has_class('date-display-single')}][1]"
+)
+
+
+def parse_published(text):
+    # "02.03.24 17:31" - the time is missing on some older documents
+    parts = text.split()
+    try:
+        return datetime.strptime(" ".join(parts[:2]), "%d.%m.%y %H:%M")
+    except ValueError:
+        return datetime.strptime(parts[0], "%d.%m.%y")
+
+
+def _record(base_url, href, name, published):
+    if not href or name is None or published is None:
+        return None
+    try:
+        published = parse_published(published)
+    except (ValueError, IndexError):
+        logger.info(f"Unreadable publish date {published!r} for {href}")
+        return None
+    return FIADocument(name.strip(), published, urljoin(base_url, href))
+
+
+META_CHARSET = re.compile(rb"""<meta[^>]+charset=["']?([\w.:-]+)""", re.IGNORECASE)
+
+
+def declared_charset(content_type):
+    # Only a charset the server actually sent; requests' response.encoding
+    # falls back to ISO-8859-1 for any text/* response without one
+    if not content_type:
+        return None
+    message = Message()
+    message["Content-Type"] = content_type
+    return message.get_param("charset")
+
+
+def decode_listing(html, encoding=None):
+    """Listing page text, decoded the way a browser would.
+
+    The HTTP charset comes first, then a <meta> declaration near the top of
+    the page, then UTF-8 with Windows-1252 as the last resort. lxml reads
+    undeclared bytes as Latin-1, which turns "São Paulo" into "SÃ£o Paulo"
+    in document names and file paths.
+    """
+    if isinstance(html, str):
+        return html
+    meta = META_CHARSET.search(html[:4096])
+    candidates = [encoding, meta.group(1).decode("ascii") if meta else None, "utf-8"]
+    for candidate in candidates:
+        if not candidate:
+            continue
+        try:
+            return html.decode(codecs.lookup(candidate).name)
+        except (LookupError, UnicodeDecodeError):
+            continue
+    return html.decode("windows-1252", errors="replace")
+
+
+def parse_listing(html, base_url="https://www.fia.com", encoding=None):
+    """Documents on an FIA listing page, in page order.
+
+    Uses lxml and XPath restricted to the document rows. Bytes are decoded
+    first (see `decode_listing`), with `encoding` being the charset the
+    server declared, if any. Falls back to the BeautifulSoup parser when
+    lxml is not installed.
+    """
+    html = decode_listing(html, encoding)
+    if lxml is None:
+        return parse_listing_soup(html, base_url)
+    if not html or not html.strip():
+        return []
+
+    tree = lxml.html.fromstring(html)
+    rows = DIV_ROWS(tree)
+    name_path, published_path = DIV_NAME, DIV_PUBLISHED
+    if not rows:
+        rows = LI_ROWS(tree)
+        name_path, published_path = LI_NAME, LI_PUBLISHED
+
+    documents = []
+    for row in rows:
+        links = ROW_LINK(row)
+        if not links:
+            continue
+        link = links[0]
+        name = name_path(link)
+        published = published_path(link)
+        document = _record(
+            base_url,
+            link.get("href"),
+            name[0].text_content() if name else None,
+            published[0].text_content() if published else None,
+        )
+        if document is not None:
+            documents.append(document)
+    return documents
+
+
+def parse_listing_soup(html, base_url="https://www.fia.com"):
+    # The original html.parser walk, kept as the fallback and as the
+    # reference the benchmark checks parse_listing against
+    soup = BeautifulSoup(html, "html.parser")
+
+    rows = soup.find_all("div", class_="node-decision-document")
+    li_flag = False
+    if len(rows) == 0:
+        rows = soup.find_all("li", class_="document-row")
+        li_flag = True
+
+    documents = []
+    for row in rows:
+        inner_element = row.find("a")
+        if not inner_element:
+            continue
+
+        if li_flag:
+            name_element = inner_element.find("div", class_="title")
+            published_element = inner_element.find("div", class_="published")
+        else:
+            name_element = inner_element.find("div", class_="field-name-title-field")
+            published_element = inner_element.find(
+                "div", class_="field-name-field-published-date"
+            )
+            if name_element:
+                name_element = name_element.find("div", class_="field-item")
+            if published_element:
+                published_element = published_element.find("div", class_="field-item")
+        if published_element:
+            published_element = published_element.find(
+                "span", class_="date-display-single"
+            )
+
+        document = _record(
+            base_url,
+            inner_element.get("href"),
+            name_element.get_text() if name_element else None,
+            published_element.get_text() if published_element else None,
+        )
+        if document is not None:
+            documents.append(document)
+    return documents
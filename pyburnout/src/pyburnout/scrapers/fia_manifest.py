@@ -0,0 +1,146 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+
+
+class DownloadManifest:
+    """SQLite record of FIA listing pages and downloaded documents.
+
+    Listings keep their ETag/Last-Modified validators and the documents
+    they contained, so an unchanged listing costs one conditional request.
+    Documents are keyed by URL and keep their validators, size, SHA-256 and
+    local path, which is how renamed or re-issued documents are told apart.
+    Interrupted downloads keep the validators of the response they came
+    from, so they can be resumed with If-Range.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        parent = os.path.dirname(path)
+        if parent:
+            os.makedirs(parent, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.row_factory = sqlite3.Row
+        with self._connection:
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute(
+                """
+                CREATE TABLE IF NOT EXISTS listings (
+                    url TEXT PRIMARY KEY,
+                    etag TEXT,
+                    last_modified TEXT,
+                    documents TEXT NOT NULL,
+                    fetched_at REAL NOT NULL
+                )
+                """
+            )
+            self._connection.execute(
+                """
+                CREATE TABLE IF NOT EXISTS documents (
+                    url TEXT PRIMARY KEY,
+                    path TEXT NOT NULL,
+                    etag TEXT,
+                    last_modified TEXT,
+                    size INTEGER,
+                    sha256 TEXT,
+                    downloaded_at REAL NOT NULL
+                )
+                """
+            )
+            self._connection.execute(
+                """
+                CREATE TABLE IF NOT EXISTS partials (
+                    url TEXT PRIMARY KEY,
+                    etag TEXT,
+                    last_modified TEXT
+                )
+                """
+            )
+
+    @staticmethod
+    def conditional_headers(record):
+        headers = {}
+        if record is None:
+            return headers
+        if record["etag"]:
+            headers["If-None-Match"] = record["etag"]
+        if record["last_modified"]:
+            headers["If-Modified-Since"] = record["last_modified"]
+        return headers
+
+    def listing(self, url):
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT * FROM listings WHERE url = ?", (url,)
+            ).fetchone()
+        if row is None:
+            return None
+        record = dict(row)
+        record["documents"] = [tuple(d) for d in json.loads(record["documents"])]
+        return record
+
+    def record_listing(self, url, etag, last_modified, documents):
+        with self._lock, self._connection:
+            self._connection.execute(
+                """
+                INSERT OR REPLACE INTO listings
+                    (url, etag, last_modified, documents, fetched_at)
+                VALUES (?, ?, ?, ?, ?)
+                """,
+                (url, etag, last_modified, json.dumps(documents), time.time()),
+            )
+
+    def document(self, url):
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT * FROM documents WHERE url = ?", (url,)
+            ).fetchone()
+        return dict(row) if row else None
+
+    def record_document(self, url, path, etag, last_modified, size, sha256):
+        with self._lock, self._connection:
+            self._connection.execute(
+                """
+                INSERT OR REPLACE INTO documents
+                    (url, path, etag, last_modified, size, sha256, downloaded_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                """,
+                (url, path, etag, last_modified, size, sha256, time.time()),
+            )
+
+    def move_document(self, url, path):
+        with self._lock, self._connection:
+            self._connection.execute(
+                "UPDATE documents SET path = ? WHERE url = ?", (path, url)
+            )
+
+    def partial(self, url):
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT * FROM partials WHERE url = ?", (url,)
+            ).fetchone()
+        return dict(row) if row else None
+
+    def record_partial(self, url, etag, last_modified):
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO partials (url, etag, last_modified) VALUES (?, ?, ?)",
+                (url, etag, last_modified),
+            )
+
+    def clear_partial(self, url):
+        with self._lock, self._connection:
+            self._connection.execute("DELETE FROM partials WHERE url = ?", (url,))
+
+    def documents(self):
+        with self._lock:
+            rows = self._connection.execute("SELECT * FROM documents").fetchall()
+        return [dict(row) for row in rows]
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
@@ -0,0 +1,3 @@
+from .index import DocumentIndex, SearchHit, document_metadata
+
+__all__ = ["DocumentIndex", "SearchHit", "document_metadata"]
@@ -0,0 +1,281 @@
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import NamedTuple
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+
+from pypdf import PdfReader
+
+DATE_PREFIX = re.compile(r"^(\d{4}-\d{2}-\d{2})-(.*)$")
+
+
+class SearchHit(NamedTuple):
+    path: str
+    name: str
+    date: str
+    season: str
+    championship: str
+    event: str
+    snippet: str
+    rank: float
+
+
+def extract_text(path):
+    # Runs in a worker process, so it only takes and returns plain values
+    try:
+        reader = PdfReader(path)
+        pages = [page.extract_text() or "" for page in reader.pages]
+    except Exception as e:
+        return path, None, 0, repr(e)
+    return path, "\n".join(pages), len(pages), None
+
+
+def document_metadata(root, path):
+    """Season, championship, event, date and name from a scraper path.
+
+    FIASiteScraper lays documents out as
+    <root>/<season>/<championship>/<event>/<YYYY-MM-DD>-<name>.pdf; anything
+    that doesn't fit is still indexed, with the missing fields left empty.
+    """
+    parts = os.path.relpath(path, root).split(os.sep)
+    folders = (parts[:-1] + ["", "", ""])[:3]
+    stem = os.path.splitext(parts[-1])[0]
+    match = DATE_PREFIX.match(stem)
+    date, name = match.groups() if match else ("", stem)
+    return {
+        "season": folders[0],
+        "championship": folders[1],
+        "event": folders[2],
+        "date": date,
+        "name": name,
+    }
+
+
+def phrase_query(text):
+    # Free text is searched as one phrase, so "Article 33.3" or
+    # "track limits" need no FTS5 quoting from the caller
+    return '"' + text.replace('"', '""') + '"'
+
+
+class DocumentIndex:
+    """SQLite FTS5 index over the PDFs a FIASiteScraper has downloaded.
+
+    `update` walks the documents folder and only extracts files that are new
+    or whose size or modification time changed, in a process pool; files
+    that were removed are dropped from the index. Documents that can't be
+    read are recorded with their error so they aren't retried until they
+    change.
+    """
+
+    def __init__(
+        self,
+        docs_path="./fia-docs",
+        index_path=None,
+        workers=None,
+        logger: logging.Logger = None,
+    ):
+        self.docs_path = docs_path
+        self.index_path = index_path if index_path else f"{docs_path}/index.sqlite"
+        self.workers = workers if workers else os.cpu_count()
+        self.logger = logger if logger else logging.Logger(__name__)
+
+        parent = os.path.dirname(self.index_path)
+        if parent:
+            os.makedirs(parent, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(self.index_path, check_same_thread=False)
+        self._connection.row_factory = sqlite3.Row
+        with self._connection:
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute(
+                """
+                CREATE TABLE IF NOT EXISTS documents (
+                    id INTEGER PRIMARY KEY,
+                    path TEXT UNIQUE NOT NULL,
+                    season TEXT,
+                    championship TEXT,
+                    event TEXT,
+                    date TEXT,
+                    name TEXT,
+                    size INTEGER,
+                    mtime_ns INTEGER,
+                    pages INTEGER,
+                    error TEXT,
+                    indexed_at REAL NOT NULL
+                )
+                """
+            )
+            self._connection.execute(
+                """
+                CREATE VIRTUAL TABLE IF NOT EXISTS document_text
+                USING fts5(name, body, tokenize='porter unicode61')
+                """
+            )
+
+    def _indexed(self):
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT id, path, size, mtime_ns FROM documents"
+            ).fetchall()
+        return {row["path"]: row for row in rows}
+
+    def _on_disk(self):
+        files = {}
+        for root, _, names in os.walk(self.docs_path):
+            for name in names:
+                if name.lower().endswith(".pdf"):
+                    path = os.path.join(root, name)
+                    stat = os.stat(path)
+                    files[path] = (stat.st_size, stat.st_mtime_ns)
+        return files
+
+    def _remove(self, ids):
+        with self._lock, self._connection:
+            self._connection.executemany(
+                "DELETE FROM document_text WHERE rowid = ?", [(i,) for i in ids]
+            )
+            self._connection.executemany(
+                "DELETE FROM documents WHERE id = ?", [(i,) for i in ids]
+            )
+
+    def _write(self, path, stat, text, pages, error):
+        metadata = document_metadata(self.docs_path, path)
+        with self._lock, self._connection:
+            row = self._connection.execute(
+                "SELECT id FROM documents WHERE path = ?", (path,)
+            ).fetchone()
+            if row is not None:
+                self._connection.execute(
+                    "DELETE FROM document_text WHERE rowid = ?", (row["id"],)
+                )
+            cursor = self._connection.execute(
+                """
+                INSERT OR REPLACE INTO documents
+                    (id, path, season, championship, event, date, name,
+                     size, mtime_ns, pages, error, indexed_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                (
+                    row["id"] if row is not None else None,
+                    path,
+                    metadata["season"],
+                    metadata["championship"],
+                    metadata["event"],
+                    metadata["date"],
+                    metadata["name"],
+                    stat[0],
+                    stat[1],
+                    pages,
+                    error,
+                    time.time(),
+                ),
+            )
+            if text is not None:
+                self._connection.execute(
+                    "INSERT INTO document_text (rowid, name, body) VALUES (?, ?, ?)",
+                    (cursor.lastrowid, metadata["name"], text),
+                )
+
+    def update(self):
+        start = time.perf_counter()
+        indexed = self._indexed()
+        on_disk = self._on_disk()
+
+        removed = [row["id"] for path, row in indexed.items() if path not in on_disk]
+        if removed:
+            self._remove(removed)
+
+        pending = [
+            path
+            for path, stat in on_disk.items()
+            if path not in indexed
+            or (indexed[path]["size"], indexed[path]["mtime_ns"]) != stat
+        ]
+        self.logger.info(
+            f"{len(on_disk)} documents on disk, {len(pending)} to index, "
+            f"{len(removed)} removed"
+        )
+
+        indexed_count = 0
+        failed = []
+        if pending:
+            with ProcessPoolExecutor(max_workers=self.workers) as executor:
+                futures = [executor.submit(extract_text, path) for path in pending]
+                for future in as_completed(futures):
+                    path, text, pages, error = future.result()
+                    self._write(path, on_disk[path], text, pages, error)
+                    if error is not None:
+                        self.logger.info(f"Could not read {path}: {error}")
+                        failed.append((path, error))
+                    else:
+                        indexed_count += 1
+
+        return {
+            "documents": len(on_disk),
+            "indexed": indexed_count,
+            "removed": len(removed),
+            "failed": failed,
+            "elapsed": time.perf_counter() - start,
+        }
+
+    def search(
+        self,
+        query,
+        limit=20,
+        season=None,
+        championship=None,
+        event=None,
+        raw=False,
+    ):
+        """Best matching documents for `query`, most relevant first.
+
+        `query` is searched as a phrase unless `raw` is set, in which case it
+        is passed through as an FTS5 expression (AND, OR, NEAR, prefix*).
+        """
+        filters = []
+        params = [query if raw else phrase_query(query)]
+        for column, value in (
+            ("season", season),
+            ("championship", championship),
+            ("event", event),
+        ):
+            if value is not None:
+                filters.append(f"AND d.{column} = ?")
+                params.append(str(value))
+        params.append(limit)
+
+        with self._lock:
+            rows = self._connection.execute(
+                f"""
+                SELECT d.path, d.name, d.date, d.season, d.championship, d.event,
+                       snippet(document_text, 1, '[', ']', '...', 12) AS snippet,
+                       bm25(document_text) AS rank
+                FROM document_text
+                JOIN documents d ON d.id = document_text.rowid
+                WHERE document_text MATCH ? {" ".join(filters)}
+                ORDER BY rank
+                LIMIT ?
+                """,
+                params,
+            ).fetchall()
+        return [SearchHit(**dict(row)) for row in rows]
+
+    def stats(self):
+        with self._lock:
+            row = self._connection.execute(
+                """
+                SELECT COUNT(*) AS documents,
+                       COALESCE(SUM(pages), 0) AS pages,
+                       COUNT(error) AS unreadable
+                FROM documents
+                """
+            ).fetchone()
+        return dict(row)
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
@@ -0,0 +1,36 @@
+from .session import SessionTelemetry, DriverTelemetry
+from .view import SessionView
+from .cache import SessionCache, CachedSessionView
+from .gaps import driver_ahead_laps, gaps_to_driver_ahead
+from .metrics import (
+    METRICS,
+    LapSegments,
+    lap_metrics,
+    register_metric,
+    session_metrics,
+    track_metrics,
+)
+from .stream import iter_lap_telemetry, materialize, write_parquet
+from .reference import DominanceMap, ReferenceLine, fastest_lap_telemetry
+
+__all__ = [
+    "SessionTelemetry",
+    "DriverTelemetry",
+    "SessionView",
+    "SessionCache",
+    "CachedSessionView",
+    "driver_ahead_laps",
+    "gaps_to_driver_ahead",
+    "METRICS",
+    "LapSegments",
+    "lap_metrics",
+    "register_metric",
+    "session_metrics",
+    "track_metrics",
+    "iter_lap_telemetry",
+    "materialize",
+    "write_parquet",
+    "DominanceMap",
+    "ReferenceLine",
+    "fastest_lap_telemetry",
+]
@@ -0,0 +1,347 @@
+import json
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+import fastf1
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+
+from .session import DriverTelemetry
+from .view import (
+    BaseSessionView,
+    SessionView,
+    driver_numbers,
+    frame_bytes,
+    group_laps,
+)
+
+# Bump whenever the on-disk layout or any cached column changes. Each
+# version lives in its own directory, so old entries are simply not found.
+SCHEMA_VERSION = 2
+
+
+def load_fastf1_session(year, round_number, session_name):
+    session = fastf1.get_session(year, round_number, session_name)
+    session.load(laps=True)
+    return session
+
+
+def session_slug(session_name):
+    return session_name.lower().replace(" ", "-")
+
+
+def telemetry_table(frame: pd.DataFrame):
+    # NaN is kept as NaN rather than turned into nulls, so numeric channels
+    # can be mapped straight back into NumPy
+    return pa.table(
+        {
+            column: (
+                pa.array(series)
+                if isinstance(series.dtype, pd.CategoricalDtype)
+                else pa.array(series.to_numpy(), from_pandas=False)
+            )
+            for column, series in frame.items()
+        }
+    )
+
+
+def mapped_frame(table: pa.Table):
+    # Columns in a single chunk without nulls become NumPy views onto the
+    # table's buffers; the rest (categoricals, booleans) are converted
+    columns = {}
+    for name in table.column_names:
+        column = table.column(name)
+        if column.num_chunks == 1:
+            try:
+                columns[name] = column.chunk(0).to_numpy(zero_copy_only=True)
+                continue
+            except pa.ArrowInvalid:
+                pass
+        columns[name] = column.to_pandas()
+    return pd.DataFrame(columns, index=pd.RangeIndex(len(table)), copy=False)
+
+
+class CachedSessionView(BaseSessionView):
+    """Session view read back from a SessionCache entry.
+
+    Results and laps are read eagerly since they are small. Telemetry is
+    memory mapped per driver on first use and only the requested columns
+    are read. Numeric channels are read-only NumPy views onto the mapped
+    file, so they are paged in by the OS rather than copied; categorical
+    channels such as Source are decoded into a (small) copy.
+    """
+
+    def __init__(self, path, manifest, logger: logging.Logger = None):
+        self.path = Path(path)
+        self.manifest = manifest
+        self.metadata = manifest["metadata"]
+        self.logger = logger if logger else logging.Logger(__name__)
+
+        self.results = pd.read_parquet(self.path / "results.parquet", memory_map=True)
+        self.laps = pd.read_parquet(self.path / "laps.parquet", memory_map=True)
+        self._laps_by_driver = group_laps(self.laps)
+
+        self._lap_index = {}
+        lap_index_path = self.path / "lap_index.parquet"
+        if lap_index_path.exists():
+            lap_index = pd.read_parquet(lap_index_path, memory_map=True)
+            self._lap_index = {
+                number: index.drop(columns="DriverNumber").reset_index(drop=True)
+                for number, index in lap_index.groupby("DriverNumber", sort=False)
+            }
+        self._numbers = driver_numbers(self.results)
+
+        self._telemetry = {}
+        self._lock = threading.Lock()
+
+    def driver_telemetry(self, driver, columns=None) -> DriverTelemetry:
+        number = self.driver_number(driver)
+        if columns is None:
+            with self._lock:
+                if number in self._telemetry:
+                    return self._telemetry[number]
+        if number not in self._lap_index:
+            raise KeyError(f"No telemetry for driver {driver}")
+
+        source = pa.memory_map(str(self.path / "telemetry" / f"{number}.arrow"))
+        table = pa.ipc.open_file(source).read_all()
+        if columns is not None:
+            table = table.select(list(columns))
+        telemetry = DriverTelemetry(
+            number, mapped_frame(table), self._lap_index[number]
+        )
+        if columns is None:
+            with self._lock:
+                telemetry = self._telemetry.setdefault(number, telemetry)
+        return telemetry
+
+    def telemetry_columns(self, driver):
+        # Read from the file's schema, without mapping any of the data
+        path = self.path / "telemetry" / f"{self.driver_number(driver)}.arrow"
+        with pa.memory_map(str(path)) as source:
+            return pa.ipc.open_file(source).schema.names
+
+    def memory_usage(self):
+        with self._lock:
+            telemetry = list(self._telemetry.values())
+        return (
+            frame_bytes(self.results)
+            + frame_bytes(self.laps)
+            + sum(frame_bytes(t.frame) for t in telemetry)
+        )
+
+    def raw_memory_usage(self):
+        return self.manifest["raw_bytes"]
+
+
+class SessionCache:
+    """Versioned on-disk cache of processed sessions.
+
+    Layout, one directory per session:
+
+        <root>/v<schema>/<year>/<round>-<session>/
+            manifest.json
+            results.parquet
+            laps.parquet
+            lap_index.parquet
+            telemetry/<driver number>.arrow
+
+    Telemetry is stored as uncompressed Arrow IPC so it can be memory mapped
+    straight back into pandas. An entry is stale when it was written by a
+    different FastF1 version, is older than `max_age` seconds, or was
+    written within `provisional_days` of the session (when FastF1 data is
+    still being corrected) and is older than `provisional_max_age` seconds.
+    """
+
+    def __init__(
+        self,
+        root="./session-cache",
+        max_age=None,
+        provisional_days=7,
+        provisional_max_age=24 * 60 * 60,
+        logger: logging.Logger = None,
+    ):
+        self.root = Path(root)
+        self.max_age = max_age
+        self.provisional_days = provisional_days
+        self.provisional_max_age = provisional_max_age
+        self.logger = logger if logger else logging.Logger(__name__)
+
+    def path(self, year, round_number, session_name):
+        return (
+            self.root
+            / f"v{SCHEMA_VERSION}"
+            / str(year)
+            / f"{int(round_number):02d}-{session_slug(session_name)}"
+        )
+
+    def manifest(self, year, round_number, session_name):
+        manifest_path = self.path(year, round_number, session_name) / "manifest.json"
+        if not manifest_path.exists():
+            return None
+        with open(manifest_path) as f:
+            return json.load(f)
+
+    def is_fresh(self, manifest):
+        if manifest is None or manifest.get("schema_version") != SCHEMA_VERSION:
+            return False
+        if manifest.get("fastf1_version") != fastf1.__version__:
+            return False
+        age = time.time() - manifest["created"]
+        if self.max_age is not None and age > self.max_age:
+            return False
+        if manifest.get("provisional") and age > self.provisional_max_age:
+            return False
+        return True
+
+    def contains(self, year, round_number, session_name):
+        return self.is_fresh(self.manifest(year, round_number, session_name))
+
+    def load(self, year, round_number, session_name):
+        manifest = self.manifest(year, round_number, session_name)
+        if not self.is_fresh(manifest):
+            return None
+        self.logger.info(f"Session cache hit: {year} {round_number} {session_name}")
+        return CachedSessionView(
+            self.path(year, round_number, session_name), manifest, logger=self.logger
+        )
+
+    def write(self, view: SessionView):
+        metadata = view.metadata
+        path = self.path(metadata["year"], metadata["round_number"], metadata["name"])
+        os.makedirs(path.parent, exist_ok=True)
+        tmp_path = Path(tempfile.mkdtemp(prefix=f"{path.name}.tmp-", dir=path.parent))
+        os.makedirs(tmp_path / "telemetry")
+
+        try:
+            view.results.to_parquet(tmp_path / "results.parquet")
+            view.laps.to_parquet(tmp_path / "laps.parquet")
+
+            lap_indexes = []
+            drivers = []
+            for number in view.telemetry_drivers:
+                telemetry = view.driver_telemetry(number)
+                # One record batch, so every column maps back as one array
+                feather.write_feather(
+                    telemetry_table(telemetry.frame),
+                    tmp_path / "telemetry" / f"{number}.arrow",
+                    compression="uncompressed",
+                    chunksize=max(len(telemetry.frame), 1),
+                )
+                lap_index = telemetry.lap_index.copy()
+                lap_index["LapStartTime"] = lap_index["LapStartTime"].dt.total_seconds()
+                lap_index["DriverNumber"] = number
+                lap_indexes.append(lap_index)
+                drivers.append(number)
+            if lap_indexes:
+                pd.concat(lap_indexes, ignore_index=True).to_parquet(
+                    tmp_path / "lap_index.parquet"
+                )
+
+            session_date = pd.Timestamp(view.session_date)
+            if session_date.tzinfo is None:
+                session_date = session_date.tz_localize("UTC")
+            manifest = {
+                "schema_version": SCHEMA_VERSION,
+                "fastf1_version": fastf1.__version__,
+                "created": time.time(),
+                "provisional": bool(
+                    pd.Timestamp.now(tz="UTC") - session_date
+                    < pd.Timedelta(days=self.provisional_days)
+                ),
+                "raw_bytes": view.raw_memory_usage(),
+                "drivers": drivers,
+                "metadata": metadata,
+            }
+            with open(tmp_path / "manifest.json", "w") as f:
+                json.dump(manifest, f, default=str)
+
+            self._publish(tmp_path, path)
+        except BaseException:
+            shutil.rmtree(tmp_path, ignore_errors=True)
+            raise
+
+        self.logger.info(f"Wrote session cache: {path}")
+        return path
+
+    def _publish(self, tmp_path, path):
+        # A directory can't be renamed over one that has files in it, so an
+        # existing entry is first renamed aside and removed afterwards.
+        # Readers holding its files mapped keep them. When another writer
+        # publishes the same session in between, its entry is kept and this
+        # one dropped; both were built from the same data.
+        stale = None
+        if path.exists():
+            stale = Path(tempfile.mkdtemp(prefix=f"{path.name}.old-", dir=path.parent))
+            try:
+                os.replace(path, stale)
+            except FileNotFoundError:
+                pass
+        try:
+            os.replace(tmp_path, path)
+        except OSError:
+            self.logger.info(f"Session cache entry written concurrently: {path}")
+            shutil.rmtree(tmp_path, ignore_errors=True)
+        if stale is not None:
+            shutil.rmtree(stale, ignore_errors=True)
+
+    def load_or_build(
+        self,
+        year,
+        round_number,
+        session_name,
+        loader=load_fastf1_session,
+        progress=None,
+    ):
+        if progress is not None:
+            progress.start("Reading session cache")
+        view = self.load(year, round_number, session_name)
+        if view is not None:
+            return view
+
+        # The entry is written under the session's own year, round and name,
+        # which need not be how it was asked for, so it is read back from
+        # wherever it was written
+        path = self.build(
+            year, round_number, session_name, loader=loader, progress=progress
+        )
+        with open(path / "manifest.json") as f:
+            manifest = json.load(f)
+        return CachedSessionView(path, manifest, logger=self.logger)
+
+    def build(
+        self,
+        year,
+        round_number,
+        session_name,
+        loader=load_fastf1_session,
+        progress=None,
+    ):
+        if progress is not None:
+            progress.start("Loading laps and telemetry")
+        session = loader(year, round_number, session_name)
+        if progress is not None:
+            progress.start("Building session view")
+        view = SessionView(session, logger=self.logger)
+        if progress is not None:
+            progress.start("Writing session cache")
+        return self.write(view)
+
+    def invalidate(self, year, round_number, session_name):
+        path = self.path(year, round_number, session_name)
+        if path.exists():
+            shutil.rmtree(path)
+
+    def prune(self):
+        # Drops every entry written under another schema version
+        if not self.root.exists():
+            return
+        for child in self.root.iterdir():
+            if child.is_dir() and child.name != f"v{SCHEMA_VERSION}":
+                shutil.rmtree(child)
@@ -0,0 +1,201 @@
+import fastf1.core
+import numpy as np
+import pandas as pd
+
+LAP_DATA_COLUMNS = [
+    "year",
+    "driver_num",
+    "driver_id",
+    "circuit",
+    "lap",
+    "position",
+    "gap_ahead",
+    "net_gain",
+    "pit_lap",
+    "safety_car",
+]
+
+# FastF1 track status codes for a safety car, red flag and virtual safety car
+NEUTRALISED_STATUS = "4567"
+
+
+def _seconds(values):
+    return (
+        pd.to_timedelta(values).to_numpy(dtype="timedelta64[ns]").astype(np.float64)
+        / 1e9
+    )
+
+
+def _valid_laps(laps: pd.DataFrame):
+    laps = laps[laps["LapStartTime"].notna() & laps["Time"].notna()]
+    return laps.sort_values("LapStartTime")
+
+
+def driver_progress(car_data: pd.DataFrame, laps: pd.DataFrame):
+    """Race progress in laps for every car data sample of one driver.
+
+    Distance is integrated from speed and rescaled so every completed lap is
+    exactly one lap long, which keeps integration error from building up
+    over a race. Samples where the car doesn't move are NaN, like FastF1's
+    driver ahead calculation, so parked cars never count as being ahead.
+    Returns (session seconds, progress) plus the integrated lap lengths.
+    """
+    t = _seconds(car_data["SessionTime"])
+    speed = car_data["Speed"].to_numpy(dtype=np.float64) / 3.6
+    distance = np.concatenate(
+        [[0.0], np.cumsum(np.diff(t) * (speed[1:] + speed[:-1]) / 2)]
+    )
+
+    laps = _valid_laps(laps)
+    progress = np.full(len(t), np.nan)
+    if laps.empty or len(t) < 2:
+        return t, progress, np.array([])
+
+    starts = _seconds(laps["LapStartTime"])
+    ends = _seconds(laps["Time"])
+    numbers = laps["LapNumber"].to_numpy(dtype=np.float64)
+    start_distance = np.interp(starts, t, distance)
+    end_distance = np.interp(ends, t, distance)
+    lengths = end_distance - start_distance
+    lengths[lengths <= 0] = np.nan
+
+    lap = np.searchsorted(starts, t, side="right") - 1
+    on_lap = lap >= 0
+    k = lap[on_lap]
+    fraction = (distance[on_lap] - start_distance[k]) / lengths[k]
+    progress[on_lap] = numbers[k] - 1 + np.clip(fraction, 0.0, 1.0)
+
+    # Past the end of the last timed lap, keep counting at a typical lap
+    # length so the car stays comparable on its in-lap or cool-down lap
+    after = t > ends[-1]
+    typical = np.nanmedian(lengths)
+    if after.any() and np.isfinite(typical):
+        progress[after] = numbers[-1] + (distance[after] - end_distance[-1]) / typical
+
+    stationary = np.diff(distance, prepend=np.nan) == 0
+    progress[stationary] = np.nan
+    return t, progress, lengths
+
+
+def field_progress(session: fastf1.core.Session, frequency=4.0):
+    """Every car's race distance in metres on one common time base.
+
+    Returns (grid seconds, driver numbers, distance matrix of shape
+    (len(grid), len(drivers))) with NaN where a car has no usable data.
+    """
+    drivers = []
+    samples = []
+    lap_lengths = []
+    for number in session.drivers:
+        if number not in session.car_data:
+            continue
+        laps = session.laps[session.laps["DriverNumber"] == number]
+        if laps.empty:
+            continue
+        t, progress, lengths = driver_progress(session.car_data[number], laps)
+        drivers.append(number)
+        samples.append((t, progress))
+        lap_lengths.append(lengths)
+
+    if not drivers:
+        return np.array([]), [], np.empty((0, 0))
+
+    lengths = np.concatenate(lap_lengths)
+    track_length = np.nanmedian(lengths) if np.isfinite(lengths).any() else 1.0
+
+    t_min = min(t[0] for t, _ in samples if len(t))
+    t_max = max(t[-1] for t, _ in samples if len(t))
+    grid = np.arange(t_min, t_max, 1.0 / frequency)
+
+    distance = np.full((len(grid), len(drivers)), np.nan)
+    for column, (t, progress) in enumerate(samples):
+        if len(t) < 2:
+            continue
+        distance[:, column] = np.interp(grid, t, progress, left=np.nan, right=np.nan)
+    return grid, drivers, distance * track_length
+
+
+def gaps_to_driver_ahead(distance):
+    """Distance to, and column of, the nearest car ahead at every sample.
+
+    One sort per time step over the whole field. The leader and cars with
+    no data get NaN and -1.
+    """
+    n_samples, n_drivers = distance.shape
+    gap = np.full((n_samples, n_drivers), np.nan)
+    ahead = np.full((n_samples, n_drivers), -1, dtype=np.int64)
+    if n_drivers < 2:
+        return gap, ahead
+
+    keyed = np.where(np.isnan(distance), np.inf, distance)
+    order = np.argsort(keyed, axis=1, kind="stable")
+    ordered = np.take_along_axis(keyed, order, axis=1)
+
+    valid = np.isfinite(ordered[:, 1:]) & np.isfinite(ordered[:, :-1])
+    with np.errstate(invalid="ignore"):
+        to_next = ordered[:, 1:] - ordered[:, :-1]
+    rows = np.repeat(np.arange(n_samples)[:, None], n_drivers - 1, axis=1)
+    gap[rows[valid], order[:, :-1][valid]] = to_next[valid]
+    ahead[rows[valid], order[:, :-1][valid]] = order[:, 1:][valid]
+    return gap, ahead
+
+
+def driver_ahead_laps(session: fastf1.core.Session, circuit, frequency=4.0):
+    """Gap to the car ahead at the end of every lap, for the whole field.
+
+    Matches the driver-lap-data CSVs of the win-probability research:
+    `gap_ahead` is the distance in metres to the car ahead when the lap
+    ends and `net_gain` how much it changed over the lap. `pit_lap` marks
+    pit in and out laps and `safety_car` laps run at least partly under a
+    safety car, virtual safety car or red flag; the CSVs predate those two
+    flags. The session must be loaded with laps and telemetry.
+
+    `circuit` is the key the research data uses, the Ergast circuit id
+    ("bahrain", "monza"), which FastF1 doesn't carry: its Location for
+    Bahrain is "Sakhir".
+    """
+    grid, drivers, distance = field_progress(session, frequency)
+    gap, _ = gaps_to_driver_ahead(distance)
+
+    frames = []
+    for column, number in enumerate(drivers):
+        laps = _valid_laps(session.laps[session.laps["DriverNumber"] == number])
+        if laps.empty or not len(grid):
+            continue
+        start = np.searchsorted(grid, _seconds(laps["LapStartTime"]), side="left")
+        end = np.searchsorted(grid, _seconds(laps["Time"]), side="right") - 1
+        start = np.clip(start, 0, len(grid) - 1)
+        end = np.clip(end, 0, len(grid) - 1)
+
+        lap_numbers = laps["LapNumber"].to_numpy(dtype=np.float64)
+        gap_end = gap[end, column]
+        gap_start = gap[start, column]
+        # The field leaves the grid together, so lap 1 starts from no gap
+        gap_start = np.where((lap_numbers == 1) & np.isnan(gap_start), 0.0, gap_start)
+
+        frames.append(
+            pd.DataFrame(
+                {
+                    "year": int(session.event.year),
+                    "driver_num": number,
+                    "driver_id": session.get_driver(number)["DriverId"],
+                    "circuit": circuit,
+                    "lap": lap_numbers,
+                    "position": laps["Position"].to_numpy(dtype=np.float64),
+                    "gap_ahead": gap_end,
+                    "net_gain": gap_end - gap_start,
+                    "pit_lap": (
+                        laps["PitInTime"].notna() | laps["PitOutTime"].notna()
+                    ).to_numpy(),
+                    "safety_car": laps["TrackStatus"]
+                    .fillna("")
+                    .astype(str)
+                    .map(lambda status: any(c in status for c in NEUTRALISED_STATUS))
+                    .to_numpy(),
+                }
+            )
+        )
+
+    if not frames:
+        return pd.DataFrame(columns=LAP_DATA_COLUMNS)
+    return pd.concat(frames, ignore_index=True)[LAP_DATA_COLUMNS]
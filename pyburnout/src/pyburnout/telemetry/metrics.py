@@ -0,0 +1,267 @@
+import functools
+import logging
+from pathlib import Path
+
+import fastf1
+import numpy as np
+import pandas as pd
+
+from .cache import SessionCache, session_slug
+from .view import BaseSessionView
+
+METRICS = {}
+
+
+def register_metric(name, columns):
+    """Adds a per-lap metric to METRICS under `name`.
+
+    The function gets a LapSegments holding `columns` for every selected
+    lap and returns one value per lap. Registered functions are looked up
+    by name in worker processes, so they must live at module level.
+    """
+
+    def register(function):
+        METRICS[name] = (function, list(columns))
+        return function
+
+    return register
+
+
+class LapSegments:
+    """Telemetry of many laps laid end to end.
+
+    Lap `i` is rows `starts[i]` to `starts[i] + counts[i]` of every column,
+    so a metric is a NumPy expression over the whole field followed by one
+    `reduceat` instead of a loop over laps.
+    """
+
+    def __init__(self, columns, counts):
+        self.columns = columns
+        self.counts = np.asarray(counts, dtype=np.int64)
+        self.starts = np.cumsum(self.counts) - self.counts
+        self.first = np.zeros(int(self.counts.sum()), dtype=bool)
+        self.first[self.starts] = True
+
+    def __getitem__(self, column):
+        return self.columns[column]
+
+    def __len__(self):
+        return len(self.counts)
+
+    def sum(self, values):
+        return np.add.reduceat(np.asarray(values, dtype=np.float64), self.starts)
+
+    def mean(self, values):
+        return self.sum(values) / self.counts
+
+    def max(self, values):
+        return np.maximum.reduceat(np.asarray(values, dtype=np.float64), self.starts)
+
+
+@register_metric("throttle_pct", ["Throttle"])
+def throttle_pct(laps: LapSegments):
+    # Share of the lap spent at (near enough) full throttle
+    return laps.mean(laps["Throttle"] >= 95) * 100
+
+
+@register_metric("full_brake_pct", ["Brake"])
+def full_brake_pct(laps: LapSegments):
+    return laps.mean(laps["Brake"] > 0) * 100
+
+
+@register_metric("avg_speed", ["Speed"])
+def avg_speed(laps: LapSegments):
+    return laps.mean(laps["Speed"])
+
+
+@register_metric("max_speed", ["Speed"])
+def max_speed(laps: LapSegments):
+    return laps.max(laps["Speed"])
+
+
+@register_metric("gear_changes", ["nGear"])
+def gear_changes(laps: LapSegments):
+    gear = np.asarray(laps["nGear"])
+    changed = np.diff(gear, prepend=gear[:1]) != 0
+    changed[laps.first] = False
+    return laps.sum(changed)
+
+
+@register_metric("drs_pct", ["DRS"])
+def drs_pct(laps: LapSegments):
+    # DRS is open from 10 upwards, lower values are off or eligible
+    return laps.mean(laps["DRS"] >= 10) * 100
+
+
+def _lap_rows(starts, counts):
+    offsets = np.cumsum(counts) - counts
+    return np.repeat(starts, counts) + (
+        np.arange(counts.sum()) - np.repeat(offsets, counts)
+    )
+
+
+def selected_laps(laps: pd.DataFrame, which="fastest"):
+    """A driver's laps to measure: their fastest, or every timed lap."""
+    laps = laps[laps["LapTime"].notna()]
+    if which == "all" or laps.empty:
+        return laps
+    if "IsPersonalBest" in laps.columns and laps["IsPersonalBest"].eq(True).any():
+        laps = laps[laps["IsPersonalBest"].eq(True)]
+    return laps.loc[[laps["LapTime"].idxmin()]]
+
+
+def lap_metrics(view: BaseSessionView, metrics=None, laps="fastest"):
+    """One row per driver and measured lap, one column per metric.
+
+    Only the columns the metrics need are read. Every driver's laps are
+    gathered into a single LapSegments, so each metric runs once for the
+    whole session.
+    """
+    metrics = list(metrics) if metrics is not None else list(METRICS)
+    columns = sorted({column for name in metrics for column in METRICS[name][1]})
+
+    keys = []
+    chunks = {column: [] for column in columns}
+    counts = []
+    for driver in view.drivers:
+        chosen = selected_laps(view.driver_laps(driver), laps)
+        if chosen.empty:
+            continue
+        try:
+            telemetry = view.driver_telemetry(driver, columns=columns)
+        except Exception as e:
+            view.logger.info(f"No telemetry for driver {driver}: {e}")
+            continue
+
+        index = telemetry.lap_index.set_index("LapNumber")
+        lap_numbers = chosen["LapNumber"].astype(np.int64)
+        chosen = chosen[lap_numbers.isin(index.index).to_numpy()]
+        lap_numbers = chosen["LapNumber"].astype(np.int64).to_numpy()
+        starts = index.loc[lap_numbers, "Start"].to_numpy()
+        lengths = index.loc[lap_numbers, "Stop"].to_numpy() - starts
+        has_data = lengths > 0
+        if not has_data.any():
+            continue
+
+        rows = _lap_rows(starts[has_data], lengths[has_data])
+        for column in columns:
+            chunks[column].append(telemetry.column(column).to_numpy()[rows])
+        counts.append(lengths[has_data])
+        keys.append(
+            pd.DataFrame(
+                {
+                    "driver": driver,
+                    "driver_number": telemetry.driver_number,
+                    "lap": lap_numbers[has_data],
+                    "lap_time": chosen["LapTime"].to_numpy(dtype=np.float64)[has_data],
+                }
+            )
+        )
+
+    if not keys:
+        return pd.DataFrame(
+            columns=["driver", "driver_number", "lap", "lap_time"] + metrics
+        )
+
+    segments = LapSegments(
+        {column: np.concatenate(chunks[column]) for column in columns},
+        np.concatenate(counts),
+    )
+    table = pd.concat(keys, ignore_index=True)
+    for name in metrics:
+        table[name] = METRICS[name][0](segments)
+    return table
+
+
+def session_metrics(
+    year,
+    round_number,
+    session_name="Qualifying",
+    cache_root="./session-cache",
+    metrics=None,
+    laps="fastest",
+):
+    """lap_metrics for one session, keyed by year, round and track.
+
+    The session comes from the SessionCache, and is built into it first if
+    it isn't there yet.
+    """
+    view = SessionCache(cache_root).load_or_build(year, round_number, session_name)
+    table = lap_metrics(view, metrics, laps)
+    meeting = view.session_info.get("Meeting", {}) if view.session_info else {}
+    table.insert(0, "session", session_name)
+    table.insert(0, "track", meeting.get("Location", str(round_number)))
+    table.insert(0, "round", int(round_number))
+    table.insert(0, "year", int(year))
+    return table
+
+
+def track_metrics(
+    years,
+    rounds=None,
+    session_name="Qualifying",
+    output_dir="./track-metrics",
+    cache_root="./session-cache",
+    metrics=None,
+    laps="fastest",
+    workers=None,
+    fastf1_cache=None,
+    logger: logging.Logger = None,
+):
+    """Season-wide metrics table, one session per worker process.
+
+    Every session is written to its own partition and checkpointed (see
+    PartitionedFetch), so re-running only measures new rounds; use another
+    `output_dir` when changing `metrics`. Rounds default to each season's
+    schedule. The merged table is also written to
+    `<output_dir>/<session>/<laps>.parquet` and returned; with no measured
+    sessions it is empty but has the usual columns.
+    """
+    from ..ingest.research import PartitionedFetch
+
+    metrics = list(metrics) if metrics is not None else list(METRICS)
+    output_dir = Path(output_dir) / session_slug(session_name)
+    fetch = functools.partial(
+        session_metrics,
+        session_name=session_name,
+        cache_root=str(cache_root),
+        metrics=tuple(metrics),
+        laps=laps,
+    )
+    fetcher = PartitionedFetch(
+        output_dir / laps,
+        fetch,
+        workers=workers,
+        fastf1_cache=fastf1_cache,
+        logger=logger,
+    )
+
+    units = []
+    for year in years:
+        if rounds is not None:
+            season_rounds = list(rounds)
+        else:
+            schedule = fastf1.get_event_schedule(year, include_testing=False)
+            season_rounds = schedule["RoundNumber"].astype(int).to_list()
+        summary = fetcher.run([year], season_rounds)
+        for unit, error in summary["failed"]:
+            fetcher.logger.info(f"No metrics for {unit}: {error}")
+        units.extend((int(year), int(round_number)) for round_number in season_rounds)
+
+    paths = [
+        fetcher.partition_path(*unit)
+        for unit in units
+        if fetcher.partition_path(*unit).exists()
+    ]
+    if paths:
+        table = pd.concat((pd.read_parquet(path) for path in paths), ignore_index=True)
+    else:
+        # Same columns as session_metrics, so readers of the file don't break
+        table = pd.DataFrame(
+            columns=["year", "round", "track", "session"]
+            + ["driver", "driver_number", "lap", "lap_time"]
+            + metrics
+        )
+    output_dir.mkdir(parents=True, exist_ok=True)
+    table.to_parquet(output_dir / f"{laps}.parquet", index=False)
+    return table
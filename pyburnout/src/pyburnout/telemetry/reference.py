@@ -0,0 +1,281 @@
+from concurrent.futures import ThreadPoolExecutor
+import logging
+
+import numpy as np
+import pandas as pd
+
+from .metrics import selected_laps
+from .view import BaseSessionView
+
+REFERENCE_COLUMNS = ["X", "Y", "Time", "Distance"]
+
+
+class _CoarseToFineIndex:
+    # Nearest point on a densely resampled line without scipy: brute force
+    # over every `stride`th point, then a local search around the few best
+    # coarse candidates. Only sections of track closer together than the
+    # coarse spacing can confuse it, which is why more than one candidate
+    # is refined.
+
+    def __init__(self, points, stride=16, candidates=3, chunk_size=4096):
+        self.points = points
+        self.stride = stride
+        self.coarse = points[::stride]
+        self.candidates = min(candidates, len(self.coarse))
+        self.chunk_size = chunk_size
+
+    def query(self, query):
+        nearest = np.empty(len(query), dtype=np.int64)
+        window = np.arange(-self.stride, self.stride + 1)
+        for start in range(0, len(query), self.chunk_size):
+            chunk = query[start : start + self.chunk_size]
+            coarse = ((chunk[:, None, :] - self.coarse[None, :, :]) ** 2).sum(axis=2)
+            best = np.argpartition(coarse, self.candidates - 1, axis=1)
+            best = best[:, : self.candidates] * self.stride
+            rows = (best[:, :, None] + window).reshape(len(chunk), -1)
+            rows = np.clip(rows, 0, len(self.points) - 1)
+            fine = ((self.points[rows] - chunk[:, None, :]) ** 2).sum(axis=2)
+            nearest[start : start + len(chunk)] = rows[
+                np.arange(len(chunk)), fine.argmin(axis=1)
+            ]
+        return nearest
+
+
+class _KDTreeIndex:
+    def __init__(self, points):
+        from scipy.spatial import cKDTree
+
+        self.tree = cKDTree(points)
+
+    def query(self, query):
+        return self.tree.query(query)[1]
+
+
+def spatial_index(points):
+    """Nearest-point index over (n, 2) points, a KD-tree when scipy is there."""
+    try:
+        return _KDTreeIndex(points)
+    except ImportError:
+        return _CoarseToFineIndex(points)
+
+
+class ReferenceLine:
+    """A circuit's centreline, resampled every `spacing` metres.
+
+    Built from one lap's X/Y, normally the session's fastest. Distances are
+    in metres when the lap has a Distance channel and in position units
+    otherwise. `snap` puts any X/Y samples on the line in one vectorized
+    query, so laps and drivers can be compared by track distance and
+    mini-sector rather than by time.
+    """
+
+    def __init__(self, x, y, distance):
+        self.x = np.asarray(x, dtype=np.float64)
+        self.y = np.asarray(y, dtype=np.float64)
+        self.distance = np.asarray(distance, dtype=np.float64)
+        self.length = float(self.distance[-1])
+        self._points = np.column_stack([self.x, self.y])
+        self._index = spatial_index(self._points)
+
+    @classmethod
+    def from_lap(cls, lap: pd.DataFrame, spacing=2.0):
+        x = lap["X"].to_numpy(dtype=np.float64)
+        y = lap["Y"].to_numpy(dtype=np.float64)
+        keep = np.isfinite(x) & np.isfinite(y)
+        x, y = x[keep], y[keep]
+        step = np.hypot(np.diff(x), np.diff(y))
+        moved = np.concatenate([[True], step > 0])
+        x, y = x[moved], y[moved]
+        arc = np.concatenate([[0.0], np.cumsum(step[step > 0])])
+
+        if "Distance" in lap.columns:
+            lap_distance = lap["Distance"].to_numpy(dtype=np.float64)[keep]
+            covered = np.nanmax(lap_distance) - np.nanmin(lap_distance)
+            if covered > 0:
+                arc = arc * covered / arc[-1]
+        grid = np.arange(0.0, arc[-1], spacing)
+        return cls(np.interp(grid, arc, x), np.interp(grid, arc, y), grid)
+
+    def snap(self, x, y):
+        """Distance along the line of every (x, y), and how far off it is.
+
+        Each sample is projected onto whichever of the two segments around
+        its nearest line point is closer, so distances are finer than the
+        resampling.
+        """
+        query = np.column_stack(
+            [np.asarray(x, dtype=np.float64), np.asarray(y, dtype=np.float64)]
+        )
+        nearest = self._index.query(query)
+
+        best_distance = np.full(len(query), np.nan)
+        best_offset = np.full(len(query), np.inf)
+        for start in (nearest - 1, nearest):
+            start = np.clip(start, 0, len(self._points) - 2)
+            p0 = self._points[start]
+            segment = self._points[start + 1] - p0
+            squared = (segment**2).sum(axis=1)
+            t = np.clip(((query - p0) * segment).sum(axis=1) / squared, 0.0, 1.0)
+            offset = np.hypot(*(query - p0 - t[:, None] * segment).T)
+            closer = offset < best_offset
+            best_offset[closer] = offset[closer]
+            best_distance[closer] = (
+                self.distance[start] + t * np.diff(self.distance)[start]
+            )[closer]
+        return best_distance, best_offset
+
+    def sector_bounds(self, n_sectors):
+        return np.linspace(0.0, self.length, n_sectors + 1)
+
+    def mini_sector(self, distance, n_sectors):
+        sector = np.floor(np.asarray(distance) / self.length * n_sectors)
+        return np.clip(sector, 0, n_sectors - 1).astype(np.int64)
+
+    def unwrap(self, distance):
+        """Snapped distances of one lap's samples, made monotonic.
+
+        Samples from before the line at the start of the lap snap to the end
+        of the reference, and those past it at the end snap to the start, so
+        both are moved by a lap length before the running maximum is taken.
+        """
+        distance = np.array(distance, dtype=np.float64)
+        n = len(distance)
+        edge = max(n // 10, 1)
+        position = np.arange(n)
+        distance[(position < edge) & (distance > 0.9 * self.length)] -= self.length
+        distance[(position >= n - edge) & (distance < 0.1 * self.length)] += self.length
+        return np.maximum.accumulate(distance)
+
+    def lap_distance(self, x, y):
+        return self.unwrap(self.snap(x, y)[0])
+
+
+def fastest_lap_telemetry(
+    view: BaseSessionView,
+    drivers=None,
+    columns=REFERENCE_COLUMNS,
+    workers=8,
+    logger: logging.Logger = None,
+):
+    """Every driver's fastest lap, fetched on a thread pool.
+
+    Returns {driver: (lap number, lap time, telemetry)}, leaving out
+    drivers without a timed lap or telemetry.
+    """
+    logger = logger if logger else logging.Logger(__name__)
+    drivers = drivers if drivers is not None else view.drivers
+
+    def fetch(driver):
+        fastest = selected_laps(view.driver_laps(driver), "fastest")
+        if fastest.empty:
+            return driver, None
+        lap_number = int(fastest["LapNumber"].iloc[0])
+        try:
+            telemetry = view.driver_telemetry(driver, columns=columns)
+            lap = telemetry.lap(lap_number)
+        except Exception as e:
+            logger.info(f"No telemetry for driver {driver}: {e}")
+            return driver, None
+        return driver, (lap_number, float(fastest["LapTime"].iloc[0]), lap)
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        fetched = dict(executor.map(fetch, drivers))
+    return {
+        driver: lap
+        for driver, lap in fetched.items()
+        if lap is not None and len(lap[2]) > 1
+    }
+
+
+class DominanceMap:
+    """The field's fastest laps on one reference line.
+
+    `laps` is what `fastest_lap_telemetry` returns. The reference is the
+    fastest lap of the session. Every driver's samples are snapped onto it
+    once, in a single query, so recomputing sector times for another number
+    of mini-sectors is only interpolation.
+    """
+
+    def __init__(self, laps, spacing=2.0):
+        if not laps:
+            raise ValueError("No laps with telemetry to build a dominance map from")
+        self.laps = laps
+        self.fastest = min(laps, key=lambda driver: laps[driver][1])
+        self.reference = ReferenceLine.from_lap(laps[self.fastest][2], spacing)
+
+        # Samples without a position can't be snapped; the KD-tree refuses
+        # non-finite queries, so they are dropped like in ReferenceLine.from_lap
+        drivers = list(laps)
+        samples = []
+        for driver in drivers:
+            frame = laps[driver][2]
+            x = frame["X"].to_numpy(dtype=np.float64)
+            y = frame["Y"].to_numpy(dtype=np.float64)
+            keep = np.isfinite(x) & np.isfinite(y)
+            samples.append(
+                (x[keep], y[keep], frame["Time"].to_numpy(dtype=np.float64)[keep])
+            )
+        snapped, _ = self.reference.snap(
+            np.concatenate([x for x, _, _ in samples]),
+            np.concatenate([y for _, y, _ in samples]),
+        )
+        splits = np.cumsum([len(time) for _, _, time in samples])[:-1]
+
+        # Lap telemetry runs from line to line, so every lap is pinned to
+        # (0, 0) and (lap length, lap time) and nothing is clamped at the ends
+        self.distance = {}
+        self.time = {}
+        for driver, (_, _, time), distance in zip(
+            drivers, samples, np.split(snapped, splits)
+        ):
+            lap_time = laps[driver][1]
+            on_lap = (time > 0) & (time < lap_time)
+            distance = self.reference.unwrap(distance)[on_lap]
+            self.distance[driver] = np.concatenate(
+                [
+                    [0.0],
+                    np.clip(distance, 0.0, self.reference.length),
+                    [self.reference.length],
+                ]
+            )
+            self.time[driver] = np.concatenate([[0.0], time[on_lap], [lap_time]])
+
+    @classmethod
+    def from_view(cls, view: BaseSessionView, drivers=None, workers=8, spacing=2.0):
+        # None when no driver has a timed lap with telemetry
+        laps = fastest_lap_telemetry(view, drivers, workers=workers)
+        return cls(laps, spacing) if laps else None
+
+    def sector_times(self, n_sectors=25):
+        """Seconds each driver spent in each mini-sector, sectors by drivers."""
+        bounds = self.reference.sector_bounds(n_sectors)
+        times = {}
+        for driver, distance in self.distance.items():
+            at_bounds = np.interp(bounds, distance, self.time[driver])
+            times[driver] = np.diff(at_bounds)
+        frame = pd.DataFrame(times, index=np.arange(1, n_sectors + 1))
+        frame.index.name = "sector"
+        return frame
+
+    def dominance(self, n_sectors=25):
+        """Fastest driver through every mini-sector and their margin."""
+        times = self.sector_times(n_sectors)
+        values = times.to_numpy()
+        order = np.argsort(values, axis=1)
+        best = np.take_along_axis(values, order[:, :1], axis=1)[:, 0]
+        second = (
+            np.take_along_axis(values, order[:, 1:2], axis=1)[:, 0]
+            if values.shape[1] > 1
+            else np.full(len(values), np.nan)
+        )
+        bounds = self.reference.sector_bounds(n_sectors)
+        return pd.DataFrame(
+            {
+                "sector": times.index,
+                "start": bounds[:-1],
+                "end": bounds[1:],
+                "driver": times.columns.to_numpy()[order[:, 0]],
+                "time": best,
+                "margin": second - best,
+            }
+        )
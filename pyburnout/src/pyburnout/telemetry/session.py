@@ -0,0 +1,221 @@
+import logging
+import threading
+
+import fastf1.core
+import numpy as np
+import pandas as pd
+
+from ..utils.steering import segmentHeadings
+
+
+class DriverTelemetry:
+    """Merged car and position data for one driver over a whole session.
+
+    `frame` holds every sample once. `lap_index` maps each lap number to a
+    [start, stop) row range in `frame`, so any lap is an `iloc` slice rather
+    than a fresh merge. `select` narrows the columns without copying: only
+    the rows of a lap are taken from the selection, when the lap is read.
+    """
+
+    def __init__(
+        self, driver_number, frame: pd.DataFrame, lap_index: pd.DataFrame, columns=None
+    ):
+        self.driver_number = driver_number
+        self._frame = frame
+        self.lap_index = lap_index
+        self._positions = None
+        if columns is not None:
+            columns = list(columns)
+            missing = [c for c in columns if c not in frame.columns]
+            if missing:
+                raise KeyError(f"No telemetry columns {missing}")
+            self._positions = frame.columns.get_indexer(columns)
+        self._offsets = dict(
+            zip(
+                lap_index["LapNumber"].to_list(),
+                zip(lap_index["Start"].to_list(), lap_index["Stop"].to_list()),
+            )
+        )
+
+    @property
+    def columns(self):
+        if self._positions is None:
+            return list(self._frame.columns)
+        return list(self._frame.columns[self._positions])
+
+    @property
+    def frame(self):
+        # The whole session; a column selection is copied out here, so
+        # prefer `column` or `lap` on selections
+        if self._positions is None:
+            return self._frame
+        return self._frame.iloc[:, self._positions]
+
+    def column(self, name):
+        if self._positions is not None and name not in self.columns:
+            raise KeyError(name)
+        return self._frame[name]
+
+    def select(self, columns):
+        return DriverTelemetry(
+            self.driver_number, self._frame, self.lap_index, columns=columns
+        )
+
+    def _rows(self, start, stop):
+        if self._positions is None:
+            return self._frame.iloc[start:stop]
+        # Rows first: iloc[rows, columns] would take the columns of the
+        # whole session before slicing
+        return self._frame.iloc[start:stop].iloc[:, self._positions]
+
+    def lap(self, lap_number):
+        start, stop = self._offsets[int(lap_number)]
+        return self._rows(start, stop)
+
+    def laps(self):
+        for lap_number, (start, stop) in self._offsets.items():
+            yield lap_number, self._rows(start, stop)
+
+    @property
+    def lap_numbers(self):
+        return list(self._offsets)
+
+
+def build_lap_index(session_time, laps: pd.DataFrame):
+    laps = laps[laps["LapStartTime"].notna() & laps["Time"].notna()]
+    laps = laps.sort_values("LapStartTime")
+
+    lap_starts = laps["LapStartTime"].to_numpy(dtype="timedelta64[ns]")
+    lap_ends = laps["Time"].to_numpy(dtype="timedelta64[ns]")
+    starts = np.searchsorted(session_time, lap_starts, side="left")
+    stops = np.searchsorted(session_time, lap_ends, side="left")
+
+    # Laps are half open and never overlap, even when FastF1 timing does
+    if len(starts):
+        starts = np.maximum(starts, np.concatenate([[0], stops[:-1]]))
+    stops = np.maximum(stops, starts)
+
+    return pd.DataFrame(
+        {
+            "LapNumber": laps["LapNumber"].to_numpy().astype(np.int64),
+            "LapStartTime": lap_starts,
+            "Start": starts.astype(np.int64),
+            "Stop": stops.astype(np.int64),
+        }
+    )
+
+
+def add_lap_columns(frame: pd.DataFrame, lap_index: pd.DataFrame):
+    session_time = frame["SessionTime"].to_numpy(dtype="timedelta64[ns]")
+    starts = lap_index["Start"].to_numpy()
+    lengths = lap_index["Stop"].to_numpy() - starts
+
+    # Row positions covered by a lap, expanded without a Python loop
+    offsets = np.cumsum(lengths) - lengths
+    rows = np.repeat(starts, lengths) + (
+        np.arange(lengths.sum()) - np.repeat(offsets, lengths)
+    )
+
+    lap_numbers = np.full(len(frame), np.nan)
+    lap_numbers[rows] = np.repeat(lap_index["LapNumber"].to_numpy(), lengths)
+
+    # Time is relative to the start of each lap, as Lap.get_telemetry() has it
+    lap_time = frame["Time"].to_numpy(dtype="timedelta64[ns]").copy()
+    lap_time[rows] = session_time[rows] - np.repeat(
+        lap_index["LapStartTime"].to_numpy(), lengths
+    )
+
+    frame["LapNumber"] = lap_numbers
+    frame["Time"] = lap_time
+    return frame
+
+
+def add_vector_columns(frame: pd.DataFrame):
+    x = frame["X"].to_numpy(dtype=np.float64)
+    y = frame["Y"].to_numpy(dtype=np.float64)
+
+    headings = segmentHeadings(x, y)
+    change = np.diff(headings)
+    change = (change + np.pi) % (2 * np.pi) - np.pi
+
+    frame["DirX"] = np.concatenate([[np.nan], np.diff(x)])
+    frame["DirY"] = np.concatenate([[np.nan], np.diff(y)])
+    frame["Heading"] = np.degrees(np.concatenate([[np.nan], headings]))
+    frame["HeadingChange"] = np.degrees(np.concatenate([[np.nan, np.nan], change]))
+    frame["TurnAngle"] = frame["HeadingChange"].abs()
+    return frame
+
+
+class SessionTelemetry:
+    """Session-wide telemetry, merged once per driver.
+
+    Each driver's car and position data are merged, distance integrated and
+    heading columns computed for the whole session in one pass the first
+    time that driver is asked for. Individual laps are then slices of that
+    frame.
+    """
+
+    def __init__(
+        self,
+        session: fastf1.core.Session,
+        frequency=None,
+        logger: logging.Logger = None,
+    ):
+        self.session = session
+        self.frequency = frequency
+        self.logger = logger if logger else logging.Logger(__name__)
+
+        self._drivers = {}
+        self._driver_locks = {}
+        self._lock = threading.Lock()
+
+    def driver_number(self, driver):
+        return str(self.session.get_driver(driver)["DriverNumber"])
+
+    def driver(self, driver) -> DriverTelemetry:
+        number = self.driver_number(driver)
+        with self._lock:
+            if number in self._drivers:
+                return self._drivers[number]
+            driver_lock = self._driver_locks.setdefault(number, threading.Lock())
+
+        with driver_lock:
+            with self._lock:
+                if number in self._drivers:
+                    return self._drivers[number]
+            telemetry = self.merge(number)
+            with self._lock:
+                self._drivers[number] = telemetry
+        return telemetry
+
+    def lap(self, driver, lap_number):
+        return self.driver(driver).lap(lap_number)
+
+    def materialize(self, drivers=None):
+        drivers = drivers if drivers is not None else self.session.drivers
+        return {driver: self.driver(driver) for driver in drivers}
+
+    def memory_usage(self):
+        with self._lock:
+            return sum(
+                int(telemetry.frame.memory_usage(deep=True).sum())
+                for telemetry in self._drivers.values()
+            )
+
+    def merge(self, driver) -> DriverTelemetry:
+        # Merges without keeping the result, see `driver` for the cached path
+        number = self.driver_number(driver)
+        self.logger.info(f"Merging session telemetry for driver {number}")
+        car_data = self.session.car_data[number]
+        pos_data = self.session.pos_data[number]
+
+        frame = pos_data.merge_channels(car_data, frequency=self.frequency)
+        frame = frame.add_distance().reset_index(drop=True)
+
+        lap_index = build_lap_index(
+            frame["SessionTime"].to_numpy(dtype="timedelta64[ns]"),
+            self.session.laps.pick_drivers(number),
+        )
+        frame = add_lap_columns(frame, lap_index)
+        frame = add_vector_columns(frame)
+        return DriverTelemetry(number, frame, lap_index)
@@ -0,0 +1,159 @@
+import logging
+
+import fastf1.core
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from .cache import CachedSessionView
+from .session import DriverTelemetry, SessionTelemetry
+from .view import compact_telemetry
+
+KEY_COLUMNS = ["Driver", "DriverNumber", "LapNumber"]
+
+
+def _driver_loader(source, columns, logger):
+    # One driver's telemetry at a time, never kept by the source, so only
+    # the driver being streamed is ever held in memory
+    if isinstance(source, fastf1.core.Session):
+        merger = SessionTelemetry(source, logger=logger)
+
+        def load(driver):
+            merged = merger.merge(driver)
+            frame = compact_telemetry(merged.frame)
+            if columns is not None:
+                frame = frame[list(columns)]
+            return DriverTelemetry(merged.driver_number, frame, merged.lap_index)
+
+        return load
+
+    if isinstance(source, CachedSessionView):
+
+        def load(driver):
+            read = columns if columns is not None else source.telemetry_columns(driver)
+            return source.driver_telemetry(driver, columns=list(read))
+
+        return load
+
+    return lambda driver: source.driver_telemetry(driver, columns=columns)
+
+
+def _driver_laps(source, driver):
+    if isinstance(source, fastf1.core.Session):
+        return pd.DataFrame(source.laps.pick_drivers(driver))
+    return source.driver_laps(driver)
+
+
+def _abbreviation(source, driver):
+    if isinstance(source, fastf1.core.Session):
+        return str(source.get_driver(driver)["Abbreviation"])
+    return str(driver)
+
+
+def iter_lap_telemetry(
+    source,
+    drivers=None,
+    lap_numbers=None,
+    wo_box=False,
+    columns=None,
+    logger: logging.Logger = None,
+):
+    """Yields one frame of telemetry per driver lap, keys attached.
+
+    `source` is a loaded FastF1 session or a session view, e.g. one read
+    back from the SessionCache. Drivers are loaded, sliced into laps and
+    dropped one at a time, so a whole race for the whole field streams in
+    the memory of a single driver. Every chunk starts with the Driver,
+    DriverNumber and LapNumber columns. `wo_box` skips in and out laps like
+    FastF1's `pick_wo_box`, and `columns` limits the channels read.
+    """
+    logger = logger if logger else logging.Logger(__name__)
+    if drivers is None:
+        drivers = (
+            source.laps["Driver"].dropna().unique().tolist()
+            if isinstance(source, fastf1.core.Session)
+            else source.drivers
+        )
+    wanted = set(int(number) for number in lap_numbers) if lap_numbers else None
+    load = _driver_loader(source, columns, logger)
+
+    for driver in drivers:
+        laps = _driver_laps(source, driver)
+        if wo_box and {"PitInTime", "PitOutTime"} <= set(laps.columns):
+            laps = laps[laps["PitInTime"].isna() & laps["PitOutTime"].isna()]
+        numbers = set(laps["LapNumber"].dropna().astype(int))
+        if wanted is not None:
+            numbers &= wanted
+        if not numbers:
+            continue
+
+        try:
+            telemetry = load(driver)
+        except Exception as e:
+            logger.info(f"No telemetry for driver {driver}: {e}")
+            continue
+
+        abbreviation = _abbreviation(source, driver)
+        channels = [c for c in telemetry.columns if c not in KEY_COLUMNS]
+        for lap_number, frame in telemetry.laps():
+            if lap_number not in numbers or frame.empty:
+                continue
+            yield pd.DataFrame(
+                {
+                    "Driver": abbreviation,
+                    "DriverNumber": telemetry.driver_number,
+                    "LapNumber": np.full(len(frame), lap_number, dtype=np.int16),
+                    **{column: frame[column].to_numpy() for column in channels},
+                }
+            )
+        del telemetry
+
+
+def materialize(chunks):
+    """Every chunk as one frame, concatenated once at the end."""
+    chunks = list(chunks)
+    if not chunks:
+        return pd.DataFrame(columns=KEY_COLUMNS)
+    return pd.concat(chunks, ignore_index=True)
+
+
+def write_parquet(chunks, path, row_group_size=500_000, compression="zstd"):
+    """Streams chunks into one Parquet file, returning the rows written.
+
+    Chunks are buffered up to `row_group_size` rows and written as one row
+    group, which is all that is ever held in memory. The schema is taken
+    from the first row group and later ones are cast to it. Nothing is
+    written if there are no chunks.
+    """
+    writer = None
+    schema = None
+    buffered = []
+    buffered_rows = 0
+    rows = 0
+
+    def flush():
+        nonlocal writer, schema, buffered, buffered_rows
+        table = pa.Table.from_pandas(
+            pd.concat(buffered, ignore_index=True), schema=schema, preserve_index=False
+        )
+        if writer is None:
+            schema = table.schema
+            writer = pq.ParquetWriter(str(path), schema, compression=compression)
+        writer.write_table(table, row_group_size)
+        buffered = []
+        buffered_rows = 0
+
+    try:
+        for chunk in chunks:
+            buffered.append(chunk)
+            buffered_rows += len(chunk)
+            rows += len(chunk)
+            if buffered_rows >= row_group_size:
+                flush()
+        if buffered:
+            flush()
+    finally:
+        if writer is not None:
+            writer.close()
+    return rows
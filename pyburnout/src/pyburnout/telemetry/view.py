@@ -0,0 +1,220 @@
+import logging
+
+import fastf1.core
+import fastf1.plotting
+import numpy as np
+import pandas as pd
+
+from .session import DriverTelemetry, SessionTelemetry
+
+CATEGORY_COLUMNS = ["Driver", "Team", "Compound", "Abbreviation", "TeamName"]
+
+TELEMETRY_DTYPES = {
+    "Time": np.float64,
+    "SessionTime": np.float64,
+    "Speed": np.float32,
+    "RPM": np.float32,
+    "Throttle": np.float32,
+    "nGear": np.int8,
+    "Brake": np.int8,
+    "DRS": np.int8,
+    "X": np.float32,
+    "Y": np.float32,
+    "Z": np.float32,
+    "Distance": np.float32,
+    "LapNumber": np.float32,
+    "DirX": np.float32,
+    "DirY": np.float32,
+    "Heading": np.float32,
+    "HeadingChange": np.float32,
+    "TurnAngle": np.float32,
+}
+
+
+def frame_bytes(frame: pd.DataFrame):
+    return int(frame.memory_usage(deep=True).sum())
+
+
+def compact_frame(frame: pd.DataFrame):
+    # Timedeltas become float64 seconds in one vectorized pass per column
+    # and the repeated labels become categoricals
+    data = {}
+    for column in frame.columns:
+        series = frame[column]
+        if pd.api.types.is_timedelta64_dtype(series):
+            series = series.dt.total_seconds()
+        elif column in CATEGORY_COLUMNS:
+            series = series.astype("category")
+        data[column] = series
+    return pd.DataFrame(data, index=frame.index)
+
+
+def compact_telemetry(frame: pd.DataFrame):
+    data = {}
+    for column, dtype in TELEMETRY_DTYPES.items():
+        if column not in frame.columns:
+            continue
+        series = frame[column]
+        if pd.api.types.is_timedelta64_dtype(series):
+            series = series.dt.total_seconds()
+        if np.issubdtype(dtype, np.integer):
+            series = series.fillna(0)
+        data[column] = series.astype(dtype)
+    if "Source" in frame.columns:
+        data["Source"] = frame["Source"].astype("category")
+    return pd.DataFrame(data, index=frame.index)
+
+
+def session_metadata(session: fastf1.core.Session):
+    # Everything pit-wall needs from the FastF1 session besides the frames,
+    # so a view can stand in for the session once it is built
+    try:
+        driver_colours = fastf1.plotting.get_driver_color_mapping(session)
+    except Exception:
+        driver_colours = {}
+    try:
+        compound_colours = fastf1.plotting.get_compound_mapping(session)
+    except Exception:
+        compound_colours = {}
+    return {
+        "year": int(session.event.year),
+        "round_number": int(session.event["RoundNumber"]),
+        "name": session.name,
+        "session_info": session.session_info,
+        "driver_colours": dict(driver_colours),
+        "compound_colours": dict(compound_colours),
+    }
+
+
+class BaseSessionView:
+    """Lookups shared by every session view.
+
+    Subclasses set `results`, `laps`, `metadata`, `_laps_by_driver` and
+    `_numbers` and implement `driver_telemetry`, `memory_usage` and
+    `raw_memory_usage`.
+    """
+
+    def driver_number(self, driver):
+        return self._numbers.get(str(driver), str(driver))
+
+    @property
+    def drivers(self):
+        return self.results["Abbreviation"].astype(str).to_list()
+
+    @property
+    def session_info(self):
+        return self.metadata["session_info"]
+
+    @property
+    def driver_colours(self):
+        return self.metadata["driver_colours"]
+
+    @property
+    def compound_colours(self):
+        return self.metadata["compound_colours"]
+
+    def driver_laps(self, driver):
+        laps = self._laps_by_driver.get(driver)
+        if laps is None:
+            return self.laps.iloc[0:0]
+        return laps
+
+    def lap_telemetry(self, driver, lap_number, columns=None):
+        return self.driver_telemetry(driver, columns=columns).lap(lap_number)
+
+    def memory_report(self):
+        view_bytes = self.memory_usage()
+        raw_bytes = self.raw_memory_usage()
+        report = {
+            "view_bytes": view_bytes,
+            "raw_bytes": raw_bytes,
+            "ratio": view_bytes / raw_bytes if raw_bytes else 0.0,
+        }
+        self.logger.info(f"Session view memory: {report}")
+        return report
+
+
+def driver_numbers(results: pd.DataFrame):
+    return dict(
+        zip(
+            results["Abbreviation"].astype(str),
+            results["DriverNumber"].astype(str),
+        )
+    )
+
+
+def group_laps(laps: pd.DataFrame):
+    return {
+        driver: driver_laps
+        for driver, driver_laps in laps.groupby("Driver", observed=True, sort=False)
+    }
+
+
+class SessionView(BaseSessionView):
+    """Read-only, compact view of a loaded session.
+
+    Built once per session. Times are float64 seconds, labels are
+    categoricals, telemetry channels are downcast and laps are grouped by
+    driver up front. Every driver's telemetry is merged and compacted while
+    the view is built, one driver at a time, and neither the FastF1 session
+    nor the full precision merges are kept afterwards. Consumers should
+    select columns before changing anything; nothing here is meant to be
+    written to.
+    """
+
+    def __init__(
+        self,
+        session: fastf1.core.Session,
+        telemetry: SessionTelemetry = None,
+        logger: logging.Logger = None,
+    ):
+        self.logger = logger if logger else logging.Logger(__name__)
+        telemetry = (
+            telemetry if telemetry else SessionTelemetry(session, logger=self.logger)
+        )
+
+        self.metadata = session_metadata(session)
+        self.session_date = session.date
+        self.results = compact_frame(pd.DataFrame(session.results))
+        self.laps = compact_frame(pd.DataFrame(session.laps))
+        self._laps_by_driver = group_laps(self.laps)
+        self._numbers = driver_numbers(self.results)
+
+        self._telemetry = {}
+        for number in session.drivers:
+            try:
+                merged = telemetry.merge(number)
+            except Exception as e:
+                self.logger.info(f"No telemetry for driver {number}: {e}")
+                continue
+            self._telemetry[merged.driver_number] = DriverTelemetry(
+                merged.driver_number, compact_telemetry(merged.frame), merged.lap_index
+            )
+            del merged
+
+        self._raw_bytes = frame_bytes(session.results) + frame_bytes(session.laps)
+        for channel in (session.car_data, session.pos_data):
+            self._raw_bytes += sum(frame_bytes(t) for t in channel.values())
+
+    @property
+    def telemetry_drivers(self):
+        return list(self._telemetry)
+
+    def driver_telemetry(self, driver, columns=None) -> DriverTelemetry:
+        compact = self._telemetry.get(self.driver_number(driver))
+        if compact is None:
+            raise KeyError(f"No telemetry for driver {driver}")
+        if columns is None:
+            return compact
+        return compact.select(columns)
+
+    def memory_usage(self):
+        return (
+            frame_bytes(self.results)
+            + frame_bytes(self.laps)
+            + sum(frame_bytes(t.frame) for t in self._telemetry.values())
+        )
+
+    def raw_memory_usage(self):
+        # The FastF1 session's frames, measured before it was let go
+        return self._raw_bytes
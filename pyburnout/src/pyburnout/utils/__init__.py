@@ -1,4 +1,27 @@
 from .themes import apply_burnout_style
-from .steering import functionBySegment, angle, predictedRotationAngle, getSteering
+from .decimation import lttb_indices, lttb_union_indices, spatial_thin_indices
+from .steering import (
+    functionBySegment,
+    angle,
+    predictedRotationAngle,
+    getSteering,
+    getSteeringBatch,
+    headingChange,
+    segmentHeadings,
+    stackLaps,
+)
 
-__all__ = ["apply_burnout_style", "functionBySegment", "angle", "predictedRotationAngle", "getSteering"]
\ No newline at end of file
+__all__ = [
+    "apply_burnout_style",
+    "functionBySegment",
+    "angle",
+    "predictedRotationAngle",
+    "getSteering",
+    "getSteeringBatch",
+    "headingChange",
+    "segmentHeadings",
+    "stackLaps",
+    "lttb_indices",
+    "lttb_union_indices",
+    "spatial_thin_indices",
+]
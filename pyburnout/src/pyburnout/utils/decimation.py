@@ -0,0 +1,81 @@
+import numpy as np
+
+
+def _finite_indices(*columns):
+    valid = np.ones(len(columns[0]), dtype=bool)
+    for column in columns:
+        valid &= np.isfinite(column)
+    return np.flatnonzero(valid)
+
+
+def lttb_indices(x, y, threshold):
+    """Indices of the points Largest-Triangle-Three-Buckets keeps.
+
+    Keeps the visual shape of a line chart with `threshold` points. NaN
+    samples are dropped first; if there is nothing to gain every index is
+    returned.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    keep = _finite_indices(x, y)
+    n = len(keep)
+    if threshold < 3 or n <= threshold:
+        return keep
+
+    x = x[keep]
+    y = y[keep]
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+
+    out = np.empty(threshold, dtype=np.int64)
+    out[0] = 0
+    out[-1] = n - 1
+    a = 0
+    for i in range(threshold - 2):
+        start, stop = edges[i], edges[i + 1]
+        if i + 2 < len(edges):
+            next_start, next_stop = edges[i + 1], edges[i + 2]
+        else:
+            next_start, next_stop = n - 1, n
+        avg_x = x[next_start:next_stop].mean()
+        avg_y = y[next_start:next_stop].mean()
+
+        area = np.abs(
+            (x[a] - avg_x) * (y[start:stop] - y[a])
+            - (x[a] - x[start:stop]) * (avg_y - y[a])
+        )
+        a = start + int(np.argmax(area))
+        out[i + 1] = a
+    return keep[out]
+
+
+def lttb_union_indices(x, ys, threshold):
+    # One shared set of indices for several channels plotted on the same x
+    indices = [lttb_indices(x, y, threshold) for y in ys]
+    if not indices:
+        return np.arange(len(x))
+    return np.unique(np.concatenate(indices))
+
+
+def spatial_thin_indices(x, y, resolution):
+    """Keeps the first sample in each cell of a resolution x resolution grid.
+
+    Meant for track maps, where thousands of samples land on the same few
+    pixels.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    keep = _finite_indices(x, y)
+    if len(keep) <= resolution or resolution < 1:
+        return keep
+
+    x = x[keep]
+    y = y[keep]
+    span = max(np.ptp(x), np.ptp(y))
+    if span == 0:
+        return keep[:1]
+    cell = span / resolution
+
+    ix = ((x - x.min()) / cell).astype(np.int64)
+    iy = ((y - y.min()) / cell).astype(np.int64)
+    _, first = np.unique(ix * (resolution + 1) + iy, return_index=True)
+    return keep[np.sort(first)]
@@ -14,33 +14,88 @@ def functionBySegment(point1, point2):
         slope = 9999999999
     else:
         slope = (y2-y1)/(x2-x1)
-    
+
     intercept = y2 - slope*x2
     return [slope,intercept]
 
-def angle(s1, s2): 
+def angle(s1, s2):
     #Returns angle between two functions using their slopes
     #https://stackoverflow.com/questions/28260962/calculating-angles-between-line-segments-python-with-math-atan2
     return math.degrees(math.atan((s2-s1)/(1+(s2*s1))))
 
+def segmentHeadings(x, y):
+    #Heading in radians of every segment between consecutive points.
+    #Works on the last axis, so x and y can be one lap (n,) or a padded
+    #batch of laps (laps, n). Zero length segments (the car sat still or
+    #a sample repeated) carry the previous heading forward and NaN padding
+    #stays NaN.
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    dx = np.diff(x, axis=-1)
+    dy = np.diff(y, axis=-1)
+
+    headings = np.arctan2(dy, dx)
+    headings[(dx == 0) & (dy == 0)] = np.nan
+    return _forwardFill(headings, valid=~(np.isnan(dx) | np.isnan(dy)))
+
+def _forwardFill(values, valid):
+    #Forward fill NaNs along the last axis, but only inside valid samples
+    missing = np.isnan(values) & valid
+    if not missing.any():
+        return values
+    idx = np.where(missing, 0, np.arange(values.shape[-1]))
+    np.maximum.accumulate(idx, axis=-1, out=idx)
+    filled = np.take_along_axis(values, idx, axis=-1)
+    return np.where(valid, filled, np.nan)
+
+def smooth(values, window):
+    #Centered, NaN aware moving average along the last axis
+    if window is None or window <= 1:
+        return values
+    half = window // 2
+    pad = [(0, 0)] * (values.ndim - 1) + [(half, window - 1 - half)]
+    padded = np.pad(values, pad, constant_values=np.nan)
+    windows = np.lib.stride_tricks.sliding_window_view(padded, window, axis=-1)
+    counts = np.sum(~np.isnan(windows), axis=-1)
+    sums = np.nansum(windows, axis=-1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(counts > 0, sums / counts, np.nan)
+
+def headingChange(x, y, smoothing=None):
+    #Signed change in heading in degrees between consecutive segments,
+    #wrapped to [-180, 180). Positive is a turn to the left. Returns n-2
+    #values per lap, the same length getSteering always produced.
+    headings = segmentHeadings(x, y)
+    change = np.diff(headings, axis=-1)
+    change = (change + np.pi) % (2 * np.pi) - np.pi
+    return smooth(np.degrees(change), smoothing)
+
+def stackLaps(laps, columns=("X", "Y")):
+    #Pads a list of lap telemetry frames into 2-D arrays, one row per lap,
+    #so a whole season can go through headingChange in one call
+    lengths = np.array([len(lap) for lap in laps], dtype=np.int64)
+    width = int(lengths.max()) if len(lengths) else 0
+    stacked = []
+    for column in columns:
+        out = np.full((len(laps), width), np.nan)
+        for i, lap in enumerate(laps):
+            out[i, : lengths[i]] = np.asarray(lap[column], dtype=np.float64)
+        stacked.append(out)
+    return (*stacked, lengths)
+
+def getSteeringBatch(laps, smoothing=None):
+    #Steering for many laps at once, returned as one array per lap
+    x, y, lengths = stackLaps(laps)
+    change = headingChange(x, y, smoothing=smoothing)
+    return [change[i, : max(n - 2, 0)] for i, n in enumerate(lengths)]
+
 def predictedRotationAngle(p1, p2, p3):
-    #Get function going through points p1 and p2
-    coef1 = functionBySegment(p1, p2)
-    #Same for p2 and p3
-    coef2 = functionBySegment(p2, p3)
-    #Get angle between these two functions
-    return angle(coef1[0], coef2[0])
-
-def getSteering(lapTelemetry):
+    #Angle between segment p1->p2 and segment p2->p3
+    x = np.array([p1[0], p2[0], p3[0]], dtype=np.float64)
+    y = np.array([p1[1], p2[1], p3[1]], dtype=np.float64)
+    return float(headingChange(x, y)[0])
+
+def getSteering(lapTelemetry, smoothing=None):
   x = lapTelemetry['X'].values
   y = lapTelemetry['Y'].values
-
-  #Combine x and y into pairs
-  points = np.array([x,y]).T.reshape(-1,1,2)
-
-  angles = []
-  for i in range(len(points)-2):
-      #Take 3 points, calculate angle and save it
-      prediction = predictedRotationAngle(points[i][0],points[i+1][0],points[i+2][0])
-      angles.append(prediction)
-  return angles
\ No newline at end of file
+  return headingChange(x, y, smoothing=smoothing).tolist()
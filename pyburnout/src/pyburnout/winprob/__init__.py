@@ -0,0 +1,21 @@
+from .curves import (
+    exp_model,
+    fit_starting_probability,
+    grid_win_shares,
+    probability_matrix,
+    starting_probability,
+    win_probability_curves,
+)
+from .simulation import RaceSimulator, net_gain_samples, simulate_races
+
+__all__ = [
+    "exp_model",
+    "fit_starting_probability",
+    "grid_win_shares",
+    "probability_matrix",
+    "starting_probability",
+    "win_probability_curves",
+    "RaceSimulator",
+    "net_gain_samples",
+    "simulate_races",
+]
@@ -0,0 +1,113 @@
+import numpy as np
+import pandas as pd
+
+
+def exp_model(x, a, b):
+    return a * np.exp(-b * x)
+
+
+def grid_win_shares(results: pd.DataFrame, grid_positions=20):
+    """Share of each circuit's wins taken from each grid position.
+
+    `results` has the columns of the driver-results CSVs plus a `circuit`
+    column. Returns a frame indexed by circuit with one column per grid
+    position, 1 to `grid_positions`; pit lane starts (grid 0) and grid
+    slots past the last column aren't counted.
+    """
+    position = pd.to_numeric(results["position"], errors="coerce")
+    winners = results[position == 1]
+    grid = pd.to_numeric(winners["grid"], errors="coerce")
+    counts = pd.crosstab(winners["circuit"], grid).reindex(
+        columns=range(1, grid_positions + 1), fill_value=0
+    )
+    return counts.div(counts.sum(axis=1).replace(0, np.nan), axis=0).fillna(0.0)
+
+
+def fit_starting_probability(results: pd.DataFrame, grid_positions=20):
+    """Fits `exp_model` to the grid win shares of every circuit.
+
+    Returns a frame indexed by circuit with the `a` and `b` parameters,
+    which is what `starting_probability` and `win_probability_curves` take.
+    """
+    from scipy.optimize import curve_fit
+
+    shares = grid_win_shares(results, grid_positions)
+    x = shares.columns.to_numpy(dtype=np.float64)
+    params = {}
+    for circuit, y in shares.iterrows():
+        (a, b), _ = curve_fit(exp_model, x, y.to_numpy(dtype=np.float64), p0=(1, 1))
+        params[circuit] = {"a": a, "b": b}
+    return pd.DataFrame.from_dict(params, orient="index")
+
+
+def starting_probability(params: pd.DataFrame, grid_positions=20, decimals=4):
+    """Modelled win probability from the grid, shape (circuits, positions)."""
+    x = np.arange(1, grid_positions + 1, dtype=np.float64)
+    a = params["a"].to_numpy(dtype=np.float64)[:, None]
+    b = params["b"].to_numpy(dtype=np.float64)[:, None]
+    start = exp_model(x[None, :], a, b)
+    return np.round(start, decimals) if decimals is not None else start
+
+
+def probability_matrix(start, total_laps, scale=1.5):
+    """Lap by lap win probability for every circuit and grid position.
+
+    `start` is the (circuits, positions) starting probability and
+    `total_laps` the race length of each circuit. Each lap moves a car a
+    fraction `scale ** -(laps remaining)` of the way to its target, which
+    is a win for the car in first and nothing for everyone else, so the
+    whole race is one cumulative product per circuit. Returns an array of
+    shape (circuits, positions, max laps + 1), with lap 0 the start and
+    NaN past the end of shorter races. Starting probabilities are clipped
+    to [0, 1].
+    """
+    start = np.atleast_2d(np.asarray(start, dtype=np.float64))
+    total_laps = np.broadcast_to(np.asarray(total_laps, dtype=np.int64), len(start))
+    scale = np.broadcast_to(np.asarray(scale, dtype=np.float64), len(start))
+
+    lap = np.arange(1, total_laps.max() + 1)
+    remaining = (total_laps[:, None] - lap[None, :]).astype(np.float64)
+    step = 1.0 - scale[:, None] ** -remaining
+    step[remaining < 0] = np.nan
+    keep = np.concatenate([np.ones((len(start), 1)), np.cumprod(step, axis=1)], axis=1)
+
+    # The leader closes in on a win the same way everyone else fades to
+    # nothing, so its curve is the mirror image of the rest
+    start = np.clip(start, 0.0, 1.0)[:, :, None]
+    state = start * keep[:, None, :]
+    state[:, 0] = 1.0 - (1.0 - start[:, 0]) * keep
+    return state
+
+
+def win_probability_curves(
+    params: pd.DataFrame, total_laps, scale=1.5, grid_positions=20
+):
+    """Base win probability curves of every circuit as one tidy frame.
+
+    `params` is indexed by circuit, see `fit_starting_probability`, and
+    `total_laps` maps each circuit to its race length, e.g. the highest
+    `lap` of its driver-lap-data, or is one length for all of them. The
+    columns match the notebook's `base_state_df`:
+    circuit, position, lap_number and state.
+    """
+    circuits = params.index.to_numpy()
+    if isinstance(total_laps, (dict, pd.Series)):
+        laps = pd.Series(total_laps).reindex(circuits).to_numpy(dtype=np.int64)
+    else:
+        laps = np.full(len(circuits), int(total_laps))
+
+    start = starting_probability(params, grid_positions)
+    state = probability_matrix(start, laps, scale)
+
+    n_circuits, n_positions, n_laps = state.shape
+    frame = pd.DataFrame(
+        {
+            "circuit": np.repeat(circuits, n_positions * n_laps),
+            "position": np.tile(
+                np.repeat(np.arange(1, n_positions + 1), n_laps), n_circuits
+            ),
+            "lap_number": np.tile(np.arange(n_laps), n_circuits * n_positions),
+            "state": state.ravel(),
+        }
+    )
+    return frame[frame["state"].notna()].reset_index(drop=True)
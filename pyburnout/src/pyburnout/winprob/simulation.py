@@ -0,0 +1,199 @@
+from concurrent.futures import ProcessPoolExecutor
+import logging
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+
+def net_gain_samples(lap_data: pd.DataFrame, iqr_fence=3.0):
+    """Observed lap by lap gap changes of every circuit in driver-lap-data.
+
+    Only ordinary racing laps are sampled. Lap 1 is left out, since the
+    start doesn't look like any other lap, and so is the leader, who has no
+    car ahead to gain on. Pit in and out laps and safety car laps are left
+    out where the data flags them (`pit_lap` and `safety_car`, see
+    `driver_ahead_laps`), as is every lap on which the driver's position
+    changed: the gaps at either end of it are to different cars, and in the
+    older CSVs, which have no pit flags, it also catches most pit stops.
+    What remains is fenced per circuit at `iqr_fence` interquartile ranges
+    beyond the quartiles, which drops the laps ruined by incidents; None
+    keeps them. On the shipped Bahrain and Monza data this keeps about 70%
+    of the laps and takes the spread from ~300 m to ~70 m.
+
+    Returns the samples and the race length (highest lap) of each circuit.
+    """
+    lap_data = lap_data.reset_index(drop=True)
+    position = pd.to_numeric(lap_data["position"], errors="coerce")
+    lap = pd.to_numeric(lap_data["lap"], errors="coerce")
+    net_gain = pd.to_numeric(lap_data["net_gain"], errors="coerce")
+    # Position on each driver's previous lap, whatever order the rows are in
+    by_lap = lap.sort_values(kind="stable").index
+    previous = (
+        position[by_lap]
+        .groupby([lap_data[key][by_lap] for key in ("year", "circuit", "driver_num")])
+        .shift()
+        .reindex(lap_data.index)
+    )
+    usable = (lap > 1) & (position > 1) & (previous == position)
+    usable &= np.isfinite(net_gain)
+    for flag in ("pit_lap", "safety_car"):
+        if flag in lap_data:
+            usable &= ~lap_data[flag].fillna(False).astype(bool)
+
+    samples = {}
+    total_laps = {}
+    for circuit, rows in lap_data.groupby("circuit").groups.items():
+        gains = net_gain[rows][usable[rows]].to_numpy(dtype=np.float64)
+        if iqr_fence is not None and len(gains):
+            q1, q3 = np.percentile(gains, [25, 75])
+            fence = iqr_fence * (q3 - q1)
+            gains = gains[(gains >= q1 - fence) & (gains <= q3 + fence)]
+        samples[circuit] = gains
+        total_laps[circuit] = int(lap[rows].max())
+    return samples, total_laps
+
+
+def simulate_races(net_gains, gaps, laps, n_races, rng: np.random.Generator):
+    """Runs `n_races` copies of the rest of a race at once.
+
+    `gaps` are the metres from each car to the one ahead, in running order.
+    Every lap, every gap moves by a bootstrapped net gain; a gap that goes
+    negative is an overtake, so the field is re-sorted on distance behind
+    the leader. Returns how many races each car won, in the order of `gaps`.
+    """
+    n_cars = len(gaps)
+    gap = np.tile(np.asarray(gaps, dtype=np.float64), (n_races, 1))
+    gap[:, 0] = 0.0
+    order = np.tile(np.arange(n_cars), (n_races, 1))
+    if n_cars > 1:
+        for _ in range(laps):
+            gap[:, 1:] += net_gains[
+                rng.integers(0, len(net_gains), (n_races, n_cars - 1))
+            ]
+            behind = np.cumsum(gap, axis=1)
+            running = np.argsort(behind, axis=1, kind="stable")
+            behind = np.take_along_axis(behind, running, axis=1)
+            order = np.take_along_axis(order, running, axis=1)
+            gap = np.diff(behind, axis=1, prepend=behind[:, :1])
+    return np.bincount(order[:, 0], minlength=n_cars)
+
+
+def simulate_shard(net_gains, gaps, laps, n_races, seed):
+    # Runs in a worker process; every shard has its own seed, so the result
+    # doesn't depend on how the shards were spread over workers
+    return simulate_races(net_gains, gaps, laps, n_races, np.random.default_rng(seed))
+
+
+class RaceSimulator:
+    """Monte Carlo win probability from per-circuit gap change distributions.
+
+    The distributions are the net gains of the win-probability
+    driver-lap-data files (see `net_gain_samples`). A race state is the
+    completed lap, the drivers in running order and their gaps in metres to
+    the car ahead. `simulate` spreads a large, seeded run over a process
+    pool; `win_probability` answers in-process within a time budget, for
+    live use.
+    """
+
+    def __init__(
+        self,
+        net_gains,
+        total_laps,
+        workers=None,
+        shard_size=10_000,
+        logger: logging.Logger = None,
+    ):
+        self.net_gains = {
+            circuit: np.asarray(samples, dtype=np.float64)
+            for circuit, samples in net_gains.items()
+        }
+        self.total_laps = dict(total_laps)
+        self.workers = workers if workers else os.cpu_count()
+        self.shard_size = shard_size
+        self.logger = logger if logger else logging.Logger(__name__)
+
+    @classmethod
+    def from_lap_data(cls, lap_data: pd.DataFrame, iqr_fence=3.0, **kwargs):
+        return cls(*net_gain_samples(lap_data, iqr_fence), **kwargs)
+
+    @classmethod
+    def read_csv(cls, paths, **kwargs):
+        return cls.from_lap_data(
+            pd.concat((pd.read_csv(path) for path in paths), ignore_index=True),
+            **kwargs,
+        )
+
+    def _state(self, circuit, lap, drivers, gaps):
+        if circuit not in self.net_gains or not len(self.net_gains[circuit]):
+            raise ValueError(f"No gap data for {circuit}")
+        drivers = list(drivers)
+        gaps = np.asarray(gaps, dtype=np.float64)
+        if len(gaps) != len(drivers):
+            raise ValueError("Need one gap per driver")
+        if not np.isfinite(gaps[1:]).all():
+            raise ValueError("Gaps behind the leader must be finite")
+        laps = max(self.total_laps[circuit] - int(lap), 0)
+        return self.net_gains[circuit], drivers, gaps, laps
+
+    def _probability(self, drivers, wins, races):
+        probability = pd.Series(
+            wins / races, index=drivers, name="win_probability", dtype=np.float64
+        )
+        probability.attrs["races"] = races
+        return probability
+
+    def simulate(self, circuit, lap, drivers, gaps, n_races=100_000, seed=None):
+        """Win probability of each driver from `n_races` simulated finishes.
+
+        Races are run in shards of `shard_size` over the process pool. The
+        shards' seeds are spawned from `seed`, so the same seed and race
+        count give the same answer whatever the number of workers.
+        """
+        start = time.perf_counter()
+        net_gains, drivers, gaps, laps = self._state(circuit, lap, drivers, gaps)
+        sizes = [self.shard_size] * (n_races // self.shard_size)
+        if n_races % self.shard_size:
+            sizes.append(n_races % self.shard_size)
+        seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+
+        wins = np.zeros(len(drivers), dtype=np.int64)
+        with ProcessPoolExecutor(max_workers=self.workers) as executor:
+            futures = [
+                executor.submit(simulate_shard, net_gains, gaps, laps, size, shard_seed)
+                for size, shard_seed in zip(sizes, seeds)
+            ]
+            for future in futures:
+                wins += future.result()
+
+        self.logger.info(
+            f"Simulated {n_races} races of {laps} laps at {circuit} in "
+            f"{time.perf_counter() - start:.2f}s"
+        )
+        return self._probability(drivers, wins, n_races)
+
+    def win_probability(
+        self, circuit, lap, drivers, gaps, budget=0.05, batch_size=2_000, seed=None
+    ):
+        """Win probability of each driver, answered within `budget` seconds.
+
+        Races run in this process, starting with a small batch and sizing
+        the rest (up to `batch_size`) on the time per race so far, until the
+        budget is spent. The answer gets sharper the more time it is given;
+        the number of races behind it is in `.attrs["races"]`.
+        """
+        start = time.perf_counter()
+        net_gains, drivers, gaps, laps = self._state(circuit, lap, drivers, gaps)
+        rng = np.random.default_rng(seed)
+
+        wins = np.zeros(len(drivers), dtype=np.int64)
+        races = 0
+        smallest = max(batch_size // 8, 1)
+        size = smallest
+        while size >= smallest:
+            wins += simulate_races(net_gains, gaps, laps, size, rng)
+            races += size
+            elapsed = time.perf_counter() - start
+            size = min(batch_size, int((budget - elapsed) / (elapsed / races)))
+        return self._probability(drivers, wins, races)
@@ -0,0 +1,156 @@
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import quote, unquote, urlparse
+import hashlib
+import threading
+import time
+
+import pytest
+
+
+class StubSite:
+    """What the stand-in FIA server serves, and what it saw.
+
+    `documents` maps a path to its bytes and `listings` maps an event name
+    to the document paths listed for it; any other listing is empty.
+    `titles` overrides the title a path is listed under. Listings and
+    documents carry an ETag and answer a matching If-None-Match with 304.
+    `failures` maps a path to statuses to answer with before serving it.
+    """
+
+    def __init__(self):
+        self.documents = {}
+        self.etags = {}
+        self.listings = {}
+        self.titles = {}
+        self.failures = {}
+        self.delay = 0.0
+        self.requests = []
+        self.active = 0
+        self.max_active = 0
+        self._lock = threading.Lock()
+
+    def add_document(self, path, content, etag=None):
+        self.documents[path] = content
+        self.etags[path] = etag if etag else f'"{len(content)}-{hash(content)}"'
+
+    def title(self, i, path):
+        return self.titles.get(path, f'Doc {i} - {path.rsplit("/", 1)[-1]}')
+
+    def listing_html(self, event):
+        rows = "".join(
+            f'<li class="document-row key-{i}">'
+            f'<a href="{quote(path)}"><div class="title">{self.title(i, path)}</div>'
+            f'<div class="published">Published on '
+            f'<span class="date-display-single">01.03.24 08:{i:02d}</span> CET</div>'
+            f"</a></li>"
+            for i, path in enumerate(self.listings.get(event, []))
+        )
+        return f"<html><body><ul>{rows}</ul></body></html>".encode()
+
+    def enter(self):
+        with self._lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+
+    def leave(self):
+        with self._lock:
+            self.active -= 1
+
+    def next_failure(self, path):
+        with self._lock:
+            statuses = self.failures.get(path)
+            return statuses.pop(0) if statuses else None
+
+
+def _handler(site: StubSite):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *args):
+            pass
+
+        def do_HEAD(self):
+            self._serve(body=False)
+
+        def do_GET(self):
+            self._serve(body=True)
+
+        def _send(self, status, payload=b"", headers=None, body=True):
+            self.send_response(status)
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            if body:
+                self.wfile.write(payload)
+
+        def _serve(self, body):
+            path = unquote(urlparse(self.path).path)
+            # Recorded on arrival: a client can act on a short response
+            # before the handler gets to run anything after sending it
+            with site._lock:
+                site.requests.append(
+                    (self.command, path, dict(self.headers), time.perf_counter())
+                )
+            site.enter()
+            try:
+                time.sleep(site.delay)
+                status = site.next_failure(path)
+                if status is not None:
+                    self._send(status, b"unavailable", body=body)
+                elif "/event/" in path:
+                    event = path.rsplit("/event/", 1)[1]
+                    self._listing(site.listing_html(event), body)
+                elif path in site.documents:
+                    self._document(path, body)
+                else:
+                    self._send(404, body=body)
+            finally:
+                site.leave()
+
+        def _listing(self, html, body):
+            etag = f'"{hashlib.sha256(html).hexdigest()[:16]}"'
+            if self.headers.get("If-None-Match") == etag:
+                self._send(304, headers={"ETag": etag}, body=False)
+                return
+            headers = {"ETag": etag, "Content-Type": "text/html; charset=utf-8"}
+            self._send(200, html, headers, body)
+
+        def _document(self, path, body):
+            content = site.documents[path]
+            etag = site.etags[path]
+            if self.headers.get("If-None-Match") == etag:
+                self._send(304, headers={"ETag": etag}, body=False)
+                return
+            headers = {"ETag": etag, "Content-Type": "application/pdf"}
+            range_header = self.headers.get("Range")
+            if range_header and self.headers.get("If-Range", etag) == etag:
+                start = int(range_header.split("=")[1].split("-")[0])
+                if start >= len(content):
+                    self._send(416, body=body)
+                    return
+                headers["Content-Range"] = (
+                    f"bytes {start}-{len(content) - 1}/{len(content)}"
+                )
+                self._send(206, content[start:], headers, body)
+                return
+            self._send(200, content, headers, body)
+
+    return Handler
+
+
+@pytest.fixture
+def fia_site():
+    site = StubSite()
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _handler(site))
+    server.daemon_threads = True
+    thread = threading.Thread(
+        target=server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True
+    )
+    thread.start()
+    site.base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    try:
+        yield site
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,186 @@
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+import csv
+import threading
+
+import lxml.html
+import pytest
+
+from pyburnout.scrapers.f2 import (
+    F2SiteScraper,
+    parse_standings_html,
+    rendered_text,
+    standings_headings,
+)
+
+FIXTURES = Path(__file__).parents[1] / "benchmarks" / "fixtures" / "f2"
+
+
+def fixture(name):
+    return (FIXTURES / name).read_bytes()
+
+
+@pytest.fixture
+def f2_site():
+    # path -> (status, body); anything else is a 404
+    pages = {}
+
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def do_GET(self):
+            status, body = pages.get(self.path.split("?")[0], (404, b""))
+            self.send_response(status)
+            self.send_header("Content-Type", "text/html")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(
+        target=server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True
+    )
+    thread.start()
+    pages["base_url"] = f"http://127.0.0.1:{server.server_address[1]}"
+    try:
+        yield pages
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+@pytest.fixture
+def scraper(f2_site, tmp_path):
+    scraper = F2SiteScraper(dirpath=str(tmp_path), retries=0)
+    scraper.BASE_URL = f2_site["base_url"]
+    selenium_urls = []
+
+    def standings_selenium(url, pool=None):
+        selenium_urls.append(url)
+        return ["Pos", "Driver"], [["1", "Rendered Driver"]]
+
+    scraper._standings_selenium = standings_selenium
+    scraper.selenium_urls = selenium_urls
+    return scraper
+
+
+def test_race_headings_split_into_sprint_and_feature():
+    headings = standings_headings(
+        ["Pos", "Driver", "BHR\n29 Feb-02 Mar\nSR\nFR", "SAU\n07-09 Mar\nSR\nFR"]
+    )
+    assert headings == ["Pos", "Driver", "BHR-SR", "BHR-FR", "SAU-SR", "SAU-FR"]
+
+
+def test_rendered_text_matches_visible_layout():
+    element = lxml.html.fromstring(
+        "<th><div class='round'>BHR</div><div>29  Feb-02\n Mar</div>"
+        "<span style='display: none'>hidden</span><script>x = 1</script>"
+        "<div>SR</div><div>FR</div></th>"
+    )
+    assert rendered_text(element) == "BHR\n29 Feb-02 Mar\nSR\nFR"
+
+
+def test_driver_standings_page():
+    headings, rows = parse_standings_html(fixture("driver_standings.html"))
+
+    races = [f"{r}-{t}" for r in ("BHR", "SAU", "AUS") for t in ("SR", "FR")]
+    assert headings[:9] == ["Pos", "Driver", "Team", *races]
+    assert headings[-3:] == ["ARE-SR", "ARE-FR", "Points"]
+    assert len(headings) == 3 + 2 * 14 + 1
+    assert len(rows) == 22
+    assert all(len(row) == len(headings) for row in rows)
+    # The position change column is dropped, as the Selenium scraper did
+    assert rows[0][:5] == ["1", "Driver 01", "Team 01", "10", "25"]
+    assert rows[0][-1] == "231"
+    assert rows[-1][:3] == ["22", "Driver 22", "Team 11"]
+
+
+def test_team_standings_page():
+    headings, rows = parse_standings_html(fixture("team_standings.html"))
+
+    assert headings[:4] == ["Pos", "Team", "BHR-SR", "BHR-FR"]
+    assert len(headings) == 2 + 2 * 14 + 1
+    assert len(rows) == 11
+    assert all(len(row) == len(headings) for row in rows)
+    assert rows[0][:2] == ["1", "Team 01"]
+    assert rows[0][headings.index("ITA-SR")] == "5"
+
+
+@pytest.mark.parametrize("html", [b"", b"   ", fixture("client_rendered.html")])
+def test_pages_without_a_table_do_not_parse(html):
+    assert parse_standings_html(html) is None
+
+
+def test_table_without_rows_does_not_parse():
+    html = b"<table><thead><tr><th>Pos</th></tr></thead><tbody></tbody></table>"
+    assert parse_standings_html(html) is None
+
+
+def test_server_rendered_page_skips_selenium(f2_site, scraper, tmp_path):
+    f2_site["/Standings/Driver"] = (200, fixture("driver_standings.html"))
+
+    headings, rows = scraper.get_standings("driver_standings", 2024)
+
+    assert scraper.selenium_urls == []
+    assert len(rows) == 22
+    with open(tmp_path / "f2_2024_driver_standings.csv", newline="") as f:
+        written = list(csv.reader(f))
+    assert written[0] == headings
+    assert written[1:] == rows
+
+
+def test_client_rendered_page_falls_back_to_selenium(f2_site, scraper):
+    f2_site["/Standings/Team"] = (200, fixture("client_rendered.html"))
+
+    standings = scraper.get_standings("team_standings", 2024)
+
+    assert scraper.selenium_urls == [scraper.standings_url("team_standings", 2024)]
+    assert standings == (["Pos", "Driver"], [["1", "Rendered Driver"]])
+
+
+def test_failed_request_falls_back_to_selenium(f2_site, scraper):
+    f2_site["/Standings/Driver"] = (500, b"")
+
+    scraper.get_standings("driver_standings", 2024)
+
+    assert scraper.selenium_urls == [scraper.standings_url("driver_standings", 2024)]
+
+
+class FakeDriver:
+    def __init__(self, table):
+        self.table = table
+        self.urls = []
+
+    def get(self, url):
+        self.urls.append(url)
+
+    def execute_script(self, script):
+        return self.table
+
+
+class FakePool:
+    def __init__(self, driver):
+        self.driver = driver
+
+    @contextmanager
+    def browser(self):
+        yield self.driver
+
+
+def test_selenium_table_is_parsed_like_the_html():
+    # innerText of the same cells the HTML path reads
+    driver = FakeDriver(
+        {
+            "headings": ["Pos", "Driver", "BHR\n29 Feb-02 Mar\nSR\nFR", "Points"],
+            "rows": [[], ["Change -\n1", "Driver 01", "10\n25", "35"]],
+        }
+    )
+    scraper = F2SiteScraper(retries=0)
+
+    headings, rows = scraper._standings_selenium("http://f2.test", FakePool(driver))
+
+    assert driver.urls == ["http://f2.test"]
+    assert headings == ["Pos", "Driver", "BHR-SR", "BHR-FR", "Points"]
+    assert rows == [["1", "Driver 01", "10", "25", "35"]]
@@ -0,0 +1,360 @@
+from datetime import datetime
+from pathlib import Path
+import hashlib
+import os
+
+import pytest
+
+from pyburnout.scrapers import fia
+from pyburnout.scrapers.fia import FIASiteScraper
+from pyburnout.scrapers.fia_listing import (
+    FIADocument,
+    parse_listing,
+    parse_listing_soup,
+)
+
+FIXTURES = Path(__file__).parents[1] / "benchmarks" / "fixtures" / "fia"
+PDF = b"%PDF-1.7\n" + bytes(range(256)) * 400 + b"\n%%EOF\n"
+DOCS = "/sites/default/files/decision-document"
+
+
+@pytest.fixture
+def scraper(fia_site, tmp_path):
+    scraper = FIASiteScraper(
+        base_url=fia_site.base_url,
+        docs_path=str(tmp_path / "docs"),
+        workers=8,
+        max_per_host=2,
+        retries=3,
+        backoff_factor=0,
+        timeout=5,
+        chunk_size=1024,
+    )
+    yield scraper
+    scraper.manifest.close()
+
+
+def requests_for(site, path, method="GET"):
+    return [r for r in site.requests if r[0] == method and r[1] == path]
+
+
+def test_listing_documents_are_downloaded(fia_site, scraper, tmp_path):
+    fia_site.add_document(f"{DOCS}/Fastest Laps.pdf", PDF)
+    fia_site.listings["Bahrain Grand Prix"] = [f"{DOCS}/Fastest Laps.pdf"]
+
+    documents = scraper.list_documents("2024", "f1", "bahrain")
+    assert len(documents) == 1
+    url, file_path = documents[0]
+    assert url == f"{fia_site.base_url}{DOCS}/Fastest%20Laps.pdf"
+
+    assert scraper.download_document(url, file_path) is True
+    with open(file_path, "rb") as f:
+        assert f.read() == PDF
+    assert not os.path.exists(f"{file_path}.part")
+    record = scraper.manifest.document(url)
+    assert record["sha256"] == hashlib.sha256(PDF).hexdigest()
+
+    # Already in the manifest and on disk, so nothing is fetched again
+    assert scraper.download_document(url, file_path) is False
+    assert len(requests_for(fia_site, f"{DOCS}/Fastest Laps.pdf")) == 1
+
+
+def test_bulk_download_respects_per_host_limit(fia_site, scraper):
+    fia_site.delay = 0.02
+    paths = [f"{DOCS}/Document {i}.pdf" for i in range(12)]
+    for path in paths:
+        fia_site.add_document(path, PDF)
+    fia_site.listings["Bahrain Grand Prix"] = paths
+
+    downloaded, failed = scraper.bulk_download_all_documents("2024")
+
+    assert failed == []
+    assert downloaded == 12
+    assert fia_site.max_active == 2
+
+
+def test_listings_pipeline_into_downloads(fia_site, scraper):
+    fia_site.delay = 0.02
+    fia_site.add_document(f"{DOCS}/Entry List.pdf", PDF)
+    fia_site.listings["Bahrain Tests Season"] = [f"{DOCS}/Entry List.pdf"]
+
+    downloaded, failed = scraper.bulk_download_all_documents("2024")
+
+    assert downloaded == 1 and failed == []
+    listings = [r for r in fia_site.requests if "/event/" in r[1]]
+    download = requests_for(fia_site, f"{DOCS}/Entry List.pdf")[0]
+    assert len(listings) == len(scraper.CHAMPIONSHIP_PATHS) * len(scraper.EVENT_PATHS)
+    # The PDF was fetched while listing pages were still being served
+    assert download[3] < max(started for _, _, _, started in listings)
+
+
+@pytest.mark.parametrize("statuses", [[503], [500, 502], [429, 429]])
+def test_retries_throttling_and_server_errors(fia_site, scraper, statuses):
+    fia_site.add_document(f"{DOCS}/Decision.pdf", PDF)
+    fia_site.failures[f"{DOCS}/Decision.pdf"] = list(statuses)
+    url = f"{fia_site.base_url}{DOCS}/Decision.pdf"
+    file_path = os.path.join(scraper.BASE_DOCS_PATH, "Decision.pdf")
+
+    assert scraper.download_document(url, file_path) is True
+    with open(file_path, "rb") as f:
+        assert f.read() == PDF
+    assert len(requests_for(fia_site, f"{DOCS}/Decision.pdf")) == len(statuses) + 1
+
+
+def test_gives_up_after_retries(fia_site, scraper):
+    fia_site.add_document(f"{DOCS}/Decision.pdf", PDF)
+    fia_site.failures[f"{DOCS}/Decision.pdf"] = [503] * 10
+    url = f"{fia_site.base_url}{DOCS}/Decision.pdf"
+    file_path = os.path.join(scraper.BASE_DOCS_PATH, "Decision.pdf")
+
+    with pytest.raises(Exception):
+        scraper.download_document(url, file_path)
+    assert not os.path.exists(file_path)
+
+
+def _partial_download(fia_site, scraper, etag, offset):
+    url = f"{fia_site.base_url}{DOCS}/Decision.pdf"
+    file_path = os.path.join(scraper.BASE_DOCS_PATH, "Decision.pdf")
+    os.makedirs(scraper.BASE_DOCS_PATH, exist_ok=True)
+    with open(f"{file_path}.part", "wb") as f:
+        f.write(PDF[:offset])
+    scraper.manifest.record_partial(url, etag, None)
+    return url, file_path
+
+
+def test_resumes_part_file_with_range(fia_site, scraper):
+    fia_site.add_document(f"{DOCS}/Decision.pdf", PDF, etag='"v1"')
+    url, file_path = _partial_download(fia_site, scraper, '"v1"', 40_000)
+
+    assert scraper.download_document(url, file_path) is True
+
+    request = requests_for(fia_site, f"{DOCS}/Decision.pdf")[0]
+    assert request[2]["Range"] == "bytes=40000-"
+    assert request[2]["If-Range"] == '"v1"'
+    with open(file_path, "rb") as f:
+        assert f.read() == PDF
+    assert not os.path.exists(f"{file_path}.part")
+    assert scraper.stats.report()["resumed"] == 1
+    assert scraper.stats.bytes == len(PDF) - 40_000
+    assert scraper.manifest.partial(url) is None
+    assert scraper.manifest.document(url)["sha256"] == hashlib.sha256(PDF).hexdigest()
+
+
+def test_changed_document_restarts_download(fia_site, scraper):
+    fia_site.add_document(f"{DOCS}/Decision.pdf", PDF, etag='"v2"')
+    url, file_path = _partial_download(fia_site, scraper, '"v1"', 40_000)
+
+    assert scraper.download_document(url, file_path) is True
+
+    with open(file_path, "rb") as f:
+        assert f.read() == PDF
+    assert scraper.stats.report()["resumed"] == 0
+    assert scraper.manifest.document(url)["etag"] == '"v2"'
+
+
+def test_unchanged_listing_comes_from_the_manifest(fia_site, scraper, monkeypatch):
+    fia_site.add_document(f"{DOCS}/Fastest Laps.pdf", PDF)
+    fia_site.listings["Bahrain Grand Prix"] = [f"{DOCS}/Fastest Laps.pdf"]
+    parsed = []
+    monkeypatch.setattr(
+        fia,
+        "parse_listing",
+        lambda *args, **kwargs: parsed.append(args) or parse_listing(*args, **kwargs),
+    )
+
+    documents = scraper.list_documents("2024", "f1", "bahrain")
+    again = scraper.list_documents("2024", "f1", "bahrain")
+
+    assert again == documents
+    assert len(parsed) == 1
+    first, second = [r for r in fia_site.requests if "/event/" in r[1]]
+    assert "If-None-Match" not in first[2]
+    assert (
+        second[2]["If-None-Match"]
+        == scraper.manifest.listing(scraper.listing_url("2024", "f1", "bahrain"))[
+            "etag"
+        ]
+    )
+
+
+def test_renamed_document_is_moved_not_downloaded(fia_site, scraper):
+    path = f"{DOCS}/Decision.pdf"
+    fia_site.add_document(path, PDF)
+    fia_site.listings["Bahrain Grand Prix"] = [path]
+    [(url, old_path)] = scraper.list_documents("2024", "f1", "bahrain")
+    scraper.download_document(url, old_path)
+
+    fia_site.titles[path] = "Doc 0 - Decision (corrected title)"
+    [(_, new_path)] = scraper.list_documents("2024", "f1", "bahrain")
+
+    assert new_path != old_path
+    assert scraper.download_document(url, new_path) is False
+    assert not os.path.exists(old_path)
+    with open(new_path, "rb") as f:
+        assert f.read() == PDF
+    assert scraper.manifest.document(url)["path"] == new_path
+    # Only checked with a conditional request, which came back 304
+    gets = requests_for(fia_site, path)
+    assert len(gets) == 2 and gets[1][2]["If-None-Match"] == fia_site.etags[path]
+    assert scraper.stats.bytes == len(PDF)
+
+
+def test_document_listed_under_another_event_is_copied(fia_site, scraper, tmp_path):
+    path = f"{DOCS}/Entry List.pdf"
+    fia_site.add_document(path, PDF)
+    url = f"{fia_site.base_url}{DOCS}/Entry%20List.pdf"
+    first = str(tmp_path / "docs" / "bahrain" / "Entry List.pdf")
+    second = str(tmp_path / "docs" / "testing" / "Entry List.pdf")
+
+    assert scraper.download_document(url, first) is True
+    assert scraper.download_document(url, second) is False
+
+    with open(second, "rb") as f:
+        assert f.read() == PDF
+    assert os.path.exists(first)
+    assert len(requests_for(fia_site, path)) == 1
+
+
+@pytest.mark.parametrize(
+    "existing, adopted",
+    [(PDF, True), (PDF[:40_000], False), (b"", False), (b"<html>" + PDF, False)],
+)
+def test_file_from_before_the_manifest(fia_site, scraper, existing, adopted):
+    path = f"{DOCS}/Decision.pdf"
+    fia_site.add_document(path, PDF)
+    url = f"{fia_site.base_url}{path}"
+    file_path = os.path.join(scraper.BASE_DOCS_PATH, "Decision.pdf")
+    os.makedirs(scraper.BASE_DOCS_PATH, exist_ok=True)
+    with open(file_path, "wb") as f:
+        f.write(existing)
+
+    assert scraper.download_document(url, file_path) is not adopted
+
+    with open(file_path, "rb") as f:
+        assert f.read() == PDF
+    assert scraper.manifest.document(url)["sha256"] == hashlib.sha256(PDF).hexdigest()
+    # Complete PDFs are checked against the HEAD Content-Length only
+    assert len(requests_for(fia_site, path)) == (0 if adopted else 1)
+    heads = requests_for(fia_site, path, "HEAD")
+    assert len(heads) == (1 if existing.startswith(b"%PDF") else 0)
+
+
+def listing_row(title, href="/docs/a.pdf", published="01.11.24 10:05"):
+    return (
+        f'<li class="document-row key-0"><a href="{href}">'
+        f'<div class="title">{title}</div><div class="published">Published on '
+        f'<span class="date-display-single">{published}</span> CET</div></a></li>'
+    )
+
+
+NAME = "São Paulo Grand Prix"
+PAGE = f"<html><body><ul>{listing_row(NAME)}</ul></body></html>"
+META_PAGE = f'<html><head><meta charset="windows-1252"></head>{PAGE[6:]}'
+
+
+@pytest.mark.parametrize(
+    "html, encoding",
+    [
+        # Charset only in the HTTP header
+        (PAGE.encode("utf-8"), "utf-8"),
+        (PAGE.encode("latin-1"), "ISO-8859-1"),
+        # Only in a <meta> declaration
+        (META_PAGE.encode("windows-1252"), None),
+        # Neither, so UTF-8
+        (PAGE.encode("utf-8"), None),
+    ],
+)
+def test_non_ascii_names_are_decoded(html, encoding):
+    [document] = parse_listing(html, encoding=encoding)
+
+    assert document.name == NAME
+
+
+def test_non_ascii_names_reach_file_paths(fia_site, scraper):
+    path = f"{DOCS}/Entry List.pdf"
+    fia_site.add_document(path, PDF)
+    fia_site.listings[NAME] = [path]
+    fia_site.titles[path] = f"Doc 0 - {NAME} - Entry List"
+
+    [(url, file_path)] = scraper.list_documents("2024", "f1", "brazil")
+
+    assert file_path.endswith(f"/brazil/2024-03-01-Doc 0 - {NAME} - Entry List.pdf")
+    assert scraper.download_document(url, file_path) is True
+
+
+def node_row(title, href, published):
+    published = (
+        '<div class="field field-name-field-published-date">'
+        '<div class="field-label">Published:&nbsp;</div><div class="field-items">'
+        f'<div class="field-item even"><span class="date-display-single">{published}'
+        "</span> CET</div></div></div>"
+        if published
+        else ""
+    )
+    return (
+        '<div class="node node-decision-document node-teaser clearfix">'
+        f'<a href="{href}"><div class="field field-name-title-field"><div '
+        f'class="field-items"><div class="field-item even">{title}</div></div></div>'
+        f"{published}</a></div>"
+    )
+
+
+def li_row(title, href, published):
+    published = (
+        '<div class="published">Published on <span class="date-display-single">'
+        f"{published}</span> CET</div>"
+        if published
+        else ""
+    )
+    return (
+        f'<li class="document-row key-0"><a href="{href}">'
+        f'<div class="title">\n  {title}\n</div>{published}</a></li>'
+    )
+
+
+ROWS = [
+    ("Doc 1 - Entry List", "/docs/Entry%20List.pdf", "01.03.24 08:04"),
+    # Older documents have no publish time
+    ("Doc 2 - Stewards' Biographies", "https://www.fia.com/docs/bio.pdf", "02.03.24"),
+    # Rows without a date are left out
+    ("Doc 3 - Draft", "/docs/draft.pdf", None),
+    ("Doc 4 - Classification - Race", "/docs/race.pdf", "03.03.24 17:31"),
+]
+EXPECTED = [
+    FIADocument(
+        "Doc 1 - Entry List",
+        datetime(2024, 3, 1, 8, 4),
+        "https://www.fia.com/docs/Entry%20List.pdf",
+    ),
+    FIADocument(
+        "Doc 2 - Stewards' Biographies",
+        datetime(2024, 3, 2),
+        "https://www.fia.com/docs/bio.pdf",
+    ),
+    FIADocument(
+        "Doc 4 - Classification - Race",
+        datetime(2024, 3, 3, 17, 31),
+        "https://www.fia.com/docs/race.pdf",
+    ),
+]
+
+
+@pytest.mark.parametrize("parser", [parse_listing, parse_listing_soup])
+@pytest.mark.parametrize("row", [node_row, li_row])
+def test_both_layouts_parse_to_the_same_records(parser, row):
+    html = f"<html><body>{''.join(row(*r) for r in ROWS)}</body></html>".encode()
+
+    documents = parser(html)
+
+    assert documents == EXPECTED
+    assert all(isinstance(d.published, datetime) for d in documents)
+
+
+@pytest.mark.parametrize("fixture", sorted(p.name for p in FIXTURES.glob("*.html")))
+def test_parsers_agree_on_listing_fixtures(fixture):
+    html = (FIXTURES / fixture).read_bytes()
+
+    documents = parse_listing(html)
+
+    assert documents == parse_listing_soup(html)
+    assert (len(documents) > 0) == (fixture != "empty.html")
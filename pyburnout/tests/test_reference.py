@@ -0,0 +1,112 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from pyburnout.telemetry.reference import (
+    DominanceMap,
+    ReferenceLine,
+    _CoarseToFineIndex,
+    _KDTreeIndex,
+)
+
+RADIUS = 500.0
+LENGTH = 2 * np.pi * RADIUS
+
+
+def circle(distance):
+    angle = np.asarray(distance) / RADIUS
+    return RADIUS * np.cos(angle), RADIUS * np.sin(angle)
+
+
+def lap(speed, hz=10.0):
+    """One lap of the circle at `speed(distance)` m/s, sampled at `hz`."""
+    distance = np.linspace(0.0, LENGTH, 20_001)
+    elapsed = np.concatenate(
+        [[0.0], np.cumsum(np.diff(distance) / speed(distance[:-1]))]
+    )
+    time = np.arange(0.0, elapsed[-1], 1.0 / hz)
+    at = np.interp(time, elapsed, distance)
+    x, y = circle(at)
+    frame = pd.DataFrame({"X": x, "Y": y, "Time": time, "Distance": at})
+    return frame, float(elapsed[-1])
+
+
+def driver(speed):
+    frame, lap_time = lap(speed)
+    return (1, lap_time, frame)
+
+
+@pytest.fixture
+def laps():
+    # A is quicker over the first half of the lap, B over the second
+    first_half = lambda d: np.where(d < LENGTH / 2, 1.0, 0.0)
+    return {
+        "AAA": driver(lambda d: 60.0 + 4.0 * first_half(d)),
+        "BBB": driver(lambda d: 60.0 + 5.0 * (1 - first_half(d))),
+        "CCC": driver(lambda d: np.full_like(d, 58.0)),
+    }
+
+
+def test_reference_line_follows_the_lap():
+    frame, _ = lap(lambda d: np.full_like(d, 60.0))
+    frame.loc[5, "X"] = np.nan
+
+    reference = ReferenceLine.from_lap(frame, spacing=2.0)
+
+    # Up to a sample and a grid step short of the line
+    assert LENGTH - 10.0 < reference.length <= LENGTH
+    distance = np.array([10.0, 800.0, 2500.0])
+    snapped, offset = reference.snap(*circle(distance))
+    np.testing.assert_allclose(snapped, distance, atol=0.5)
+    assert offset.max() < 0.1
+
+
+def test_unwrap_moves_samples_across_the_line():
+    reference = ReferenceLine.from_lap(lap(lambda d: np.full_like(d, 60.0))[0])
+    end = reference.length
+    distance = np.concatenate([[end - 2.0], np.linspace(5.0, end - 5.0, 20), [1.0]])
+
+    unwrapped = reference.unwrap(distance)
+
+    assert unwrapped[0] == pytest.approx(-2.0)
+    assert unwrapped[-1] == pytest.approx(end + 1.0)
+    assert (np.diff(unwrapped) >= 0).all()
+
+
+def test_coarse_to_fine_index_matches_kd_tree():
+    rng = np.random.default_rng(1)
+    points = np.column_stack(circle(np.arange(0.0, LENGTH, 2.0)))
+    query = points[rng.integers(0, len(points), 500)] + rng.normal(0, 3, (500, 2))
+
+    np.testing.assert_array_equal(
+        _CoarseToFineIndex(points).query(query), _KDTreeIndex(points).query(query)
+    )
+
+
+def test_dominance_by_mini_sector(laps):
+    dominance_map = DominanceMap(laps)
+
+    assert dominance_map.fastest == "BBB"
+    times = dominance_map.sector_times(10)
+    for name, (_, lap_time, _) in laps.items():
+        assert times[name].sum() == pytest.approx(lap_time)
+    winners = dominance_map.dominance(10)["driver"].to_list()
+    assert winners == ["AAA"] * 5 + ["BBB"] * 5
+
+
+def test_positionless_samples_are_left_out(laps):
+    expected = DominanceMap(laps).sector_times(10)
+    frame = laps["CCC"][2].copy()
+    frame.loc[[0, 40, 41], "X"] = np.nan
+    frame.loc[90, "Y"] = np.inf
+    laps["CCC"] = (1, laps["CCC"][1], frame)
+
+    times = DominanceMap(laps).sector_times(10)
+
+    pd.testing.assert_frame_equal(times, expected, atol=0.01)
+
+
+def test_no_laps():
+    with pytest.raises(ValueError):
+        DominanceMap({})
+    assert DominanceMap.from_view(None, drivers=[]) is None
@@ -0,0 +1,45 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from pyburnout.telemetry.session import DriverTelemetry
+
+
+@pytest.fixture
+def telemetry():
+    frame = pd.DataFrame(
+        {
+            "Time": np.arange(30, dtype=np.float64),
+            "Speed": np.linspace(100, 300, 30, dtype=np.float32),
+            "nGear": np.arange(30, dtype=np.int8) % 8,
+        }
+    )
+    lap_index = pd.DataFrame(
+        {"LapNumber": [1, 2, 3], "Start": [0, 10, 20], "Stop": [10, 20, 30]}
+    )
+    return DriverTelemetry("1", frame, lap_index)
+
+
+def test_selection_shares_the_session_frame(telemetry):
+    selected = telemetry.select(["Speed", "Time"])
+
+    assert selected.columns == ["Speed", "Time"]
+    assert np.shares_memory(
+        selected.column("Speed").to_numpy(), telemetry.frame["Speed"].to_numpy()
+    )
+    with pytest.raises(KeyError):
+        selected.column("nGear")
+
+
+def test_selected_lap_matches_the_full_lap(telemetry):
+    selected = telemetry.select(["Speed", "Time"])
+
+    lap = selected.lap(2)
+    assert lap.columns.to_list() == ["Speed", "Time"]
+    pd.testing.assert_frame_equal(lap, telemetry.lap(2)[["Speed", "Time"]])
+    assert [n for n, _ in selected.laps()] == [1, 2, 3]
+
+
+def test_unknown_columns_are_rejected(telemetry):
+    with pytest.raises(KeyError):
+        telemetry.select(["Speed", "Throttle"])
@@ -1,49 +1,23 @@
-import requests
-import pandas as pd
-import time
 import warnings
 
+from pyburnout.ingest import PartitionedFetch, ergast_results
+
 warnings.filterwarnings("ignore")
 
 
-BASE_URL = "http://api.jolpi.ca/ergast/f1"
 circuit = "bahrain"
 years = [x for x in range(1950, 2026)]
 
-result_data = []
-
-for year in years:
-    print(f"fetching {year}")
-    results_url = f"{BASE_URL}/{year}/circuits/{circuit}/results"
-
-    data = requests.get(results_url).json()
-
-    race_data = data["MRData"]["RaceTable"]["Races"]
-
-    results = []
-    for race in race_data:
-        results.append(race["Results"])
-    print(results)
-
-    for res in results:
-        result_data.extend(
-            list(
-                map(
-                    lambda x: {
-                        "number": x["number"],
-                        "driver": x["Driver"]["driverId"],
-                        "constructor": x["Constructor"]["constructorId"],
-                        "position": x["position"],
-                        "grid": x["grid"],
-                        "year": year,
-                    },
-                    res,
-                )
-            )
-        )
-
-    time.sleep(1)
+if __name__ == "__main__":
+    # The Ergast mirror is rate limited, so only a couple of requests run
+    # at once; finished years are kept under ./partitions
+    fetcher = PartitionedFetch(
+        f"./partitions/driver-results-{circuit}", ergast_results, workers=2
+    )
+    summary = fetcher.run(years, [circuit])
+    for unit, error in summary["failed"]:
+        print(f"failed {unit}: {error}")
 
-result_df = pd.DataFrame(data=result_data)
+    result_df = fetcher.merge()
 
-result_df.to_csv(f"driver-results-{circuit}.csv", index=False)
+    result_df.to_csv(f"driver-results-{circuit}.csv", index=False)